@@ -0,0 +1,90 @@
+"""
+Risk-scoring time of the original per-supplier loop vs the current kernel.
+
+Centrality is passed in as an empty map so only scoring is timed. The
+legacy loop (an O(S x D) concentration scan plus per-supplier dict
+scoring, as risk_engine had it before the dependency index and the NumPy
+kernel) is measured on a sample of suppliers and extrapolated once a full
+run would take too long.
+
+Usage: python benchmarks/bench_scoring.py [--sizes 1000,10000,100000]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import make_dataset
+from engines.risk_engine import compute_risk_scores
+
+LEGACY_FULL_RUN_LIMIT = 5_000_000  # supplier x dependency pairs
+
+
+def legacy_scores(suppliers, dependencies, centrality):
+    """The original compute_risk_scores loop."""
+    scored = []
+    for s in suppliers:
+        geo_risk = s["geographic_risk"]
+        fin_risk = s["financial_risk"]
+        weather_risk = min(100, geo_risk * 0.8 + 10)
+
+        max_conc = 0
+        for dep in dependencies:
+            if dep["to_supplier_id"] == s["id"]:
+                max_conc = max(max_conc, dep["volume_percent"])
+        concentration_risk = min(100, max_conc)
+
+        cent_score = centrality.get(s["id"], 0)
+        centrality_risk = min(100, cent_score * 500)
+
+        risk_score = (
+            geo_risk * 0.25 + fin_risk * 0.20 +
+            weather_risk * 0.20 + concentration_risk * 0.20 +
+            centrality_risk * 0.15
+        )
+        risk_score = round(min(100, max(0, risk_score)), 1)
+        risk_level = (
+            "critical" if risk_score >= 75 else
+            "high" if risk_score >= 55 else
+            "medium" if risk_score >= 35 else "low"
+        )
+        scored.append({
+            **s, "risk_score": risk_score, "risk_level": risk_level,
+            "geo_risk": round(geo_risk, 1), "fin_risk": round(fin_risk, 1),
+            "weather_risk": round(weather_risk, 1),
+            "concentration_risk": round(concentration_risk, 1),
+            "centrality_risk": round(centrality_risk, 1),
+            "centrality_score": round(cent_score, 4),
+        })
+    return scored
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--sizes", default="1000,10000,100000")
+    args = ap.parse_args()
+
+    print(f"{'suppliers':>10} {'deps':>8} {'legacy_s':>12} {'kernel_s':>10} {'speedup':>9}")
+    for n in [int(x) for x in args.sizes.split(",")]:
+        suppliers, dependencies = make_dataset(n)
+
+        t0 = time.perf_counter()
+        compute_risk_scores(suppliers, dependencies, centrality={})
+        kernel_s = time.perf_counter() - t0
+
+        pairs = len(suppliers) * len(dependencies)
+        sample = suppliers if pairs <= LEGACY_FULL_RUN_LIMIT else suppliers[:max(1, LEGACY_FULL_RUN_LIMIT // len(dependencies))]
+        t0 = time.perf_counter()
+        legacy_scores(sample, dependencies, {})
+        legacy_s = (time.perf_counter() - t0) * len(suppliers) / len(sample)
+        marker = "" if sample is suppliers else "~"
+
+        print(f"{len(suppliers):>10} {len(dependencies):>8} {marker + format(legacy_s, '.3f'):>12} "
+              f"{kernel_s:>10.3f} {legacy_s / kernel_s:>8.0f}x")
+    print("~ = extrapolated from a supplier sample")
+
+
+if __name__ == "__main__":
+    main()
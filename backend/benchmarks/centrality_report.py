@@ -0,0 +1,86 @@
+"""
+Error-vs-speed report for sampled betweenness centrality.
+
+Builds tiered synthetic supplier graphs, computes exact betweenness once per
+size and compares k-pivot sampled runs against it, so CENTRALITY_SAMPLE_K
+and CENTRALITY_EXACT_MAX_NODES can be picked with confidence.
+
+Usage: python benchmarks/centrality_report.py [--sizes 500,2000] [--ks 64,128,256,512] [--json out.json]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import networkx as nx
+from engines.graph_engine import compute_centrality
+
+
+def tiered_graph(n, seed=7, tiers=4, fan_in=3):
+    """Layered DAG with ~n nodes and `fan_in` upstream suppliers per node."""
+    rng = random.Random(seed)
+    G = nx.DiGraph()
+    per_tier = max(1, n // tiers)
+    layers = [list(range(t * per_tier, (t + 1) * per_tier)) for t in range(tiers)]
+    G.add_nodes_from(range(tiers * per_tier))
+    for upstream, downstream in zip(layers, layers[1:]):
+        for v in downstream:
+            for u in rng.sample(upstream, min(fan_in, len(upstream))):
+                G.add_edge(u, v)
+    return G
+
+
+def compare(exact, approx, top_n=15, spof_threshold=0.04):
+    nodes = list(exact)
+    errs = [abs(exact[v] - approx.get(v, 0.0)) for v in nodes]
+    top_exact = set(sorted(nodes, key=exact.get, reverse=True)[:top_n])
+    top_approx = set(sorted(nodes, key=lambda v: approx.get(v, 0.0), reverse=True)[:top_n])
+    flag_exact = {v for v in nodes if exact[v] > spof_threshold}
+    flag_approx = {v for v in nodes if approx.get(v, 0.0) > spof_threshold}
+    union = flag_exact | flag_approx
+    return {
+        "mean_abs_error": sum(errs) / len(errs),
+        "max_abs_error": max(errs),
+        f"top{top_n}_overlap": len(top_exact & top_approx) / top_n,
+        "spof_flag_jaccard": len(flag_exact & flag_approx) / len(union) if union else 1.0,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--sizes", default="500,2000,5000")
+    ap.add_argument("--ks", default="32,64,128,256,512")
+    ap.add_argument("--json", help="write results to this file")
+    args = ap.parse_args()
+
+    rows = []
+    for n in [int(x) for x in args.sizes.split(",")]:
+        G = tiered_graph(n)
+        t0 = time.perf_counter()
+        exact = compute_centrality(G, "exact")
+        exact_s = time.perf_counter() - t0
+        print(f"\nn={G.number_of_nodes()} e={G.number_of_edges()}  exact: {exact_s:.3f}s")
+        print(f"  {'k':>6} {'time_s':>8} {'speedup':>8} {'mean_err':>10} {'max_err':>10} {'top15':>6} {'spof_j':>7}")
+        for k in [int(x) for x in args.ks.split(",")]:
+            if k >= G.number_of_nodes():
+                continue
+            t0 = time.perf_counter()
+            approx = compute_centrality(G, "sampled", k)
+            approx_s = time.perf_counter() - t0
+            m = compare(exact, approx)
+            rows.append({"nodes": G.number_of_nodes(), "edges": G.number_of_edges(), "k": k,
+                         "exact_s": exact_s, "sampled_s": approx_s, **m})
+            print(f"  {k:>6} {approx_s:>8.3f} {exact_s / approx_s:>7.1f}x {m['mean_abs_error']:>10.2e} "
+                  f"{m['max_abs_error']:>10.2e} {m['top15_overlap']:>6.2f} {m['spof_flag_jaccard']:>7.2f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+Benchmark suite: every engine entry point and every read-only API route,
+across dataset sizes, saved as JSON so runs from different commits can be
+compared.
+
+Datasets come from data.scale_data. Each case is timed cold (analysis
+snapshots dropped before every run, so the graph, centrality and score
+table are rebuilt) and warm (snapshot reused, as for repeated requests).
+Routes are called through FastAPI's TestClient with the dataset installed
+as an org's data, so timings include validation and JSON serialization.
+
+Usage:
+    python benchmarks/suite.py [--sizes 1000,10000] [--repeat 5] [--only engine|route] [--out results.json]
+    python benchmarks/suite.py --compare before.json after.json [--threshold 1.25]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.scale_data import generate_scaled_data
+from engines.snapshot import invalidate
+
+BENCH_ORG = "techcorp"   # routes read the dataset installed for this org
+
+
+def engine_cases(data):
+    """(name, callable) for each engine entry point, bound to `data`."""
+    from engines.geo_index import get_suppliers_near
+    from engines.graph_engine import get_centrality, get_redundancy, get_single_points_of_failure, simulate_disruption
+    from engines.graph_lod import expand_cluster, get_clustered_graph, get_viewport_graph
+    from engines.prediction_engine import get_alerts, get_disruption_probability_summary
+    from engines.recommendation_engine import get_recommendations
+    from engines.risk_engine import compute_risk_scores
+    from engines.scenario_engine import run_monte_carlo, run_scenario, run_sweep
+
+    suppliers, dependencies, alerts = data["suppliers"], data["dependencies"], data["alerts"]
+    country = Counter(s["country_name"] for s in suppliers).most_common(1)[0][0]
+    affected = [s["id"] for s in suppliers if s["country_name"] == country]
+    code = Counter(s["country_code"] for s in suppliers).most_common(1)[0][0]
+    center = suppliers[len(suppliers) // 2]
+    return [
+        ("compute_risk_scores", lambda: compute_risk_scores(suppliers, dependencies)),
+        ("get_centrality", lambda: get_centrality(suppliers, dependencies)),
+        ("get_single_points_of_failure", lambda: get_single_points_of_failure(suppliers, dependencies)),
+        ("simulate_disruption", lambda: simulate_disruption(affected, suppliers, dependencies)),
+        ("get_recommendations", lambda: get_recommendations(suppliers, dependencies)),
+        ("get_alerts", lambda: get_alerts(alerts, suppliers, dependencies)),
+        ("get_disruption_probability_summary",
+         lambda: get_disruption_probability_summary(alerts, suppliers, dependencies)),
+        ("run_scenario", lambda: run_scenario("port_closure", target_country=country,
+                                              suppliers=suppliers, dependencies=dependencies)),
+        ("run_scenario[radius]", lambda: run_scenario("weather_event", center_lat=center["lat"],
+                                                      center_lng=center["lng"], radius_km=500,
+                                                      suppliers=suppliers, dependencies=dependencies)),
+        ("run_monte_carlo", lambda: run_monte_carlo("port_closure", target_country=country, trials=200,
+                                                    suppliers=suppliers, dependencies=dependencies)),
+        ("run_sweep", lambda: run_sweep("port_closure", limit=10, suppliers=suppliers, dependencies=dependencies)),
+        ("get_redundancy", lambda: get_redundancy(suppliers, dependencies)),
+        ("get_clustered_graph", lambda: get_clustered_graph(suppliers, dependencies, "country_code,tier")),
+        ("expand_cluster", lambda: expand_cluster(suppliers, dependencies, code, limit=500)),
+        ("get_viewport_graph", lambda: get_viewport_graph(suppliers, dependencies, 0, 60, 60, 150)),
+        ("get_suppliers_near", lambda: get_suppliers_near(suppliers, dependencies, center["lat"], center["lng"],
+                                                          radius_km=500)),
+    ]
+
+
+def route_cases(data, client):
+    """(name, callable) for each read-only route; each call asserts a 200."""
+    suppliers = data["suppliers"]
+    country = Counter(s["country_name"] for s in suppliers).most_common(1)[0][0]
+    code = Counter(s["country_code"] for s in suppliers).most_common(1)[0][0]
+    center = suppliers[len(suppliers) // 2]
+    supplier_id = center["id"]
+    headers = {"X-Org-ID": BENCH_ORG}
+
+    def get(path):
+        def call():
+            r = client.get(path, headers=headers)
+            assert r.status_code == 200, (path, r.status_code)
+        return f"GET {path}", call
+
+    def post(path, body, variant=""):
+        def call():
+            r = client.post(path, json=body, headers=headers)
+            assert r.status_code == 200 and "error" not in r.json(), (path, r.status_code)
+        return f"POST {path}{variant}", call
+
+    return [
+        get("/api/risk/overview"),
+        get("/api/risk/top-risky"),
+        get("/api/risk/country-exposure"),
+        get("/api/risk/industry-breakdown"),
+        get("/api/suppliers"),
+        get("/api/suppliers?sort=risk"),
+        get(f"/api/suppliers/{supplier_id}"),
+        get(f"/api/suppliers/near?lat={center['lat']}&lng={center['lng']}&radius_km=500"),
+        get("/api/network/graph"),
+        get("/api/network/graph/clusters?group_by=country_code,tier"),
+        get(f"/api/network/graph/clusters/{code}?limit=500"),
+        get("/api/network/graph/viewport?min_lat=0&max_lat=60&min_lng=60&max_lng=150"),
+        get("/api/network/spof"),
+        get("/api/network/redundancy"),
+        get(f"/api/network/impact/{supplier_id}"),
+        get("/api/alerts"),
+        get("/api/alerts/summary"),
+        get("/api/recommendations"),
+        post("/api/simulator/run", {"scenario_type": "port_closure", "target_country": country}),
+        post("/api/simulator/run", {"scenario_type": "weather_event", "center_lat": center["lat"],
+                                    "center_lng": center["lng"], "radius_km": 500}, variant="[radius]"),
+        post("/api/simulator/monte-carlo", {"scenario_type": "port_closure", "target_country": country,
+                                            "trials": 200}),
+        post("/api/simulator/sweep", {"scenario_type": "port_closure", "limit": 10}),
+    ]
+
+
+def measure(fn, repeat):
+    """Cold time of one run from scratch, then min / median over `repeat` warm runs (ms)."""
+    invalidate()
+    t0 = time.perf_counter()
+    fn()
+    cold = time.perf_counter() - t0
+    warm = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        warm.append(time.perf_counter() - t0)
+    return {"cold_ms": round(cold * 1000, 3), "warm_min_ms": round(min(warm) * 1000, 3),
+            "warm_median_ms": round(statistics.median(warm) * 1000, 3), "repeat": repeat}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    import networkx
+    import numpy
+    return {
+        "commit": _git_commit(), "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count(),
+        "numpy": numpy.__version__, "networkx": networkx.__version__,
+    }
+
+
+def run(sizes, repeat=5, only=None, seed=7, log=print):
+    from data.company_data import set_company_data, unload_company_data
+
+    results = []
+    for n in sizes:
+        data = generate_scaled_data(n, org=BENCH_ORG, seed=seed)
+        shape = {"suppliers": len(data["suppliers"]), "dependencies": len(data["dependencies"])}
+        suites = []
+        if only in (None, "engine"):
+            suites.append(("engine", engine_cases(data)))
+        if only in (None, "route"):
+            from fastapi.testclient import TestClient
+            from main import app
+            set_company_data(BENCH_ORG, data)
+            suites.append(("route", route_cases(data, TestClient(app))))
+        try:
+            for suite, cases in suites:
+                for name, fn in cases:
+                    timing = measure(fn, repeat)
+                    results.append({"suite": suite, "name": name, **shape, **timing})
+                    log(f"{suite:>6} {name:<40} {n:>8} {timing['cold_ms']:>11.1f} {timing['warm_median_ms']:>11.1f}")
+        finally:
+            if only in (None, "route"):
+                unload_company_data(BENCH_ORG)
+    return {"environment": environment(), "seed": seed, "results": results}
+
+
+def compare(before, after, threshold=1.25):
+    """Rows of (key, before_ms, after_ms, ratio) on warm median; ratios above `threshold` are regressions."""
+    key = lambda r: (r["suite"], r["name"], r["suppliers"])
+    old = {key(r): r for r in before["results"]}
+    rows, regressions = [], 0
+    for r in after["results"]:
+        b = old.get(key(r))
+        if b is None:
+            continue
+        if b["warm_median_ms"]:
+            ratio = r["warm_median_ms"] / b["warm_median_ms"]
+        else:
+            ratio = 1.0 if not r["warm_median_ms"] else float("inf")
+        regressions += ratio > threshold
+        rows.append((key(r), b["warm_median_ms"], r["warm_median_ms"], ratio))
+    return rows, regressions
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--sizes", default="1000,10000")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--only", choices=("engine", "route"))
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--out", help="write results as JSON")
+    ap.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="compare two saved runs")
+    ap.add_argument("--threshold", type=float, default=1.25, help="--compare: slowdown ratio flagged as a regression")
+    args = ap.parse_args()
+
+    if args.compare:
+        before, after = (json.load(open(p)) for p in args.compare)
+        rows, regressions = compare(before, after, args.threshold)
+        print(f"{'suite':>6} {'case':<40} {'suppliers':>9} {'before_ms':>10} {'after_ms':>10} {'ratio':>7}")
+        for (suite, name, n), b, a, ratio in rows:
+            flag = "  <-- slower" if ratio > args.threshold else ""
+            print(f"{suite:>6} {name:<40} {n:>9} {b:>10.1f} {a:>10.1f} {ratio:>6.2f}x{flag}")
+        print(f"{regressions} regression(s) above {args.threshold:.2f}x")
+        sys.exit(1 if regressions else 0)
+
+    print(f"{'suite':>6} {'case':<40} {'suppliers':>8} {'cold_ms':>11} {'warm_ms':>11}")
+    report = run([int(x) for x in args.sizes.split(",")], repeat=args.repeat, only=args.only, seed=args.seed)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=1)
+        print(f"saved {len(report['results'])} results to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+"""Tiered supplier datasets for benchmarks (see data.scale_data for the full set of options)."""
+from data.company_data import COUNTRY_INFO
+from data.scale_data import generate_scaled_data
+
+
+def make_dataset(n_suppliers, tiers=3, fan_in=3, seed=7):
+    """~n_suppliers suppliers split evenly over `tiers`, each fed by up to `fan_in` suppliers one tier up."""
+    data = generate_scaled_data(n_suppliers, tiers=tiers, tier_growth=1.0, fan_in=fan_in, fan_in_dist="fixed",
+                                countries={code: 1 for code in COUNTRY_INFO}, seed=seed)
+    return data["suppliers"], data["dependencies"]
@@ -3,6 +3,10 @@ Company-specific synthetic supply chain datasets for 3 demo organizations.
 Each company has a unique risk profile, industry focus, and geographic exposure.
 """
 import random
+from bisect import bisect_left
+from operator import itemgetter
+
+from data.supplier_table import SupplierTable
 
 # ── TECHCORP SOLUTIONS (Semiconductors / Electronics) ─────────────────────────
 # HIGH RISK: Heavy Taiwan + China exposure, semiconductor focus
@@ -183,10 +187,210 @@ def _generate_for_company(cfg: dict, seed: int) -> dict:
 # ── Singleton caches per org ───────────────────────────────────────────────────
 _caches = {}
 
+_CONFIGS = {"techcorp": (TECHCORP, 42), "pharma": (PHARMA, 99), "auto": (AUTO, 77)}
+ORGS = tuple(_CONFIGS)
+
+def generate_company_data(org: str) -> dict:
+    """Build an org's synthetic dataset (uncached)."""
+    cfg, seed = _CONFIGS.get(org, _CONFIGS["techcorp"])
+    data = _generate_for_company(cfg, seed)
+    data["suppliers"] = SupplierTable.from_records(data["suppliers"])
+    return data
+
+def company_profile(org: str) -> dict:
+    return _CONFIGS.get(org, _CONFIGS["techcorp"])[0]["profile"]
+
 def get_company_data(org: str) -> dict:
     global _caches
     if org not in _caches:
-        cfg_map = {"techcorp": (TECHCORP, 42), "pharma": (PHARMA, 99), "auto": (AUTO, 77)}
-        cfg, seed = cfg_map.get(org, cfg_map["techcorp"])
-        _caches[org] = _generate_for_company(cfg, seed)
+        _caches[org] = generate_company_data(org)
     return _caches[org]
+
+def is_company_data_loaded(org: str) -> bool:
+    return org in _caches
+
+def unload_company_data(org: str):
+    """Forget an org's dataset so the next request loads it afresh."""
+    invalidate_company_data(org)
+    _caches.pop(org, None)
+
+def set_company_data(org: str, data: dict):
+    """Install a dataset loaded elsewhere (see db.repository) as the org's current data."""
+    invalidate_company_data(org)
+    if not isinstance(data["suppliers"], SupplierTable):
+        data = {**data, "suppliers": SupplierTable.from_records(data["suppliers"])}
+    _caches[org] = data
+
+def invalidate_company_data(org: str = None):
+    """Drop cached analysis for an org (or every org) after its data is mutated."""
+    from engines.snapshot import invalidate
+    if org is None:
+        invalidate()
+        _ids.clear()
+    elif org in _caches:
+        invalidate(_caches[org]["suppliers"])
+        _ids.pop(org, None)
+
+# ── Mutations ──────────────────────────────────────────────────────────────────
+# Edits are applied to the cached lists in place and forwarded to the org's
+# analysis snapshot, which patches its graph, indexes and scores instead of
+# rebuilding them (see engines.snapshot).
+
+SUPPLIER_FIELDS = ("name", "tier", "country_code", "industry", "component", "lat", "lng",
+                   "geographic_risk", "financial_risk", "annual_revenue_m", "employees",
+                   "years_operating", "certifications", "on_time_delivery_pct", "is_active")
+
+class _Ids:
+    """Next free ids of an org's dataset, so an edit does not scan it for the maximum.
+
+    Also records whether the dependency list is in ascending id order, as
+    generated and database-loaded datasets are and appends keep it, so a
+    dependency is found by bisection rather than a scan.
+    """
+
+    def __init__(self, data):
+        self.suppliers, self.dependencies = data["suppliers"], data["dependencies"]
+        dep_ids = [d["id"] for d in self.dependencies]
+        self.next_supplier = max(self.suppliers.ids(), default=0) + 1
+        self.next_dependency = max(dep_ids, default=0) + 1
+        self.ascending = all(a < b for a, b in zip(dep_ids, dep_ids[1:]))
+
+    def take_supplier(self):
+        self.next_supplier += 1
+        return self.next_supplier - 1
+
+    def take_dependency(self):
+        self.next_dependency += 1
+        return self.next_dependency - 1
+
+    def dependency_position(self, dependency_id):
+        deps = self.dependencies
+        if not self.ascending:
+            return _find(deps, dependency_id)
+        i = bisect_left(deps, dependency_id, key=itemgetter("id"))
+        return i if i < len(deps) and deps[i]["id"] == dependency_id else None
+
+_ids = {}   # org -> _Ids, dropped with the org's cached analysis
+
+def _ids_of(org: str, data: dict) -> _Ids:
+    ids = _ids.get(org)
+    if ids is None or ids.suppliers is not data["suppliers"] or ids.dependencies is not data["dependencies"]:
+        ids = _ids[org] = _Ids(data)
+    return ids
+
+def _find(items, item_id):
+    for i, item in enumerate(items):
+        if item["id"] == item_id:
+            return i
+    return None
+
+def add_supplier(org: str, fields: dict) -> dict:
+    from engines.snapshot import editing
+    data = get_company_data(org)
+    suppliers = data["suppliers"]
+    code = fields.get("country_code", "US").upper()
+    info = COUNTRY_INFO.get(code, COUNTRY_INFO["US"])
+    s = {
+        "id": None,
+        "name": fields.get("name") or f"Supplier {len(suppliers) + 1}",
+        "tier": 1, "country_code": code, "country_name": info["name"],
+        "industry": data["profile"]["industry"], "component": "",
+        "lat": info["lat"], "lng": info["lng"],
+        "geographic_risk": 50, "financial_risk": 50,
+        "annual_revenue_m": 0, "employees": 0, "years_operating": 0, "certifications": 0,
+        "on_time_delivery_pct": 0.0, "is_active": True,
+    }
+    s.update({k: v for k, v in fields.items() if k in SUPPLIER_FIELDS and k != "country_code"})
+    with editing(suppliers, data["dependencies"]) as snap:
+        s["id"] = _ids_of(org, data).take_supplier()
+        s = suppliers.append(s)
+        if snap is not None:
+            snap.on_supplier_added(s)
+    return s
+
+def update_supplier(org: str, supplier_id: int, fields: dict):
+    """Update a supplier's fields in place; returns the supplier or None if unknown."""
+    from engines.snapshot import editing
+    data = get_company_data(org)
+    suppliers = data["suppliers"]
+    with editing(suppliers, data["dependencies"]) as snap:
+        s = suppliers.get_row(supplier_id)
+        if s is None:
+            return None
+        s.update({k: v for k, v in fields.items() if k in SUPPLIER_FIELDS})
+        if "country_code" in fields:
+            s["country_code"] = s["country_code"].upper()
+            s["country_name"] = COUNTRY_INFO.get(s["country_code"], {"name": s["country_code"]})["name"]
+        if snap is not None:
+            snap.on_supplier_updated(s)
+    return s
+
+def update_supplier_risk(org: str, supplier_id: int, geographic_risk=None, financial_risk=None):
+    fields = {k: v for k, v in (("geographic_risk", geographic_risk), ("financial_risk", financial_risk))
+              if v is not None}
+    return update_supplier(org, supplier_id, fields)
+
+def remove_supplier(org: str, supplier_id: int):
+    """Remove a supplier and every dependency touching it; returns the supplier or None."""
+    from engines.snapshot import editing
+    data = get_company_data(org)
+    suppliers, deps = data["suppliers"], data["dependencies"]
+    with editing(suppliers, deps) as snap:
+        i = suppliers.index_of(supplier_id)
+        if i is None:
+            return None
+        s = suppliers.pop(i)
+        ids = _ids_of(org, data)
+        if snap is not None and ids.ascending:
+            index = snap.dependency_index
+            touching = {id(d): d for edges in (index.incoming.get(supplier_id, {}), index.outgoing.get(supplier_id, {}))
+                        for d in edges.values()}
+            positions = sorted(ids.dependency_position(d["id"]) for d in touching.values())
+            removed = [deps[p] for p in positions]
+            for p in reversed(positions):
+                del deps[p]
+        else:
+            removed = [d for d in deps if supplier_id in (d["from_supplier_id"], d["to_supplier_id"])]
+            deps[:] = [d for d in deps if supplier_id not in (d["from_supplier_id"], d["to_supplier_id"])]
+        if snap is not None:
+            snap.on_supplier_removed(s, removed)
+    return s
+
+def add_dependency(org: str, from_supplier_id: int, to_supplier_id: int, component: str = None,
+                   volume_percent: float = 50, criticality: str = "medium"):
+    """Add a dependency between two known suppliers. Raises ValueError for unknown ids or a duplicate pair."""
+    from engines.snapshot import editing
+    data = get_company_data(org)
+    suppliers, deps = data["suppliers"], data["dependencies"]
+    with editing(suppliers, deps) as snap:
+        src = suppliers.get_row(from_supplier_id)
+        if src is None or suppliers.index_of(to_supplier_id) is None:
+            raise ValueError("Supplier not found")
+        if snap is not None:
+            exists = to_supplier_id in snap.dependency_index.outgoing.get(from_supplier_id, ())
+        else:   # nothing indexed yet: one scan costs what building the index would
+            exists = any(d["from_supplier_id"] == from_supplier_id and d["to_supplier_id"] == to_supplier_id
+                         for d in deps)
+        if exists:
+            raise ValueError("Dependency already exists")
+        dep = {"id": _ids_of(org, data).take_dependency(),
+               "from_supplier_id": from_supplier_id, "to_supplier_id": to_supplier_id,
+               "component": component or src["component"],
+               "volume_percent": volume_percent, "criticality": criticality}
+        deps.append(dep)
+        if snap is not None:
+            snap.on_dependency_added(dep)
+    return dep
+
+def remove_dependency(org: str, dependency_id: int):
+    from engines.snapshot import editing
+    data = get_company_data(org)
+    deps = data["dependencies"]
+    with editing(data["suppliers"], deps) as snap:
+        i = _ids_of(org, data).dependency_position(dependency_id)
+        if i is None:
+            return None
+        dep = deps.pop(i)
+        if snap is not None:
+            snap.on_dependency_removed(dep)
+    return dep
@@ -0,0 +1,276 @@
+"""
+Large synthetic supply networks for load and benchmark testing.
+
+generate_scaled_data(n) builds an org-shaped dataset of any size (1k to
+1M+ suppliers) with NumPy, deterministically per seed. It reuses an org
+config from company_data (industries, components, country weights and
+risk boosts) and COUNTRY_INFO, but lets the shape be varied:
+
+  tiers          number of tiers (tier `tiers` is the raw-material end)
+  tier_growth    each tier is this many times larger than the one below it
+  fan_in         mean suppliers feeding each supplier from the next tier up
+  fan_in_dist    "fixed" | "poisson" | "powerlaw" spread of fan-in
+  fan_out_skew   0 = upstream partners picked uniformly; higher values
+                 concentrate supply on a few hubs (Zipf weights)
+  countries      {code: weight} overriding the org's country mix
+
+The dataset can be written to disk (CSV, loadable through
+POST /api/seed/upload/{table}, or NPZ for fast reloads):
+
+    python -m data.scale_data --suppliers 100000 --tiers 5 --out /tmp/net --format npz
+"""
+import argparse
+import csv
+import os
+import time
+
+import numpy as np
+
+from data.company_data import _CONFIGS, ADJECTIVES, NOUNS, COUNTRY_INFO
+from data.supplier_table import SupplierTable
+
+FAN_IN_DISTS = ("fixed", "poisson", "powerlaw")
+
+# (low, high) per tier, tier 3 ranges used for every tier beyond it, as in company_data
+_FIN = {1: (10, 50), 2: (15, 65), 3: (20, 80)}
+_REVENUE = {1: (1000, 50000), 2: (200, 5000), 3: (50, 500)}
+_EMPLOYEES = {1: (5000, 100000), 2: (1000, 30000), 3: (500, 8000)}
+_YEARS = {1: (10, 70), 2: (5, 50), 3: (3, 30)}
+_CERTS = {1: (3, 10), 2: (2, 7), 3: (1, 5)}
+_CRITICALITY = np.array(["high", "high", "medium", "medium", "low"])
+_ALERT_TYPES = np.array(["Weather Event", "Political Instability", "Supplier Bankruptcy Risk",
+                         "Port Congestion", "Trade Restriction"])
+
+
+def _tier_sizes(n, tiers, growth):
+    weights = growth ** np.arange(tiers, dtype=float)           # tier 1 .. tiers
+    sizes = np.maximum(1, np.floor(n * weights / weights.sum())).astype(np.int64)
+    sizes[-1] += n - sizes.sum()                                 # rounding remainder to the deepest tier
+    return sizes
+
+
+def _by_tier(rng, tier, table):
+    lo, hi = (np.array([table[t][i] for t in (1, 2, 3)]) for i in (0, 1))
+    idx = np.minimum(tier, 3) - 1
+    return rng.integers(lo[idx], hi[idx] + 1)
+
+
+def _fan_in(rng, n, mean, dist):
+    if dist == "fixed":
+        return np.full(n, max(1, round(mean)), dtype=np.int64)
+    if dist == "poisson":
+        return 1 + rng.poisson(max(mean - 1, 0), n)
+    # powerlaw: Lomax (Pareto II) tail, shape 2 has mean 1, so 1 + scale * x averages `mean`
+    return 1 + np.rint(rng.pareto(2.0, n) * max(mean - 1, 0)).astype(np.int64)
+
+
+def _suppliers(rng, n, tiers, growth, cfg, countries):
+    sizes = _tier_sizes(n, tiers, growth)
+    tier = np.repeat(np.arange(tiers, 0, -1), sizes[::-1])       # deepest tier first, ids ascend downstream
+    codes = np.array(list(countries))
+    weights = np.array(list(countries.values()), dtype=float)
+    country = rng.choice(len(codes), n, p=weights / weights.sum())
+    lat0 = np.array([COUNTRY_INFO.get(c, COUNTRY_INFO["US"])["lat"] for c in codes])
+    lng0 = np.array([COUNTRY_INFO.get(c, COUNTRY_INFO["US"])["lng"] for c in codes])
+    names = np.array([COUNTRY_INFO.get(c, COUNTRY_INFO["US"])["name"] for c in codes])
+    boost = np.array([cfg["country_risk_boost"].get(c, 50) for c in codes])
+
+    industries = cfg["industries"]
+    industry = rng.integers(0, len(industries), n)
+    components = np.array([c for ind in industries for c in cfg["components"][ind]])
+    per_industry = np.array([len(cfg["components"][ind]) for ind in industries])
+    first = np.concatenate(([0], np.cumsum(per_industry)[:-1]))
+    component = first[industry] + (rng.random(n) * per_industry[industry]).astype(np.int64)
+
+    ids = np.arange(1, n + 1)
+    adjective = rng.integers(0, len(ADJECTIVES), n)
+    noun = rng.integers(0, len(NOUNS), n)
+    columns = {
+        "id": ids,
+        "name": [f"{ADJECTIVES[a]} {NOUNS[b]} {i}" for a, b, i in zip(adjective.tolist(), noun.tolist(), ids.tolist())],
+        "tier": tier,
+        "country_code": codes[country].tolist(),
+        "country_name": names[country].tolist(),
+        "industry": np.array(industries)[industry].tolist(),
+        "component": components[component].tolist(),
+        "lat": np.round(lat0[country] + rng.uniform(-3, 3, n), 4),
+        "lng": np.round(lng0[country] + rng.uniform(-3, 3, n), 4),
+        "geographic_risk": np.minimum(100, boost[country] + rng.integers(-8, 9, n)),
+        "financial_risk": _by_tier(rng, tier, _FIN),
+        "annual_revenue_m": _by_tier(rng, tier, _REVENUE),
+        "employees": _by_tier(rng, tier, _EMPLOYEES),
+        "years_operating": _by_tier(rng, tier, _YEARS),
+        "certifications": _by_tier(rng, tier, _CERTS),
+        "on_time_delivery_pct": np.round(rng.uniform(70, 98, n), 1),
+        "is_active": np.ones(n, dtype=bool),
+    }
+    return columns, sizes
+
+
+def _dependencies(rng, tier_sizes, fan_in, fan_in_dist, fan_out_skew):
+    """Edges from each tier to the one below it, as columns."""
+    tiers = len(tier_sizes)
+    starts = np.concatenate(([0], np.cumsum(tier_sizes[::-1])[:-1]))   # row offset of each tier, deepest first
+    parts = []
+    for k in range(tiers - 1):                                       # tier tiers-k feeds tier tiers-k-1
+        up_start, up_n = starts[k], tier_sizes[::-1][k]
+        down_start, down_n = starts[k + 1], tier_sizes[::-1][k + 1]
+        degree = np.minimum(_fan_in(rng, down_n, fan_in, fan_in_dist), up_n)
+        to_rows = np.repeat(np.arange(down_start, down_start + down_n), degree)
+        if fan_out_skew > 0:
+            p = 1.0 / np.arange(1, up_n + 1) ** fan_out_skew
+            hubs = rng.permutation(up_n)                             # hubs spread over the tier, not its first rows
+            from_rows = up_start + hubs[rng.choice(up_n, len(to_rows), p=p / p.sum())]
+        else:
+            from_rows = up_start + rng.integers(0, up_n, len(to_rows))
+        parts.append((from_rows, to_rows))
+    if not parts:
+        return {name: np.empty(0, dtype=np.int64) for name in ("from", "to")}
+    from_rows = np.concatenate([p[0] for p in parts])
+    to_rows = np.concatenate([p[1] for p in parts])
+    # one dependency per (from, to) pair, in generation order
+    _, first = np.unique(from_rows * (to_rows.max() + 1) + to_rows, return_index=True)
+    keep = np.sort(first)
+    return {"from": from_rows[keep], "to": to_rows[keep]}
+
+
+def generate_scaled_columns(n_suppliers: int, org: str = "techcorp", tiers: int = 3, tier_growth: float = 1.5,
+                            fan_in: float = 3, fan_in_dist: str = "poisson", fan_out_skew: float = 0.0,
+                            countries: dict = None, n_alerts: int = None, seed: int = 7) -> dict:
+    """The dataset as {"suppliers": {column: values}, "dependencies": {...}, "alerts": {...}}."""
+    if n_suppliers < tiers:
+        raise ValueError("need at least one supplier per tier")
+    if fan_in_dist not in FAN_IN_DISTS:
+        raise ValueError(f"fan_in_dist must be one of {FAN_IN_DISTS}")
+    cfg = _CONFIGS.get(org, _CONFIGS["techcorp"])[0]
+    countries = countries or cfg["profile"]["country_weights"]
+    unknown = set(countries) - set(COUNTRY_INFO)
+    if unknown:
+        raise ValueError(f"unknown country codes: {sorted(unknown)}")
+    rng = np.random.default_rng(seed)
+
+    suppliers, sizes = _suppliers(rng, n_suppliers, tiers, tier_growth, cfg, countries)
+    edges = _dependencies(rng, sizes, fan_in, fan_in_dist, fan_out_skew)
+    m = len(edges["from"])
+    component = np.array(suppliers["component"], dtype=object)
+    dependencies = {
+        "id": np.arange(1, m + 1),
+        "from_supplier_id": suppliers["id"][edges["from"]],
+        "to_supplier_id": suppliers["id"][edges["to"]],
+        "component": component[edges["from"]].tolist(),
+        "volume_percent": rng.integers(15, 96, m),
+        "criticality": _CRITICALITY[rng.integers(0, len(_CRITICALITY), m)].tolist(),
+    }
+
+    geo, fin = suppliers["geographic_risk"], suppliers["financial_risk"]
+    high_risk = np.flatnonzero(geo + fin > 100)
+    n_alerts = min(len(high_risk), max(15, n_suppliers // 100) if n_alerts is None else n_alerts)
+    rows = np.sort(rng.choice(high_risk, n_alerts, replace=False)) if n_alerts else high_risk[:0]
+    prob = np.minimum(95, geo[rows] // 2 + fin[rows] // 3 + rng.integers(10, 26, n_alerts))
+    names = np.array(suppliers["country_name"], dtype=object)[rows]
+    alerts = {
+        "id": np.arange(1, n_alerts + 1),
+        "supplier_id": suppliers["id"][rows],
+        "supplier_name": [suppliers["name"][r] for r in rows.tolist()],
+        "country_code": [suppliers["country_code"][r] for r in rows.tolist()],
+        "alert_type": _ALERT_TYPES[rng.integers(0, len(_ALERT_TYPES), n_alerts)].tolist(),
+        "probability": prob,
+        "severity": np.where(prob > 70, "critical", np.where(prob > 45, "high", "medium")).tolist(),
+        "expected_days": rng.integers(7, 29, n_alerts),
+        "affected_component": component[rows].tolist(),
+        "impact_description": [f"Risk event in {c} threatening {p} supply"
+                               for c, p in zip(names.tolist(), component[rows].tolist())],
+    }
+    return {"suppliers": suppliers, "dependencies": dependencies, "alerts": alerts}
+
+
+def _records(columns):
+    names = list(columns)
+    values = [v.tolist() if isinstance(v, np.ndarray) else v for v in columns.values()]
+    return [dict(zip(names, row)) for row in zip(*values)]
+
+
+def to_company_data(columns: dict, org: str = "techcorp") -> dict:
+    """Columns in company_data's shape: a SupplierTable plus dependency and alert dicts."""
+    alerts = _records(columns["alerts"])
+    for alert in alerts:
+        alert["triggering_factors"] = []
+    return {
+        "suppliers": SupplierTable.from_columns(columns["suppliers"]),
+        "dependencies": _records(columns["dependencies"]),
+        "alerts": alerts,
+        "profile": _CONFIGS.get(org, _CONFIGS["techcorp"])[0]["profile"],
+    }
+
+
+def generate_scaled_data(n_suppliers: int, org: str = "techcorp", **options) -> dict:
+    """A company_data-shaped dataset of `n_suppliers` suppliers (see generate_scaled_columns for options)."""
+    return to_company_data(generate_scaled_columns(n_suppliers, org=org, **options), org=org)
+
+
+# ── Disk output ────────────────────────────────────────────────────────────
+_FILES = {"suppliers": "suppliers", "dependencies": "dependencies", "alerts": "disruption_alerts"}
+
+
+def save_columns(columns: dict, directory: str, fmt: str = "csv") -> list:
+    """Write each table to `directory` (named after its Supabase table); returns the paths written."""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for key, table in _FILES.items():
+        cols = columns[key]
+        if fmt == "npz":
+            path = os.path.join(directory, f"{table}.npz")
+            np.savez_compressed(path, **{name: np.asarray(v) for name, v in cols.items()})
+        elif fmt == "csv":
+            path = os.path.join(directory, f"{table}.csv")
+            values = [v.tolist() if isinstance(v, np.ndarray) else v for v in cols.values()]
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(cols)
+                writer.writerows(zip(*values))
+        else:
+            raise ValueError("fmt must be 'csv' or 'npz'")
+        paths.append(path)
+    return paths
+
+
+def load_columns(directory: str) -> dict:
+    """Read back a dataset written with save_columns(fmt="npz")."""
+    columns = {}
+    for key, table in _FILES.items():
+        with np.load(os.path.join(directory, f"{table}.npz")) as npz:
+            columns[key] = {name: npz[name] if npz[name].dtype.kind != "U" else npz[name].tolist()
+                            for name in npz.files}
+    return columns
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Generate a large synthetic supply network.")
+    ap.add_argument("--suppliers", type=int, default=10_000)
+    ap.add_argument("--org", default="techcorp", choices=sorted(_CONFIGS))
+    ap.add_argument("--tiers", type=int, default=3)
+    ap.add_argument("--tier-growth", type=float, default=1.5)
+    ap.add_argument("--fan-in", type=float, default=3)
+    ap.add_argument("--fan-in-dist", default="poisson", choices=FAN_IN_DISTS)
+    ap.add_argument("--fan-out-skew", type=float, default=0.0)
+    ap.add_argument("--countries", default=None, help="e.g. CN:30,TW:20,US:50 (default: the org's mix)")
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--out", required=True, help="output directory")
+    ap.add_argument("--format", default="csv", choices=("csv", "npz"))
+    args = ap.parse_args()
+
+    countries = None
+    if args.countries:
+        countries = {code.strip().upper(): float(w) for code, w in (p.split(":") for p in args.countries.split(","))}
+    t0 = time.perf_counter()
+    columns = generate_scaled_columns(args.suppliers, org=args.org, tiers=args.tiers, tier_growth=args.tier_growth,
+                                      fan_in=args.fan_in, fan_in_dist=args.fan_in_dist,
+                                      fan_out_skew=args.fan_out_skew, countries=countries, seed=args.seed)
+    generated = time.perf_counter() - t0
+    paths = save_columns(columns, args.out, args.format)
+    print(f"{len(columns['suppliers']['id'])} suppliers, {len(columns['dependencies']['id'])} dependencies, "
+          f"{len(columns['alerts']['id'])} alerts in {generated:.2f}s -> {', '.join(paths)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,469 @@
+"""
+Columnar supplier store.
+
+A SupplierTable holds one array per supplier field instead of one dict per
+supplier. Numeric fields are NumPy arrays of the narrowest dtype that fits,
+low-cardinality strings (country, industry, component) are interned to
+small integer codes, and other text is kept Arrow-style as one UTF-8
+buffer plus offsets. Indexing or iterating yields SupplierRow views, which
+read and write the columns in place and behave like the supplier dicts they
+replace, so engines written against dicts keep working while hot paths take
+whole columns without copying.
+"""
+import numbers
+import sys
+from collections.abc import MutableMapping, Sequence
+
+import numpy as np
+
+INTERNED = ("country_code", "country_name", "industry", "component")
+_NO_ROWS = np.empty(0, dtype=np.int64)
+_INT_DTYPES = (np.int8, np.int16, np.int32, np.int64)
+_CODE_DTYPES = (np.uint8, np.uint16, np.int32)
+
+
+def _fit(dtypes, lo, hi):
+    """Narrowest integer dtype holding [lo, hi]."""
+    for dtype in dtypes:
+        info = np.iinfo(dtype)
+        if info.min <= lo and hi <= info.max:
+            return dtype
+    return dtypes[-1]
+
+
+def _infer(name, values):
+    """Storage kind for a column from its values: num, interned, text or object."""
+    types = {type(v) for v in values}
+    if types and types <= {bool}:
+        return "num"
+    if types and types <= {int, float}:
+        return "num"
+    if types and types <= {str}:
+        return "interned" if name in INTERNED else "text"
+    return "object"
+
+
+def _norm(value):
+    """Index key of a value: strings match case-insensitively."""
+    return value.casefold() if isinstance(value, str) else value
+
+
+def _grow(arr, size):
+    """`arr` with capacity for at least `size` elements."""
+    if len(arr) >= size:
+        return arr
+    grown = np.zeros(max(8, 2 * len(arr), size), dtype=arr.dtype)
+    grown[:len(arr)] = arr
+    return grown
+
+
+class SupplierRow(MutableMapping):
+    """Dict-like view of one SupplierTable row; stays on its supplier while other rows are removed."""
+
+    __slots__ = ("_table", "_row", "_id", "_generation")
+
+    def __init__(self, table, row, supplier_id=None):
+        self._table = table
+        self._row = row
+        self._id = table._getters["id"](row) if supplier_id is None else supplier_id
+        self._generation = table._generation
+
+    def _r(self):
+        table = self._table
+        if self._generation != table._generation:
+            row = table.index_of(self._id)
+            if row is None:
+                raise KeyError("supplier was removed")
+            self._row, self._generation = row, table._generation
+        return self._row
+
+    def __getitem__(self, key):
+        getter = self._table._getters.get(key)
+        if getter is None:
+            raise KeyError(key)
+        return getter(self._r())
+
+    def __setitem__(self, key, value):
+        if key == "id":
+            raise TypeError("supplier ids are immutable")
+        self._table.set(self._r(), key, value)
+
+    def __delitem__(self, key):
+        raise TypeError("SupplierTable columns cannot be removed per row")
+
+    def __iter__(self):
+        return iter(self._table._names)
+
+    def __len__(self):
+        return len(self._table._names)
+
+    def copy(self):
+        return dict(self)
+
+    def __repr__(self):
+        return f"SupplierRow({dict(self)!r})"
+
+
+class SupplierTable(Sequence):
+    """Suppliers stored column by column; a sequence of SupplierRow views."""
+
+    def __init__(self):
+        self._n = 0
+        self._names = []          # field order, as in the source dicts
+        self._kinds = {}          # name -> "num" | "interned" | "text" | "object"
+        self._arrays = {}         # num: values; interned: codes; text: offsets (all with spare capacity)
+        self._labels = {}         # interned: code -> string
+        self._label_code = {}     # interned: string -> code
+        self._blobs = {}          # text: UTF-8 bytes of every row back to back
+        self._objects = {}        # object: list
+        self._getters = {}
+        self._row_of = None       # supplier id -> row, built on first lookup
+        self._generation = 0      # bumped by every removal; views re-resolve their row by id when it moves
+        self._postings = {}       # column -> {value: rows in id order}, built on first lookup
+        self._by_id = None        # (rows in id order, ids ascending), built on first lookup
+
+    # ── construction ───────────────────────────────────────────────────────
+    @classmethod
+    def from_records(cls, records):
+        records = list(records)
+        names = list(dict.fromkeys(k for r in records for k in r))
+        return cls.from_columns({name: [r.get(name) for r in records] for name in names})
+
+    @classmethod
+    def from_columns(cls, columns):
+        """Build from {name: values}; values may be lists or NumPy arrays of equal length."""
+        table = cls()
+        lengths = {len(v) for v in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError("columns have different lengths")
+        table._n = lengths.pop() if lengths else 0
+        for name, values in columns.items():
+            if isinstance(values, np.ndarray) and values.dtype != object:
+                kind = "num"
+            else:
+                values = list(values)
+                kind = _infer(name, values)
+            table._add_column(name, kind, values)
+        return table
+
+    def _add_column(self, name, kind, values):
+        if name not in self._kinds:
+            self._names.append(name)
+        self._postings.pop(name, None)
+        for store in (self._arrays, self._labels, self._label_code, self._blobs, self._objects):
+            store.pop(name, None)
+        self._kinds[name] = kind
+        if kind == "num":
+            arr = np.asarray(values)
+            if arr.dtype.kind in "iu" and len(arr):
+                arr = arr.astype(_fit(_INT_DTYPES, int(arr.min()), int(arr.max())))
+            self._arrays[name] = arr.copy()
+        elif kind == "interned":
+            codes = {}
+            idx = [codes.setdefault(v, len(codes)) for v in values]
+            self._labels[name], self._label_code[name] = list(codes), codes
+            self._arrays[name] = np.asarray(idx, dtype=_fit(_CODE_DTYPES, 0, len(codes)))
+        elif kind == "text":
+            encoded = [v.encode() for v in values]
+            offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+            np.cumsum([len(b) for b in encoded], out=offsets[1:])
+            self._blobs[name] = bytearray(b"".join(encoded))
+            self._arrays[name] = offsets
+        else:
+            self._objects[name] = list(values)
+        self._getters[name] = self._make_getter(name, kind)
+
+    def _make_getter(self, name, kind):
+        arrays, objects = self._arrays, self._objects
+        if kind == "num":
+            return lambda r: arrays[name].item(r)
+        if kind == "interned":
+            labels = self._labels[name]
+            return lambda r: labels[arrays[name].item(r)]
+        if kind == "text":
+            blob = self._blobs[name]
+            def text(r):
+                offsets = arrays[name]
+                return blob[offsets.item(r):offsets.item(r + 1)].decode()
+            return text
+        return lambda r: objects[name][r]
+
+    def _to_object(self, name):
+        self._add_column(name, "object", self._column_list(name))
+
+    # ── sequence protocol ──────────────────────────────────────────────────
+    def __len__(self):
+        return self._n
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [SupplierRow(self, r) for r in range(*i.indices(self._n))]
+        if i < 0:
+            i += self._n
+        if not 0 <= i < self._n:
+            raise IndexError("supplier row out of range")
+        return SupplierRow(self, i)
+
+    def __iter__(self):
+        for r, sid in enumerate(self.ids()):
+            yield SupplierRow(self, r, sid)
+
+    def __eq__(self, other):
+        if isinstance(other, (SupplierTable, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = object.__hash__   # identity, like the lists it replaces (snapshots key on it)
+
+    # ── columns ────────────────────────────────────────────────────────────
+    @property
+    def columns(self):
+        return list(self._names)
+
+    def column(self, name):
+        """A column as a NumPy array; numeric columns are zero-copy views (valid until the table changes)."""
+        kind = self._kinds[name]
+        if kind == "num":
+            return self._arrays[name][:self._n]
+        if kind == "interned":
+            return np.asarray(self._labels[name], dtype=object)[self._arrays[name][:self._n]]
+        return np.asarray(self._column_list(name), dtype=object)
+
+    def codes(self, name):
+        """(labels, codes view) of an interned column."""
+        return self._labels[name], self._arrays[name][:self._n]
+
+    def _column_list(self, name):
+        kind = self._kinds[name]
+        if kind == "num":
+            return self._arrays[name][:self._n].tolist()
+        if kind == "interned":
+            labels = self._labels[name]
+            return [labels[c] for c in self._arrays[name][:self._n].tolist()]
+        if kind == "text":
+            blob, offsets = self._blobs[name], self._arrays[name][:self._n + 1].tolist()
+            return [blob[a:b].decode() for a, b in zip(offsets, offsets[1:])]
+        return list(self._objects[name])
+
+    def values(self, name):
+        """A column as a Python list."""
+        return self._column_list(name)
+
+    def ids(self):
+        return self._column_list("id")
+
+    def _index(self):
+        if self._row_of is None:
+            self._row_of = {sid: r for r, sid in enumerate(self.ids())}
+        return self._row_of
+
+    def index_of(self, supplier_id):
+        """Row of a supplier id, or None."""
+        return self._index().get(supplier_id)
+
+    def get_row(self, supplier_id):
+        r = self.index_of(supplier_id)
+        return None if r is None else SupplierRow(self, r)
+
+    # ── secondary indexes ──────────────────────────────────────────────────
+    # Inverted indexes per column, kept on the table and dropped by the
+    # mutation methods below (a column's on set, all of them on append or
+    # removal), then rebuilt with one vectorized pass on the next query.
+
+    def id_order(self):
+        """(rows sorted by supplier id, those ids ascending) as arrays."""
+        if self._by_id is None:
+            ids = np.asarray(self.ids(), dtype=np.int64)
+            order = np.argsort(ids, kind="stable")
+            self._by_id = (order, ids[order])
+        return self._by_id
+
+    def postings(self, name, value):
+        """Rows whose `name` equals `value` (strings case-insensitively), in id order."""
+        index = self._postings.get(name)
+        if index is None:
+            index = self._postings[name] = self._build_postings(name)
+        return index.get(_norm(value), _NO_ROWS)
+
+    def _build_postings(self, name):
+        kind = self._kinds[name]
+        if kind == "interned":
+            labels, codes = self.codes(name)
+        elif kind == "num":
+            labels, codes = np.unique(self.column(name), return_inverse=True)
+            labels = labels.tolist()
+        else:
+            seen = {}
+            codes = np.fromiter((seen.setdefault(v, len(seen)) for v in self._column_list(name)), np.int64, self._n)
+            labels = list(seen)
+        groups = {}
+        group_of = np.array([groups.setdefault(_norm(v), len(groups)) for v in labels], dtype=np.int64)
+        rows, _ = self.id_order()
+        group = group_of[np.asarray(codes).reshape(-1)[rows]] if self._n else np.empty(0, dtype=np.int64)
+        by_group = rows[np.argsort(group, kind="stable")]   # stable: id order within each value
+        bounds = np.concatenate(([0], np.cumsum(np.bincount(group, minlength=len(groups)))))
+        return {key: by_group[bounds[g]:bounds[g + 1]] for key, g in groups.items()}
+
+    def matches(self, name, value, rows):
+        """Boolean mask over `rows`: does `name` equal `value` (strings case-insensitively)?"""
+        rows = np.asarray(rows, dtype=np.int64)
+        kind, key = self._kinds[name], _norm(value)
+        if kind == "interned":
+            labels, codes = self.codes(name)
+            allowed = np.fromiter((_norm(v) == key for v in labels), bool, len(labels))
+            return allowed[codes[rows]]
+        if kind == "num":
+            return self._arrays[name][rows] == value
+        getter = self._getters[name]
+        return np.fromiter((_norm(getter(r)) == key for r in rows.tolist()), bool, len(rows))
+
+    def to_dicts(self, rows=None):
+        """Materialize rows (all by default) as plain dicts, one column pass per field."""
+        names = self._names
+        if rows is None:
+            cols = [self._column_list(n) for n in names]
+            return [dict(zip(names, vals)) for vals in zip(*cols)]
+        getters = [self._getters[n] for n in names]
+        return [dict(zip(names, (g(r) for g in getters))) for r in rows]
+
+    # ── mutation ───────────────────────────────────────────────────────────
+    def set(self, r, name, value):
+        self._postings.pop(name, None)
+        if name not in self._kinds:
+            self._add_column(name, "object", [None] * self._n)
+        kind = self._kinds[name]
+        if kind == "num":
+            if self._set_num(r, name, value):
+                return
+        elif kind == "interned":
+            if isinstance(value, str):
+                codes = self._label_code[name]
+                code = codes.get(value)
+                if code is None:
+                    code = codes[value] = len(self._labels[name])
+                    self._labels[name].append(value)
+                    arr = self._arrays[name]
+                    if code > np.iinfo(arr.dtype).max:
+                        self._arrays[name] = arr.astype(np.int32)
+                self._arrays[name][r] = code
+                return
+        elif kind == "text":
+            if isinstance(value, str):
+                blob, offsets = self._blobs[name], self._arrays[name]
+                a, b = offsets.item(r), offsets.item(r + 1)
+                encoded = value.encode()
+                blob[a:b] = encoded
+                offsets[r + 1:self._n + 1] += len(encoded) - (b - a)
+                return
+        else:
+            self._objects[name][r] = value
+            return
+        self._to_object(name)
+        self._objects[name][r] = value
+
+    def _set_num(self, r, name, value):
+        """Store a number, widening the column's dtype if needed; False if `value` is not a number for it."""
+        arr = self._arrays[name]
+        kind, is_bool = arr.dtype.kind, isinstance(value, (bool, np.bool_))
+        if kind == "b":
+            if not is_bool:
+                return False
+        elif is_bool or not isinstance(value, numbers.Real):   # NumPy scalars register as Real
+            return False
+        elif kind == "i":
+            if not isinstance(value, numbers.Integral) and not float(value).is_integer():
+                arr = self._arrays[name] = arr.astype(np.float64)
+            else:
+                value = int(value)
+                info = np.iinfo(arr.dtype)
+                if not info.min <= value <= info.max:
+                    arr = self._arrays[name] = arr.astype(np.int64)
+        arr[r] = value
+        return True
+
+    def append(self, record):
+        """Add a supplier at the end; columns missing from `record` get None."""
+        r = self._n
+        self._postings.clear()
+        self._by_id = None
+        for name in record:
+            if name not in self._kinds:
+                self._add_column(name, "object", [None] * r)
+        for name in self._names:
+            kind = self._kinds[name]
+            if kind == "object":
+                self._objects[name].append(None)
+            elif kind == "text":
+                offsets = self._arrays[name] = _grow(self._arrays[name], r + 2)
+                offsets[r + 1] = offsets[r]   # empty string until set below
+            else:
+                self._arrays[name] = _grow(self._arrays[name], r + 1)
+        self._n = r + 1
+        for name in self._names:
+            value = record.get(name)
+            if value is None:
+                if self._kinds[name] != "object":
+                    self._to_object(name)
+                self._objects[name][r] = None
+            else:
+                self.set(r, name, value)
+        if self._row_of is not None:
+            self._row_of[record["id"]] = r
+        return SupplierRow(self, r, record["id"])
+
+    def pop(self, i=-1):
+        """Remove a row and return it as a plain dict."""
+        if i < 0:
+            i += self._n
+        record = dict(SupplierRow(self, i))
+        n = self._n
+        self._postings.clear()
+        self._by_id = None
+        for name in self._names:
+            kind = self._kinds[name]
+            if kind == "object":
+                del self._objects[name][i]
+            elif kind == "text":
+                offsets = self._arrays[name]
+                a, b = offsets.item(i), offsets.item(i + 1)
+                del self._blobs[name][a:b]
+                offsets[i + 1:n] = offsets[i + 2:n + 1] - (b - a)
+            else:
+                arr = self._arrays[name]
+                arr[i:n - 1] = arr[i + 1:n]
+        self._n -= 1
+        self._generation += 1
+        if self._row_of is not None:
+            del self._row_of[record["id"]]
+            for sid in self._column_list("id")[i:]:
+                self._row_of[sid] -= 1
+        return record
+
+    def __delitem__(self, i):
+        self.pop(i)
+
+    # ── size ───────────────────────────────────────────────────────────────
+    @property
+    def nbytes(self):
+        """Approximate memory held by the table's columns."""
+        total = sum(a.nbytes for a in self._arrays.values())
+        total += sum(sys.getsizeof(b) for b in self._blobs.values())
+        for labels in self._labels.values():
+            total += sys.getsizeof(labels) + sum(sys.getsizeof(s) for s in labels)
+        for values in self._objects.values():
+            total += sys.getsizeof(values) + sum(sys.getsizeof(v) for v in values if type(v) not in (bool, type(None)))
+        return total
+
+
+def column_values(suppliers, name):
+    """One field of every supplier as a list, for SupplierTables and lists of dicts alike."""
+    if isinstance(suppliers, SupplierTable):
+        return suppliers.values(name)
+    return [s[name] for s in suppliers]
+
+
+def row_dicts(suppliers, rows):
+    """Plain dict copies of the suppliers at `rows`, for SupplierTables and lists of dicts alike."""
+    if isinstance(suppliers, SupplierTable):
+        return suppliers.to_dicts(rows)
+    return [dict(suppliers[r]) for r in rows]
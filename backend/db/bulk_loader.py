@@ -0,0 +1,174 @@
+"""
+Streaming bulk loader for the Supabase tables.
+
+Rows are pulled from any (async) iterable — the synthetic generators, or a
+CSV / Parquet upload read chunk by chunk — cut into batches and upserted
+with up to `concurrency` batches in flight. Upserts are keyed by each
+table's primary key, so a load that fails halfway is finished by simply
+running it again, and re-running a complete load changes nothing.
+"""
+import asyncio
+import codecs
+import csv
+import os
+import time
+
+BATCH_SIZE = int(os.getenv("RESILIO_LOAD_BATCH_SIZE", "1000"))
+CONCURRENCY = int(os.getenv("RESILIO_LOAD_CONCURRENCY", "8"))
+
+# table -> (conflict key, column types); columns and keys as in db/schema.sql
+TABLES = {
+    "suppliers": (("org", "id"), {
+        "org": str, "id": int, "name": str, "tier": int, "country_code": str, "country_name": str,
+        "industry": str, "component": str, "lat": float, "lng": float,
+        "geographic_risk": float, "financial_risk": float, "annual_revenue_m": int, "employees": int,
+        "years_operating": int, "certifications": int, "on_time_delivery_pct": float, "is_active": bool,
+    }),
+    "dependencies": (("org", "id"), {
+        "org": str, "id": int, "from_supplier_id": int, "to_supplier_id": int, "component": str,
+        "volume_percent": int, "criticality": str,
+    }),
+    "disruption_alerts": (("org", "id"), {
+        "org": str, "id": int, "supplier_id": int, "supplier_name": str, "country_code": str,
+        "alert_type": str, "probability": int, "severity": str, "expected_days": int,
+        "affected_component": str, "impact_description": str,
+    }),
+    "country_risk": (("country_code",), {
+        "country_code": str, "country_name": str, "political_risk": int, "weather_risk": int,
+        "economic_risk": int, "trade_restriction_risk": int, "port_congestion_risk": int,
+    }),
+}
+LOAD_ORDER = ("suppliers", "dependencies", "disruption_alerts", "country_risk")   # foreign keys first
+
+
+def _bool(value):
+    return value.strip().lower() in ("1", "true", "t", "yes") if isinstance(value, str) else bool(value)
+
+
+def _coerce(value, kind):
+    if value is None or value == "":
+        return None
+    if kind is bool:
+        return _bool(value)
+    if kind is int and isinstance(value, str):
+        return int(float(value))
+    return kind(value)
+
+
+async def _aiter(rows):
+    if hasattr(rows, "__aiter__"):
+        async for row in rows:
+            yield row
+    else:
+        for row in rows:
+            yield row
+
+
+async def load_table(repository, table, rows, org=None, batch_size=BATCH_SIZE, concurrency=CONCURRENCY) -> dict:
+    """Upsert every row of `rows` into `table`; returns row/batch counts and throughput.
+
+    Rows are projected onto the table's columns and coerced to their types,
+    and `org` (if given) is stamped on each. At most `concurrency` batches
+    are in flight, so memory stays bounded however long the stream is.
+    """
+    keys, columns = TABLES[table]
+    on_conflict = ",".join(keys)
+    slots = asyncio.Semaphore(concurrency)
+    in_flight = set()
+    n_rows = n_batches = 0
+    start = time.perf_counter()
+
+    async def send(batch):
+        try:
+            await repository.upsert(table, batch, on_conflict)
+        finally:
+            slots.release()
+
+    async def flush(batch):
+        nonlocal n_batches
+        await slots.acquire()
+        for task in [t for t in in_flight if t.done()]:
+            in_flight.discard(task)
+            task.result()   # surface a failed batch before sending more
+        in_flight.add(asyncio.ensure_future(send(batch)))
+        n_batches += 1
+
+    batch = []
+    try:
+        async for row in _aiter(rows):
+            if org is not None:
+                row = {**row, "org": org}
+            batch.append({c: _coerce(row.get(c), kind) for c, kind in columns.items() if c in row})
+            n_rows += 1
+            if len(batch) >= batch_size:
+                await flush(batch)
+                batch = []
+        if batch:
+            await flush(batch)
+        await asyncio.gather(*in_flight)
+    except BaseException:
+        for task in in_flight:
+            task.cancel()
+        raise
+
+    seconds = time.perf_counter() - start
+    return {"table": table, "rows": n_rows, "batches": n_batches, "seconds": round(seconds, 3),
+            "rows_per_s": round(n_rows / seconds) if seconds > 0 else None}
+
+
+async def load_dataset(repository, tables, org=None, batch_size=BATCH_SIZE, concurrency=CONCURRENCY) -> dict:
+    """Load {table: rows} in foreign-key order. Stops at the first failing table and reports it."""
+    results = {}
+    for table in LOAD_ORDER:
+        if table not in tables:
+            continue
+        try:
+            results[table] = await load_table(repository, table, tables[table], org=org,
+                                              batch_size=batch_size, concurrency=concurrency)
+        except Exception as e:
+            results[table] = {"table": table, "error": str(e)}
+            break
+    return results
+
+
+# ── Upload parsing ─────────────────────────────────────────────────────────
+
+async def iter_csv(chunks, encoding="utf-8"):
+    """Dicts from a CSV byte stream with a header row, parsed as the chunks arrive."""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    header, pending, quotes, tail = None, [], 0, ""
+
+    def records(lines):
+        nonlocal quotes
+        for line in lines:
+            pending.append(line)
+            quotes += line.count('"')
+            if quotes % 2:
+                continue   # a quoted field runs on to the next line
+            text = "\n".join(pending).rstrip("\r")
+            pending.clear()
+            quotes = 0
+            if text:
+                yield next(csv.reader([text]))
+
+    async for chunk in _aiter(chunks):
+        lines = (tail + decoder.decode(chunk)).split("\n")
+        tail = lines.pop()
+        for values in records(lines):
+            if header is None:
+                header = values
+            else:
+                yield dict(zip(header, values))
+    for values in records([tail + decoder.decode(b"", final=True)]):
+        if header is None:
+            header = values
+        else:
+            yield dict(zip(header, values))
+
+
+def iter_parquet(data: bytes, batch_size=BATCH_SIZE):
+    """Dicts from a Parquet file, read one record batch at a time. Requires pyarrow (ImportError otherwise)."""
+    import io
+    import pyarrow.parquet as pq
+    batches = pq.ParquetFile(io.BytesIO(data)).iter_batches(batch_size=batch_size)
+    return (row for record_batch in batches for row in record_batch.to_pylist())
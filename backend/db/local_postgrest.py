@@ -0,0 +1,97 @@
+"""
+In-process PostgREST stand-in backed by SQLite, for exercising db.repository
+without a Supabase project.
+
+Serves the subset of the PostgREST API the backend uses through an
+httpx.MockTransport: GET with `col=eq.value` filters, `order`, `limit`,
+`offset` and `Prefer: count=exact`; POST upserts (`on_conflict` +
+`Prefer: resolution=merge-duplicates`); DELETE with the same filters.
+Rows are stored as JSON so they come back with the types they went in with.
+
+    stub = LocalPostgrest({"suppliers": ("org", "id")})
+    repo = PostgrestRepository("http://stub", "key", transport=stub.transport)
+"""
+import json
+import sqlite3
+import threading
+
+import httpx
+
+_OPS = {"eq": "=", "neq": "!=", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+_RESERVED = {"select", "order", "limit", "offset", "on_conflict"}
+
+
+def _literal(value):
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return {"true": 1, "false": 0}.get(value, value)
+
+
+class LocalPostgrest:
+    """A PostgREST-shaped HTTP API over an in-memory SQLite database."""
+
+    def __init__(self, primary_keys):
+        self.primary_keys = dict(primary_keys)   # table -> tuple of key columns
+        self.db = sqlite3.connect(":memory:", check_same_thread=False)
+        self.lock = threading.Lock()
+        self.requests = []                        # (method, table) log, for round-trip assertions
+        for table in self.primary_keys:
+            self.db.execute(f'CREATE TABLE "{table}" (key TEXT PRIMARY KEY, row TEXT NOT NULL)')
+        self.transport = httpx.MockTransport(self.handle)
+
+    def insert(self, table, rows):
+        """Upsert rows directly, bypassing HTTP."""
+        keys = self.primary_keys[table]
+        with self.lock, self.db:
+            self.db.executemany(
+                f'INSERT INTO "{table}" (key, row) VALUES (?, ?) '
+                f'ON CONFLICT(key) DO UPDATE SET row = json_patch(row, excluded.row)',
+                [(json.dumps([r[k] for k in keys]), json.dumps(r)) for r in rows])
+
+    def _where(self, params):
+        clauses, args = [], []
+        for col, expr in params.multi_items():
+            if col in _RESERVED:
+                continue
+            op, _, value = expr.partition(".")
+            clauses.append(f"json_extract(row, '$.{col}') {_OPS[op]} ?")
+            args.append(_literal(value))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", args
+
+    def handle(self, request):
+        table = request.url.path.rstrip("/").rsplit("/", 1)[-1]
+        self.requests.append((request.method, table))
+        if table not in self.primary_keys:
+            return httpx.Response(404, json={"code": "42P01", "message": f'relation "{table}" does not exist'})
+        params = request.url.params
+        where, args = self._where(params)
+
+        if request.method == "POST":
+            rows = json.loads(request.content)
+            self.insert(table, rows if isinstance(rows, list) else [rows])
+            return httpx.Response(201)
+
+        if request.method == "DELETE":
+            with self.lock, self.db:
+                self.db.execute(f'DELETE FROM "{table}"{where}', args)
+            return httpx.Response(204)
+
+        order = ""
+        if "order" in params:
+            terms = []
+            for term in params["order"].split(","):
+                col, _, direction = term.partition(".")
+                terms.append(f"json_extract(row, '$.{col}') {'DESC' if direction == 'desc' else 'ASC'}")
+            order = " ORDER BY " + ", ".join(terms)
+        page = f" LIMIT {int(params.get('limit', -1))} OFFSET {int(params.get('offset', 0))}"
+        with self.lock:
+            rows = [json.loads(r) for (r,) in self.db.execute(f'SELECT row FROM "{table}"{where}{order}{page}', args)]
+            total = "*"
+            if "count=exact" in request.headers.get("prefer", ""):
+                total = self.db.execute(f'SELECT COUNT(*) FROM "{table}"{where}', args).fetchone()[0]
+        start = int(params.get("offset", 0))
+        span = f"{start}-{start + len(rows) - 1}" if rows else "*"
+        return httpx.Response(200, json=rows, headers={"Content-Range": f"{span}/{total}"})
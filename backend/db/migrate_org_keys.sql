@@ -0,0 +1,45 @@
+-- ============================================================
+-- Upgrade a database created from the original single-org schema.sql
+-- (tables keyed by id alone) to org-scoped keys (org, id).
+-- Existing rows are assigned to the 'techcorp' org. Safe to re-run.
+-- Run this in your Supabase SQL Editor before seeding with the bulk loader:
+-- its upserts use on_conflict=org,id and fail without these keys.
+-- ============================================================
+
+BEGIN;
+
+ALTER TABLE suppliers         ADD COLUMN IF NOT EXISTS org TEXT NOT NULL DEFAULT 'techcorp';
+ALTER TABLE dependencies      ADD COLUMN IF NOT EXISTS org TEXT NOT NULL DEFAULT 'techcorp';
+ALTER TABLE disruption_alerts ADD COLUMN IF NOT EXISTS org TEXT NOT NULL DEFAULT 'techcorp';
+
+-- Foreign keys depend on the suppliers key: drop them (old and new names) before replacing it
+ALTER TABLE dependencies      DROP CONSTRAINT IF EXISTS dependencies_from_supplier_id_fkey;
+ALTER TABLE dependencies      DROP CONSTRAINT IF EXISTS dependencies_to_supplier_id_fkey;
+ALTER TABLE dependencies      DROP CONSTRAINT IF EXISTS dependencies_org_from_supplier_id_fkey;
+ALTER TABLE dependencies      DROP CONSTRAINT IF EXISTS dependencies_org_to_supplier_id_fkey;
+ALTER TABLE disruption_alerts DROP CONSTRAINT IF EXISTS disruption_alerts_supplier_id_fkey;
+ALTER TABLE disruption_alerts DROP CONSTRAINT IF EXISTS disruption_alerts_org_supplier_id_fkey;
+
+ALTER TABLE suppliers         DROP CONSTRAINT IF EXISTS suppliers_pkey;
+ALTER TABLE suppliers         ADD PRIMARY KEY (org, id);
+ALTER TABLE dependencies      DROP CONSTRAINT IF EXISTS dependencies_pkey;
+ALTER TABLE dependencies      ADD PRIMARY KEY (org, id);
+ALTER TABLE disruption_alerts DROP CONSTRAINT IF EXISTS disruption_alerts_pkey;
+ALTER TABLE disruption_alerts ADD PRIMARY KEY (org, id);
+
+-- Networks may have any number of tiers
+ALTER TABLE suppliers DROP CONSTRAINT IF EXISTS suppliers_tier_check;
+ALTER TABLE suppliers ADD CONSTRAINT suppliers_tier_check CHECK (tier >= 1);
+
+ALTER TABLE dependencies ALTER COLUMN from_supplier_id SET NOT NULL;
+ALTER TABLE dependencies ALTER COLUMN to_supplier_id SET NOT NULL;
+ALTER TABLE disruption_alerts ALTER COLUMN supplier_id SET NOT NULL;
+
+ALTER TABLE dependencies ADD CONSTRAINT dependencies_org_from_supplier_id_fkey
+    FOREIGN KEY (org, from_supplier_id) REFERENCES suppliers(org, id);
+ALTER TABLE dependencies ADD CONSTRAINT dependencies_org_to_supplier_id_fkey
+    FOREIGN KEY (org, to_supplier_id) REFERENCES suppliers(org, id);
+ALTER TABLE disruption_alerts ADD CONSTRAINT disruption_alerts_org_supplier_id_fkey
+    FOREIGN KEY (org, supplier_id) REFERENCES suppliers(org, id);
+
+COMMIT;
@@ -1,5 +1,5 @@
-"""Shared FastAPI dependency: extracts org_id from X-Org-ID header."""
-from fastapi import Header
+"""Shared FastAPI dependencies: org_id from the X-Org-ID header, and that org's dataset loaded."""
+from fastapi import Depends, Header
 
 def get_org(x_org_id: str = Header(default="techcorp")) -> str:
     """
@@ -9,3 +9,9 @@ def get_org(x_org_id: str = Header(default="techcorp")) -> str:
     valid_orgs = {"techcorp", "pharma", "auto"}
     org = x_org_id.lower() if x_org_id else "techcorp"
     return org if org in valid_orgs else "techcorp"
+
+async def get_loaded_org(org: str = Depends(get_org)) -> str:
+    """get_org, after making sure the org's dataset is loaded from the configured source (see db.repository)."""
+    from db.repository import ensure_loaded
+    await ensure_loaded(org)
+    return org
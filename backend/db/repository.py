@@ -0,0 +1,177 @@
+"""
+Async data access for org datasets.
+
+With RESILIO_DATA_SOURCE=supabase an org's suppliers, dependencies, alerts
+and country risk are read from Supabase over its PostgREST API, through one
+pooled httpx.AsyncClient. The first page of every table is requested in a
+single asyncio.gather wave (with an exact row count), and any remaining
+pages in a second wave, so a cold load costs one or two round trips no
+matter how many tables or pages there are. If the database is unreachable
+or holds no suppliers for the org, the synthetic dataset is used instead.
+
+The default source is the synthetic generator (data.company_data), which
+needs no network at all.
+"""
+import asyncio
+import os
+
+import httpx
+
+from data import company_data
+
+DATA_SOURCE = os.getenv("RESILIO_DATA_SOURCE", "synthetic")   # synthetic | supabase
+PAGE_SIZE = int(os.getenv("RESILIO_DB_PAGE_SIZE", "1000"))     # Supabase's default max-rows
+MAX_CONNECTIONS = int(os.getenv("RESILIO_DB_MAX_CONNECTIONS", "20"))
+TIMEOUT_S = float(os.getenv("RESILIO_DB_TIMEOUT_S", "10"))
+
+ORG_TABLES = {"suppliers": "id", "dependencies": "id", "disruption_alerts": "id"}
+SHARED_TABLES = {"country_risk": "country_code"}
+_DB_ONLY = ("org", "created_at", "updated_at")
+
+
+class PostgrestRepository:
+    """Reads and upserts org datasets through a PostgREST endpoint (Supabase's /rest/v1)."""
+
+    def __init__(self, url, key, transport=None, page_size=PAGE_SIZE):
+        self.base_url = url.rstrip("/") + "/rest/v1"
+        self.headers = {"apikey": key, "Authorization": f"Bearer {key}"}
+        self.page_size = page_size
+        self._transport = transport
+        self._client = None
+        self._client_loop = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Pooled client, recreated if the event loop it was opened on has changed."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url, headers=self.headers, transport=self._transport,
+                limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS),
+                timeout=TIMEOUT_S,
+            )
+            self._client_loop = loop
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _page(self, table, params, offset, count=False):
+        headers = {"Prefer": "count=exact"} if count else {}
+        r = await self.client.get(f"/{table}", params={**params, "limit": self.page_size, "offset": offset},
+                                  headers=headers)
+        r.raise_for_status()
+        total = r.headers.get("content-range", "*/*").rsplit("/", 1)[-1]
+        return r.json(), int(total) if total.isdigit() else None
+
+    async def fetch_tables(self, queries) -> dict:
+        """Fetch every row of several tables: {table: params} -> {table: rows}."""
+        tables = list(queries)
+        first = await asyncio.gather(*(self._page(t, queries[t], 0, count=True) for t in tables))
+        rows = {t: list(page) for t, (page, _) in zip(tables, first)}
+        rest = [(t, offset) for t, (_, total) in zip(tables, first) if total
+                for offset in range(self.page_size, total, self.page_size)]
+        pages = await asyncio.gather(*(self._page(t, queries[t], offset) for t, offset in rest))
+        for (t, _), (page, _) in zip(rest, pages):
+            rows[t].extend(page)
+        # No row count from the server: keep paging while pages come back full
+        for t, (page, total) in zip(tables, first):
+            offset = len(page)
+            while total is None and offset and offset % self.page_size == 0:
+                page, _ = await self._page(t, queries[t], offset)
+                if not page:
+                    break
+                rows[t].extend(page)
+                offset += len(page)
+        return rows
+
+    async def upsert(self, table, rows, on_conflict, retries=2):
+        """Insert-or-update `rows` keyed by `on_conflict` columns; idempotent, so transient failures are retried."""
+        for attempt in range(retries + 1):
+            try:
+                r = await self.client.post(
+                    f"/{table}", params={"on_conflict": on_conflict}, json=rows,
+                    headers={"Prefer": "resolution=merge-duplicates,return=minimal"})
+                if r.status_code < 500 or attempt == retries:
+                    r.raise_for_status()
+                    return
+            except httpx.TransportError:
+                if attempt == retries:
+                    raise
+            await asyncio.sleep(0.2 * 2 ** attempt)
+
+    async def load_org(self, org):
+        """An org's dataset in company_data's shape, or None if the database has no suppliers for it."""
+        queries = {t: {"select": "*", "org": f"eq.{org}", "order": key} for t, key in ORG_TABLES.items()}
+        queries.update({t: {"select": "*", "order": key} for t, key in SHARED_TABLES.items()})
+        rows = await self.fetch_tables(queries)
+        if not rows["suppliers"]:
+            return None
+        strip = lambda r: {k: v for k, v in r.items() if k not in _DB_ONLY}
+        return {
+            "suppliers": [strip(r) for r in rows["suppliers"]],
+            "dependencies": [strip(r) for r in rows["dependencies"]],
+            "alerts": [{"triggering_factors": [], **strip(r)} for r in rows["disruption_alerts"]],
+            "country_risk": [strip(r) for r in rows["country_risk"]],
+            "profile": company_data.company_profile(org),
+        }
+
+
+def synthetic_org_data(org):
+    from data.seed_data import get_data
+    data = company_data.generate_company_data(org)
+    data["country_risk"] = get_data()["country_risk"]
+    return data
+
+
+_postgrest = None
+_loading = {}
+
+
+def get_postgrest() -> PostgrestRepository:
+    """Repository for the configured Supabase project (used for writes whatever the read source)."""
+    global _postgrest
+    if _postgrest is None:
+        from db.supabase_client import SUPABASE_URL, SUPABASE_KEY
+        key = os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_ANON_KEY", SUPABASE_KEY)
+        _postgrest = PostgrestRepository(os.getenv("SUPABASE_URL", SUPABASE_URL), key)
+    return _postgrest
+
+
+def get_repository():
+    """The configured database repository, or None when serving synthetic data."""
+    return get_postgrest() if DATA_SOURCE == "supabase" else None
+
+
+async def load_org_data(org, repository=None) -> dict:
+    """Load an org's dataset from the repository, falling back to the synthetic generator."""
+    repository = repository or get_repository()
+    if repository is not None:
+        try:
+            data = await repository.load_org(org)
+            if data is not None:
+                return data
+            print(f"[Repository] No rows for org '{org}', using synthetic data")
+        except (httpx.HTTPError, ValueError) as e:
+            print(f"[Repository] Load failed for org '{org}': {e}; using synthetic data")
+    return synthetic_org_data(org)
+
+
+async def ensure_loaded(org):
+    """Make sure get_company_data(org) serves the configured source; concurrent cold loads share one fetch."""
+    if company_data.is_company_data_loaded(org):
+        return
+    if get_repository() is None:
+        company_data.get_company_data(org)
+        return
+    task = _loading.get(org)
+    if task is None or task.get_loop() is not asyncio.get_running_loop():
+        task = _loading[org] = asyncio.ensure_future(load_org_data(org))
+    try:
+        data = await task
+    finally:
+        _loading.pop(org, None)
+    if not company_data.is_company_data_loaded(org):
+        company_data.set_company_data(org, data)
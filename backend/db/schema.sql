@@ -3,11 +3,18 @@
 -- Run this in your Supabase SQL Editor (supabase.com → SQL Editor)
 -- ============================================================
 
+-- Supplier, dependency and alert rows belong to one demo org (X-Org-ID);
+-- ids are unique within an org. country_risk is shared.
+-- Tables created by an earlier version of this file (keyed by id alone) are
+-- left as they are by CREATE TABLE IF NOT EXISTS: upgrade them with
+-- migrate_org_keys.sql.
+
 -- Suppliers table
 CREATE TABLE IF NOT EXISTS suppliers (
-    id INTEGER PRIMARY KEY,
+    org TEXT NOT NULL DEFAULT 'techcorp',
+    id INTEGER NOT NULL,
     name TEXT NOT NULL,
-    tier INTEGER NOT NULL CHECK (tier IN (1, 2, 3)),
+    tier INTEGER NOT NULL CHECK (tier >= 1),
     country_code TEXT NOT NULL,
     country_name TEXT NOT NULL,
     industry TEXT NOT NULL,
@@ -22,24 +29,30 @@ CREATE TABLE IF NOT EXISTS suppliers (
     certifications INTEGER,
     on_time_delivery_pct FLOAT,
     is_active BOOLEAN DEFAULT TRUE,
-    created_at TIMESTAMPTZ DEFAULT NOW()
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (org, id)
 );
 
 -- Dependencies table
 CREATE TABLE IF NOT EXISTS dependencies (
-    id INTEGER PRIMARY KEY,
-    from_supplier_id INTEGER REFERENCES suppliers(id),
-    to_supplier_id INTEGER REFERENCES suppliers(id),
+    org TEXT NOT NULL DEFAULT 'techcorp',
+    id INTEGER NOT NULL,
+    from_supplier_id INTEGER NOT NULL,
+    to_supplier_id INTEGER NOT NULL,
     component TEXT NOT NULL,
     volume_percent INTEGER DEFAULT 50,
     criticality TEXT DEFAULT 'medium' CHECK (criticality IN ('high', 'medium', 'low')),
-    created_at TIMESTAMPTZ DEFAULT NOW()
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (org, id),
+    FOREIGN KEY (org, from_supplier_id) REFERENCES suppliers(org, id),
+    FOREIGN KEY (org, to_supplier_id) REFERENCES suppliers(org, id)
 );
 
 -- Disruption alerts table
 CREATE TABLE IF NOT EXISTS disruption_alerts (
-    id INTEGER PRIMARY KEY,
-    supplier_id INTEGER REFERENCES suppliers(id),
+    org TEXT NOT NULL DEFAULT 'techcorp',
+    id INTEGER NOT NULL,
+    supplier_id INTEGER NOT NULL,
     supplier_name TEXT NOT NULL,
     country_code TEXT NOT NULL,
     alert_type TEXT NOT NULL,
@@ -48,7 +61,9 @@ CREATE TABLE IF NOT EXISTS disruption_alerts (
     expected_days INTEGER DEFAULT 14,
     affected_component TEXT,
     impact_description TEXT,
-    created_at TIMESTAMPTZ DEFAULT NOW()
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (org, id),
+    FOREIGN KEY (org, supplier_id) REFERENCES suppliers(org, id)
 );
 
 -- Country risk table
@@ -0,0 +1,77 @@
+"""
+Alternative-supplier index for recommendations.
+
+Suppliers are bucketed by (tier, industry) and, inside each bucket, by
+country, every country list sorted by risk score. The lowest-risk
+alternatives from a different country are then a heap merge of the other
+countries' lists, each cut off by bisect at the score threshold, so a
+lookup touches only the candidates it returns instead of the whole list.
+"""
+import heapq
+from bisect import bisect_left
+
+import numpy as np
+from engines.metrics import timed
+
+
+def _prefix(scores, rows, hi):
+    for i in range(hi):
+        yield scores[i], rows[i]
+
+
+class AlternativeIndex:
+    """Suppliers grouped by (tier, industry) and by tier, per country, sorted by risk score."""
+
+    def __init__(self, table):
+        self.table = table
+        suppliers = table.suppliers
+        self.by_tier_industry = {}   # (tier, industry) -> {country: (scores, rows)}
+        self.by_tier = {}            # tier -> {country: (scores, rows)}
+        scores = table.risk_score.tolist()
+        # Stable sort: equal scores keep dataset order, like min() over the scored list
+        for r in np.argsort(table.risk_score, kind="stable").tolist():
+            s = suppliers[r]
+            for groups, key in ((self.by_tier_industry, (s["tier"], s["industry"])),
+                                (self.by_tier, s["tier"])):
+                bucket = groups.setdefault(key, {}).setdefault(s["country_code"], ([], []))
+                bucket[0].append(scores[r])
+                bucket[1].append(r)
+
+    @staticmethod
+    def _search(buckets, exclude_country, below, exclude_row, k):
+        """Up to `k` (score, row) pairs scoring under `below`, lowest first, outside one country."""
+        runs = []
+        for country, (scores, rows) in buckets.items():
+            if country == exclude_country:
+                continue
+            hi = bisect_left(scores, below)
+            if hi:
+                runs.append(_prefix(scores, rows, hi))
+        out = []
+        for score, r in heapq.merge(*runs):
+            if r != exclude_row:
+                out.append((score, r))
+                if len(out) == k:
+                    break
+        return out
+
+    def alternatives(self, row, k=1):
+        """Best `k` alternatives to supplier row `row` as (score, row) pairs.
+
+        Prefers the same tier and industry at least 10 points safer, falling
+        back to any industry in the same tier at least 15 points safer.
+        Alternatives are always in a different country.
+        """
+        table = self.table
+        s = table.suppliers[row]
+        score = float(table.risk_score[row])
+        found = self._search(self.by_tier_industry.get((s["tier"], s["industry"]), {}),
+                             s["country_code"], score - 10, row, k)
+        if not found:
+            found = self._search(self.by_tier.get(s["tier"], {}), s["country_code"], score - 15, row, k)
+        return found
+
+
+@timed
+def build_alternative_index(table) -> AlternativeIndex:
+    return AlternativeIndex(table)
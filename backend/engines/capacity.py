@@ -0,0 +1,232 @@
+"""
+Supply capacity and redundancy per tier-1 supplier, by max-flow / min-cut.
+
+Dependency edges are read as capacities: an edge u -> v carries at most
+u's volume_percent share of v's input. Raw material enters at suppliers
+with no inputs of their own, and the maximum flow that can reach a tier-1
+supplier is the share of its supply traceable to raw material through the
+network. Two cuts explain it:
+
+  * the minimum edge cut: the dependencies whose loss caps that flow, and
+  * the minimum node cut, found on a node-split copy with unit capacity
+    through each supplier, whose size is the number of node-disjoint
+    supply paths (Menger's theorem).
+
+Only a tier-1 supplier's upstream subgraph can carry flow into it, and
+those subgraphs are small next to the network. Each is laid out as its own
+disjoint block of one flow network, with a super-source feeding every
+block's raw-material suppliers and every tier-1 supplier draining into a
+super-sink. Blocks cannot exchange flow, so a single max-flow call solves
+all tier-1 suppliers at once: each one's value is the flow on its sink
+edge, and one search of the shared residual graph yields every block's
+minimum cut. Disruption scenarios re-solve just the tier-1 suppliers
+downstream of what they remove, with those suppliers taken out.
+"""
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import breadth_first_order, maximum_flow
+
+from data.supplier_table import column_values
+from engines.metrics import timed
+
+_SCALE = 100                  # scipy's max-flow needs integer capacities: volume_percent in hundredths
+_BATCH_NODES = 500_000        # upstream-subgraph nodes laid out per max-flow call
+_BATCH_FLOW = 2 ** 31 // 2    # keep a batch's total flow well inside int32
+
+
+def _ranges(starts, lengths):
+    """Concatenation of range(s, s + l) for each start/length pair."""
+    total = int(lengths.sum())
+    if not total:
+        return np.zeros(0, dtype=np.int64)
+    shift = np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+    return shift + np.arange(total)
+
+
+def _residual_reach(graph, flow, source):
+    """Nodes reachable from `source` in the residual graph of a solved max-flow."""
+    residual = (graph - flow.flow).tocsr()
+    residual.data = (residual.data > 0).astype(np.int8)
+    residual.eliminate_zeros()
+    reach = np.zeros(graph.shape[0], dtype=bool)
+    reach[breadth_first_order(residual, source, return_predecessors=False)] = True
+    return reach
+
+
+def _groups(keys, values, n_groups):
+    """`values` split into one list per key in range(n_groups)."""
+    order = np.argsort(keys, kind="stable")
+    bounds = np.searchsorted(keys[order], np.arange(n_groups + 1))
+    values = [values[i] for i in order.tolist()]
+    return [values[bounds[g]:bounds[g + 1]] for g in range(n_groups)]
+
+
+class CapacityIndex:
+    """Reverse adjacency and capacities shared by every tier-1 max-flow of one dataset version."""
+
+    def __init__(self, cg, suppliers):
+        n = cg.n_nodes
+        self.node_ids = cg.node_ids
+        self.index_of = cg.index_of
+        self._indptr, self._indices = cg._indptr, cg._indices
+        # In-edges of each node (reverse CSR) with their capacities
+        src = np.repeat(np.arange(n, dtype=np.int64), np.diff(cg.indptr))
+        order = np.argsort(cg.indices, kind="stable")
+        self.rindptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cg.indices, minlength=n), out=self.rindptr[1:])
+        self.rindices = src[order]
+        self.rcap = np.rint(cg.volume[order] * _SCALE).astype(np.int64)
+        self._rindptr, self._rindices = self.rindptr.tolist(), self.rindices.tolist()
+        self.in_degree = np.diff(self.rindptr)
+        self.in_capacity = np.bincount(np.repeat(np.arange(n), self.in_degree), weights=self.rcap, minlength=n)
+        tier_of = dict(zip(column_values(suppliers, "id"), column_values(suppliers, "tier")))
+        # Tier-1 suppliers with no tracked inputs have nothing to analyse
+        self.tier1 = np.array([i for i, sid in enumerate(self.node_ids)
+                               if tier_of.get(sid) == 1 and self.in_degree[i] > 0], dtype=np.int64)
+        self.untracked_tier1 = sum(1 for t in tier_of.values() if t == 1) - len(self.tier1)
+        self._baseline = None
+
+    def _upstream(self, t, blocked):
+        """`t` and every supplier upstream of it, in BFS order, not passing through blocked ones."""
+        rindptr, rindices = self._rindptr, self._rindices
+        order, seen = [t], {t}
+        for v in order:
+            for e in range(rindptr[v], rindptr[v + 1]):
+                p = rindices[e]
+                if p not in seen and not (blocked is not None and blocked[p]):
+                    seen.add(p)
+                    order.append(p)
+        return order
+
+    def solve(self, targets, blocked=None, cuts=False):
+        """Max flow (percent) and node-disjoint path count for each node in `targets`.
+
+        Returns (flows, paths), or with `cuts` (flows, paths, edge_cuts, node_cuts)
+        where the cuts are per-target lists of (from_id, to_id) pairs and supplier ids.
+        """
+        targets = np.asarray(targets, dtype=np.int64)
+        flows = np.zeros(len(targets))
+        paths = np.zeros(len(targets), dtype=np.int64)
+        edge_cuts = [[] for _ in range(len(targets))]
+        node_cuts = [[] for _ in range(len(targets))]
+        batch, size, cap = [], 0, 0.0
+        for j, t in enumerate(targets.tolist()):
+            nodes = self._upstream(t, blocked)
+            batch.append((j, nodes))
+            size += len(nodes)
+            cap += self.in_capacity[t]
+            if size >= _BATCH_NODES or cap >= _BATCH_FLOW:
+                self._solve_batch(batch, cuts, flows, paths, edge_cuts, node_cuts)
+                batch, size, cap = [], 0, 0.0
+        if batch:
+            self._solve_batch(batch, cuts, flows, paths, edge_cuts, node_cuts)
+        return (flows, paths, edge_cuts, node_cuts) if cuts else (flows, paths)
+
+    def _solve_batch(self, batch, cuts, flows, paths, edge_cuts, node_cuts):
+        n = len(self.node_ids)
+        sizes = np.array([len(nodes) for _, nodes in batch], dtype=np.int64)
+        total = int(sizes.sum())
+        offsets = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        nodes = np.fromiter((v for _, laid_out in batch for v in laid_out), np.int64, total)
+        block = np.repeat(np.arange(len(batch)), sizes)
+
+        # In-edges of every laid-out node, kept when their source is in the same block
+        # (it is not when a removed supplier cut the search short)
+        lengths = self.in_degree[nodes]
+        edges = _ranges(self.rindptr[nodes], lengths)
+        dst = np.repeat(np.arange(total), lengths)
+        keys = block * n + nodes
+        by_key = np.argsort(keys)
+        edge_keys = block[dst] * n + self.rindices[edges]
+        pos = np.minimum(np.searchsorted(keys[by_key], edge_keys), total - 1)
+        inside = keys[by_key][pos] == edge_keys
+        pred, dst, cap = by_key[pos][inside], dst[inside], self.rcap[edges[inside]]
+
+        # Raw material enters only at suppliers without inputs, never at ones a removal starved
+        sinks = offsets
+        is_sink = np.zeros(total, dtype=bool)
+        is_sink[sinks] = True
+        sources = np.flatnonzero((lengths == 0) & ~is_sink)
+        big = int(self.in_capacity[nodes[sinks]].max()) + 1
+
+        # Super-source S -> raw material -> ... -> tier-1 -> super-sink T
+        s, t = total, total + 1
+        graph = csr_matrix((np.concatenate((cap, np.full(len(sources), big), np.full(len(sinks), big))),
+                            (np.concatenate((pred, np.full(len(sources), s), sinks)),
+                             np.concatenate((dst, sources, np.full(len(sinks), t))))),
+                           shape=(total + 2, total + 2), dtype=np.int32)
+        flow = maximum_flow(graph, s, t, method="dinic")
+
+        # Node-split copy: x_in = x, x_out = x + total. Only x_in -> x_out (every supplier but the
+        # tier-1 sinks) has unit capacity, so a minimum cut is made of suppliers, never dependencies.
+        inner = np.flatnonzero(~is_sink)
+        wide = int(sizes.max()) + 1
+        s2, t2 = 2 * total, 2 * total + 1
+        split = csr_matrix((np.concatenate((np.full(len(pred), wide), np.ones(len(inner)),
+                                            np.full(len(sources), wide), np.full(len(sinks), wide))),
+                            (np.concatenate((pred + total, inner, np.full(len(sources), s2), sinks)),
+                             np.concatenate((dst, inner + total, sources, np.full(len(sinks), t2))))),
+                           shape=(2 * total + 2, 2 * total + 2), dtype=np.int32)
+        split_flow = maximum_flow(split, s2, t2, method="dinic")
+
+        rows = np.array([j for j, _ in batch], dtype=np.int64)
+        flows[rows] = flow.flow.getcol(t).toarray().ravel()[sinks] / _SCALE
+        paths[rows] = split_flow.flow.getcol(t2).toarray().ravel()[sinks]
+        if not cuts:
+            return
+        ids = self.node_ids
+        reach = _residual_reach(graph, flow, s)
+        cut = np.flatnonzero(reach[pred] & ~reach[dst])
+        pairs = [(ids[a], ids[b]) for a, b in zip(nodes[pred[cut]].tolist(), nodes[dst[cut]].tolist())]
+        for b, group in enumerate(_groups(block[dst[cut]], pairs, len(batch))):
+            edge_cuts[batch[b][0]] = group
+        reach = _residual_reach(split, split_flow, s2)
+        cut = inner[reach[inner] & ~reach[inner + total]]
+        for b, group in enumerate(_groups(block[cut], [ids[x] for x in nodes[cut].tolist()], len(batch))):
+            node_cuts[batch[b][0]] = group
+
+    @property
+    def baseline(self):
+        """solve(self.tier1, cuts=True) for the unmodified network."""
+        if self._baseline is None:
+            self._baseline = self.solve(self.tier1, cuts=True)
+        return self._baseline
+
+    def _downstream(self, rows):
+        """Node indices reachable from `rows`, including them."""
+        indptr, indices = self._indptr, self._indices
+        seen = set(rows)
+        stack = list(seen)
+        while stack:
+            u = stack.pop()
+            for e in range(indptr[u], indptr[u + 1]):
+                v = indices[e]
+                if v not in seen:
+                    seen.add(v)
+                    stack.append(v)
+        return seen
+
+    def lost_capacity(self, removed_ids):
+        """Tier-1 supply capacity lost when the suppliers in `removed_ids` stop supplying."""
+        rows = [self.index_of[sid] for sid in removed_ids if sid in self.index_of]
+        blocked = np.zeros(len(self.node_ids), dtype=bool)
+        blocked[rows] = True
+        flows = self.baseline[0]
+        hit = self._downstream(rows)
+        affected = np.array([j for j, t in enumerate(self.tier1.tolist()) if t in hit], dtype=np.int64)
+        after = np.zeros(len(affected))
+        still_up = ~blocked[self.tier1[affected]]
+        if still_up.any():
+            after[still_up] = self.solve(self.tier1[affected[still_up]], blocked)[0]
+        total = float(flows.sum())
+        lost = float((flows[affected] - after).sum())
+        return {
+            "tier1_affected_count": len(affected),
+            "tier1_cut_off_count": int((after == 0).sum()),
+            "lost_capacity_pct": round(lost / total * 100, 1) if total else 0.0,
+        }
+
+
+@timed
+def build_capacity_index(cg, suppliers) -> CapacityIndex:
+    return CapacityIndex(cg, suppliers)
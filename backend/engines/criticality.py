@@ -0,0 +1,9 @@
+"""
+Dependency criticality levels and the weight each gives an edge.
+
+Shared by risk scoring (inherited upstream risk) and the Monte Carlo
+disruption simulation (propagation probability), so both read an edge's
+criticality the same way.
+"""
+CRITICALITY_WEIGHT = {"high": 1.0, "medium": 0.7, "low": 0.4}
+DEFAULT_CRITICALITY_WEIGHT = CRITICALITY_WEIGHT["medium"]   # unknown levels weigh like medium
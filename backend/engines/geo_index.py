@@ -0,0 +1,159 @@
+"""
+Spatial index over supplier locations for radius and polygon queries.
+
+Suppliers are placed on the unit sphere (x, y, z from lat/lng) in a
+scipy cKDTree. A great-circle radius is the straight-line chord
+2 sin(d / 2R) between unit vectors, so "within d km of a point" is a plain
+ball query, and the antimeridian and poles need no special cases. A query
+costs O(log n) plus the number of suppliers it returns.
+
+Polygons are answered by a ball query for a cap enclosing the polygon,
+centred on the mean of its boundary, followed by an even-odd
+point-in-polygon test on just those candidates. Vertices are joined by
+straight lines in lat/lng, the way a map draws them.
+"""
+import numpy as np
+from scipy.spatial import cKDTree
+
+from data.supplier_table import column_values, row_dicts
+from engines.metrics import timed
+
+EARTH_RADIUS_KM = 6371.0088
+_EDGE_SAMPLES = 16   # points per polygon edge when sizing its enclosing cap
+
+
+def _unit(lat, lng):
+    lat, lng = np.radians(lat), np.radians(lng)
+    cos_lat = np.cos(lat)
+    return np.stack((cos_lat * np.cos(lng), cos_lat * np.sin(lng), np.sin(lat)), axis=-1)
+
+
+def _chord(km):
+    return 2 * np.sin(min(km / EARTH_RADIUS_KM, np.pi) / 2)
+
+
+def _arc_km(chord):
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(chord / 2, 1))
+
+
+def _unwrap(lng, ref):
+    """Longitudes shifted into [ref - 180, ref + 180)."""
+    return (np.asarray(lng) - ref + 180) % 360 - 180 + ref
+
+
+class GeoIndex:
+    """KD-tree over the unit-sphere positions of every supplier with a valid lat/lng."""
+
+    def __init__(self, suppliers):
+        lat = np.asarray(column_values(suppliers, "lat"), dtype=np.float64)
+        lng = np.asarray(column_values(suppliers, "lng"), dtype=np.float64)
+        valid = np.isfinite(lat) & np.isfinite(lng) & (np.abs(lat) <= 90)
+        self.ids = column_values(suppliers, "id")
+        self.lat, self.lng = lat, lng
+        self.rows = np.flatnonzero(valid)                # tree position -> supplier row
+        self.xyz = _unit(lat[self.rows], lng[self.rows])
+        self.tree = cKDTree(self.xyz)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def within(self, lat, lng, radius_km):
+        """(rows, distances in km) of suppliers within `radius_km` of the point, nearest first."""
+        p = _unit(lat, lng)
+        hits = np.asarray(self.tree.query_ball_point(p, _chord(radius_km)), dtype=np.int64)
+        dist = _arc_km(np.linalg.norm(self.xyz[hits] - p, axis=1))
+        order = np.lexsort((self.rows[hits], dist))
+        return self.rows[hits[order]], dist[order]
+
+    def nearest(self, lat, lng, k):
+        """(rows, distances in km) of the `k` suppliers nearest the point, nearest first."""
+        k = min(k, len(self))
+        if not k:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        chord, hits = self.tree.query(_unit(lat, lng), k=list(range(1, k + 1)))
+        return self.rows[hits], _arc_km(chord)
+
+    def in_polygon(self, polygon):
+        """Rows of suppliers inside `polygon`, a list of (lat, lng) vertices, ascending."""
+        vertices = np.asarray(polygon, dtype=np.float64)
+        v_lat = vertices[:, 0]
+        v_lng = np.concatenate(([vertices[0, 1]], vertices[0, 1] + np.cumsum(
+            _unwrap(np.diff(vertices[:, 1]), 0))))   # no edge spans more than 180 degrees of longitude
+        # Enclosing cap over densely sampled edges: a lat/lng-straight edge is not a great circle
+        t = np.linspace(0, 1, _EDGE_SAMPLES, endpoint=False)[:, None]
+        n_lat, n_lng = np.roll(v_lat, -1), np.roll(v_lng, -1)
+        boundary = _unit(v_lat + t * (n_lat - v_lat), v_lng + t * (n_lng - v_lng)).reshape(-1, 3)
+        center = boundary.mean(axis=0)
+        norm = np.linalg.norm(center)
+        if norm < 1e-9:
+            candidates = np.arange(len(self))
+        else:
+            center /= norm
+            radius = np.linalg.norm(boundary - center, axis=1).max()
+            candidates = np.asarray(self.tree.query_ball_point(center, radius * (1 + 1e-9)), dtype=np.int64)
+        rows = self.rows[candidates]
+        lat = self.lat[rows][:, None]
+        lng = _unwrap(self.lng[rows], v_lng.mean())[:, None]
+        # Even-odd rule: count edges crossed by a ray running east from each candidate
+        crosses = (v_lat > lat) != (n_lat > lat)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            at = v_lng + (lat - v_lat) * (n_lng - v_lng) / (n_lat - v_lat)
+        inside = (crosses & (lng < at)).sum(axis=1) % 2 == 1
+        return np.sort(rows[inside])
+
+
+@timed
+def build_geo_index(suppliers) -> GeoIndex:
+    return GeoIndex(suppliers)
+
+
+def _geo(suppliers, dependencies):
+    from engines.snapshot import get_snapshot
+    return get_snapshot(suppliers, dependencies).geo_index
+
+
+def validate_area(center_lat=None, center_lng=None, radius_km=None, polygon=None):
+    """Error message for an ill-formed area, or None."""
+    if polygon is not None:
+        if len(polygon) < 3 or any(len(v) != 2 for v in polygon):
+            return "polygon needs at least 3 [lat, lng] vertices"
+        if any(not -90 <= v[0] <= 90 for v in polygon):
+            return "polygon latitudes must be within [-90, 90]"
+        return None
+    if center_lat is None or center_lng is None or radius_km is None:
+        return "An area needs center_lat, center_lng and radius_km, or a polygon"
+    if not -90 <= center_lat <= 90:
+        return "center_lat must be within [-90, 90]"
+    if radius_km <= 0:
+        return "radius_km must be positive"
+    return None
+
+
+def suppliers_in_area(index, center_lat=None, center_lng=None, radius_km=None, polygon=None):
+    """Supplier ids inside an area (already validated) and a display label."""
+    if polygon is not None:
+        rows = index.in_polygon(polygon)
+        label = f"Polygon ({len(polygon)} vertices)"
+    else:
+        rows = np.sort(index.within(center_lat, center_lng, radius_km)[0])
+        label = f"{radius_km:g} km around ({center_lat:.2f}, {center_lng:.2f})"
+    return [index.ids[r] for r in rows.tolist()], label
+
+
+@timed
+def get_suppliers_near(suppliers, dependencies, lat, lng, radius_km=None, limit=100):
+    """Suppliers nearest a point, each with `distance_km`; only those within `radius_km` if given."""
+    if not -90 <= lat <= 90:
+        return {"error": "lat must be within [-90, 90]"}
+    if radius_km is not None and radius_km <= 0:
+        return {"error": "radius_km must be positive"}
+    index = _geo(suppliers, dependencies)
+    if radius_km is None:
+        rows, dist = index.nearest(lat, lng, limit)
+    else:
+        rows, dist = index.within(lat, lng, radius_km)
+        rows, dist = rows[:limit], dist[:limit]
+    items = row_dicts(suppliers, rows.tolist())
+    for item, d in zip(items, dist.tolist()):
+        item["distance_km"] = round(d, 1)
+    return items
@@ -1,10 +1,59 @@
+import os
 import networkx as nx
+import numpy as np
 
+from data.supplier_table import SupplierTable
+from engines.metrics import timed
+
+# Centrality backend: "exact", "sampled" (k-pivot Brandes), "dominator" (share
+# of the network a supplier structurally dominates, see engines.dominators) or
+# "auto", which stays exact up to CENTRALITY_EXACT_MAX_NODES, samples up to
+# CENTRALITY_SAMPLED_MAX_NODES and uses the dominator tree above that.
+CENTRALITY_MODES = ("exact", "sampled", "dominator", "auto")
+CENTRALITY_MODE = os.getenv("RESILIO_CENTRALITY_MODE", "auto")
+CENTRALITY_EXACT_MAX_NODES = int(os.getenv("RESILIO_CENTRALITY_EXACT_MAX_NODES", "2000"))
+CENTRALITY_SAMPLED_MAX_NODES = int(os.getenv("RESILIO_CENTRALITY_SAMPLED_MAX_NODES", "100000"))
+CENTRALITY_SAMPLE_K = int(os.getenv("RESILIO_CENTRALITY_SAMPLE_K", "256"))
+CENTRALITY_SEED = 42
+# How betweenness is computed, independent of the mode chosen above: graphs
+# this large, exact or sampled, use the array-based Brandes in
+# engines.betweenness (networkx below it). From CENTRALITY_PARALLEL_MIN_NODES
+# up, exact passes are split across CENTRALITY_WORKERS processes (when there
+# is more than one); k sampled passes are cheap enough to run in-process.
+CENTRALITY_ARRAY_MIN_NODES = int(os.getenv("RESILIO_CENTRALITY_ARRAY_MIN_NODES", "1000"))
+CENTRALITY_WORKERS = int(os.getenv("RESILIO_CENTRALITY_WORKERS", "0")) or os.cpu_count() or 1
+CENTRALITY_PARALLEL_MIN_NODES = int(os.getenv("RESILIO_CENTRALITY_PARALLEL_MIN_NODES", "20000"))
+
+# Single points of failure: "structural" (dominator tree) or "centrality"
+# (high-betweenness heuristic).
+SPOF_METHODS = ("structural", "centrality")
+SPOF_METHOD = os.getenv("RESILIO_SPOF_METHOD", "structural")
+
+# Downstream bitsets cost O(n^2 / 8) bytes in the worst case; above this many
+# nodes get_downstream falls back to a BFS over the CSR adjacency.
+REACHABILITY_MAX_NODES = int(os.getenv("RESILIO_REACHABILITY_MAX_NODES", "50000"))
+
+# Supplier fields copied onto graph nodes: only what graph consumers read,
+# so the graph does not hold a second full copy of every supplier record.
+NODE_ATTRIBUTES = ("name", "tier", "country_code", "country_name", "industry", "component",
+                   "lat", "lng", "geographic_risk", "financial_risk")
+
+def node_attributes(supplier):
+    """The NODE_ATTRIBUTES fields present in one supplier record."""
+    return {k: supplier[k] for k in NODE_ATTRIBUTES if k in supplier}
+
+@timed
 def _build_graph(suppliers, dependencies):
     dependencies = dependencies or []
     G = nx.DiGraph()
-    for s in suppliers:
-        G.add_node(s["id"], **s)
+    if isinstance(suppliers, SupplierTable):
+        present = set(suppliers.columns)
+        names = [k for k in NODE_ATTRIBUTES if k in present]
+        columns = [suppliers.values(k) for k in names]
+        G.add_nodes_from((sid, dict(zip(names, values)))
+                         for sid, *values in zip(suppliers.values("id"), *columns))
+    else:
+        G.add_nodes_from((s["id"], node_attributes(s)) for s in suppliers)
     for dep in dependencies:
         G.add_edge(
             dep["from_supplier_id"], dep["to_supplier_id"],
@@ -14,19 +63,59 @@ def _build_graph(suppliers, dependencies):
         )
     return G
 
-def _get_centrality(suppliers, dependencies):
-    G = _build_graph(suppliers, dependencies)
-    return G, nx.betweenness_centrality(G, normalized=True)
+def resolve_centrality_mode(n_nodes, mode=None, k=None):
+    """Resolve a requested mode to ("exact", None), ("sampled", k) or ("dominator", None) for a graph size."""
+    mode = mode or CENTRALITY_MODE
+    if mode not in CENTRALITY_MODES:
+        raise ValueError(f"Unknown centrality mode: {mode}")
+    if mode == "auto":
+        mode = ("exact" if n_nodes <= CENTRALITY_EXACT_MAX_NODES
+                else "sampled" if n_nodes <= CENTRALITY_SAMPLED_MAX_NODES else "dominator")
+    if mode == "dominator":
+        return "dominator", None
+    k = k or CENTRALITY_SAMPLE_K
+    if mode == "exact" or k >= n_nodes:
+        return "exact", None
+    return "sampled", k
 
-def get_centrality(suppliers=None, dependencies=None):
+@timed
+def compute_centrality(G, mode=None, k=None, seed=CENTRALITY_SEED):
+    """Normalized betweenness centrality using the configured backend."""
+    mode, k = resolve_centrality_mode(G.number_of_nodes(), mode, k)
+    if mode == "dominator":
+        raise ValueError("dominator centrality is computed from the snapshot's dominator tree")
+    if mode == "sampled":
+        return betweenness(G, k=k, seed=seed)
+    return exact_betweenness(G)
+
+def exact_betweenness(G, normalized=True):
+    """Exact betweenness, from networkx for small graphs and engines.betweenness for larger ones."""
+    return betweenness(G, normalized)
+
+def betweenness(G, normalized=True, k=None, seed=None):
+    """Exact betweenness, or k-pivot sampled when `k` is given; same values either backend."""
+    n = G.number_of_nodes()
+    if n >= CENTRALITY_ARRAY_MIN_NODES:
+        from engines.betweenness import array_betweenness
+        workers = CENTRALITY_WORKERS if k is None and n >= CENTRALITY_PARALLEL_MIN_NODES else 1
+        return array_betweenness(G, workers, normalized, k, seed)
+    return nx.betweenness_centrality(G, k=k, normalized=normalized, seed=seed)
+
+def _get_centrality(suppliers, dependencies, mode=None, k=None):
+    from engines.snapshot import get_snapshot
+    snap = get_snapshot(suppliers, dependencies)
+    return snap.graph, snap.get_centrality(mode, k)
+
+def get_centrality(suppliers=None, dependencies=None, mode=None, k=None):
     """Legacy: called by risk_engine with no args uses global data."""
     if suppliers is None:
         from data.seed_data import get_data
         d = get_data()
         suppliers, dependencies = d["suppliers"], d["dependencies"]
-    G, cent = _get_centrality(suppliers, dependencies)
+    G, cent = _get_centrality(suppliers, dependencies, mode, k)
     return cent
 
+@timed
 def get_graph_json(suppliers=None, dependencies=None):
     if suppliers is None:
         from data.seed_data import get_data
@@ -52,46 +141,171 @@ def get_graph_json(suppliers=None, dependencies=None):
         })
     return {"nodes": nodes, "edges": edges}
 
-def get_single_points_of_failure(suppliers=None, dependencies=None):
+@timed
+def get_graph_payload(suppliers, dependencies):
+    """get_graph_json() as a cached SerializedPayload (bytes + ETag), rebuilt only when the dataset changes."""
+    from engines.snapshot import get_snapshot
+    return get_snapshot(suppliers, dependencies).graph_payload
+
+@timed
+def get_single_points_of_failure(suppliers=None, dependencies=None, centrality_mode=None, centrality_k=None,
+                                 method=None):
+    """Suppliers the network cannot route around, most consequential first.
+
+    "structural" (default) reads the dominator tree: a supplier is a single
+    point of failure when some other supplier gets all of its supply through
+    it. "centrality" is the older heuristic of high betweenness and few
+    suppliers of its own.
+    """
     if suppliers is None:
         from data.seed_data import get_data
         d = get_data()
         suppliers, dependencies = d["suppliers"], d["dependencies"]
-    G, centrality = _get_centrality(suppliers, dependencies)
+    method = method or SPOF_METHOD
+    if method not in SPOF_METHODS:
+        raise ValueError(f"Unknown SPOF method: {method}")
+    from engines.snapshot import get_snapshot
+    snap = get_snapshot(suppliers, dependencies)
+    index = snap.dependency_index
+    if method == "structural":
+        tree, supplier_map = snap.dominator_tree, snap.supplier_map
+        spofs = []
+        for i in tree.top(15).tolist():
+            node_id = tree.node_ids[i]
+            nd = supplier_map.get(node_id, {})
+            spofs.append({
+                "supplier_id": node_id, "supplier_name": nd.get("name"),
+                "tier": nd.get("tier"), "country_code": nd.get("country_code"),
+                "dominated_downstream_count": int(tree.dominated[i]),
+                "dominated_tier1_count": int(tree.dominated_tier1[i]),
+                "dependents_count": index.out_degree(node_id), "suppliers_count": index.in_degree(node_id),
+                "component": nd.get("component"),
+            })
+        return spofs
+
+    G, centrality = snap.graph, snap.get_centrality(centrality_mode, centrality_k)
     spofs = []
     for node_id, cent in centrality.items():
-        successors = list(G.successors(node_id))
-        predecessors = list(G.predecessors(node_id))
-        if cent > 0.04 and len(successors) > 0 and len(predecessors) <= 3:
+        if cent <= 0.04:
+            continue
+        n_successors = index.out_degree(node_id)
+        n_predecessors = index.in_degree(node_id)
+        if n_successors > 0 and n_predecessors <= 3:
             nd = G.nodes[node_id]
             spofs.append({
                 "supplier_id": node_id, "supplier_name": nd.get("name"),
                 "tier": nd.get("tier"), "country_code": nd.get("country_code"),
                 "centrality_score": round(cent, 4),
-                "dependents_count": len(successors), "suppliers_count": len(predecessors),
+                "dependents_count": n_successors, "suppliers_count": n_predecessors,
                 "component": nd.get("component"),
             })
     return sorted(spofs, key=lambda x: x["centrality_score"], reverse=True)[:15]
 
+@timed
+def get_redundancy(suppliers=None, dependencies=None, limit=50):
+    """Supply capacity and redundancy of each tier-1 supplier, least redundant first (engines.capacity)."""
+    if suppliers is None:
+        from data.seed_data import get_data
+        d = get_data()
+        suppliers, dependencies = d["suppliers"], d["dependencies"]
+    from engines.snapshot import get_snapshot
+    snap = get_snapshot(suppliers, dependencies)
+    index, supplier_map = snap.capacity_index, snap.supplier_map
+    flows, paths, edge_cuts, node_cuts = index.baseline
+    # Fewest independent supply paths first, then least capacity
+    order = np.lexsort((flows, paths))
+    results = []
+    for j in order[:limit].tolist():
+        sid = index.node_ids[index.tier1[j]]
+        nd = supplier_map.get(sid, {})
+        results.append({
+            "supplier_id": sid, "supplier_name": nd.get("name"),
+            "country_code": nd.get("country_code"), "component": nd.get("component"),
+            "max_flow": round(float(flows[j]), 1),
+            "disjoint_paths": int(paths[j]),
+            "min_cut_suppliers": node_cuts[j],
+            "min_cut_dependencies": [{"from_supplier_id": a, "to_supplier_id": b} for a, b in edge_cuts[j]],
+        })
+    return {
+        "tier1_count": len(index.tier1) + index.untracked_tier1,
+        "analysed_count": len(index.tier1),
+        "single_path_count": int((paths <= 1).sum()),
+        "mean_max_flow": round(float(flows.mean()), 1) if len(flows) else 0.0,
+        "suppliers": results,
+    }
+
+@timed
 def simulate_disruption(affected_node_ids: list, suppliers, dependencies):
-    G = _build_graph(suppliers, dependencies)
-    affected = set(affected_node_ids)
-    queue = list(affected_node_ids)
-    cascade = {}
-    visited = set(affected_node_ids)
-    while queue:
-        current = queue.pop(0)
-        for successor in G.successors(current):
-            if successor not in visited:
-                visited.add(successor)
-                queue.append(successor)
-                nd = G.nodes[successor]
-                edge_data = G.get_edge_data(current, successor, {})
-                cascade[successor] = {
-                    "supplier_id": successor, "supplier_name": nd.get("name"),
-                    "tier": nd.get("tier"), "country_code": nd.get("country_code"),
-                    "component": nd.get("component"),
-                    "impact_pct": edge_data.get("volume_percent", 50),
-                    "criticality": edge_data.get("criticality", "medium"),
-                }
-    return list(cascade.values())
+    from engines.snapshot import get_snapshot
+    snap = get_snapshot(suppliers, dependencies)
+    cg, supplier_map = snap.cascade_graph, snap.supplier_map
+    cascade = []
+    for node, (depth, impact, edge) in cg.cascade(affected_node_ids).items():
+        sid = cg.node_ids[node]
+        nd = supplier_map.get(sid, {})
+        cascade.append({
+            "supplier_id": sid, "supplier_name": nd.get("name"),
+            "tier": nd.get("tier"), "country_code": nd.get("country_code"),
+            "component": nd.get("component"),
+            "impact_pct": round(impact, 1),
+            "criticality": cg.edge_criticality[edge],
+            "depth": depth,
+        })
+    return cascade
+
+def get_downstream(supplier_ids, suppliers=None, dependencies=None):
+    """Ids of every supplier downstream of any of `supplier_ids`, excluding those suppliers."""
+    if suppliers is None:
+        from data.seed_data import get_data
+        d = get_data()
+        suppliers, dependencies = d["suppliers"], d["dependencies"]
+    from engines.snapshot import get_snapshot
+    snap = get_snapshot(suppliers, dependencies)
+    reach = snap.reachability
+    if reach is not None:
+        return reach.downstream(supplier_ids)
+    cg = snap.cascade_graph
+    return [cg.node_ids[v] for v in cg.reachable(supplier_ids)]
+
+def count_downstream(supplier_ids, suppliers=None, dependencies=None):
+    """Number of suppliers downstream of any of `supplier_ids`, excluding those suppliers."""
+    if suppliers is None:
+        from data.seed_data import get_data
+        d = get_data()
+        suppliers, dependencies = d["suppliers"], d["dependencies"]
+    from engines.snapshot import get_snapshot
+    snap = get_snapshot(suppliers, dependencies)
+    reach = snap.reachability
+    if reach is not None:
+        return reach.count_downstream(supplier_ids)
+    return len(snap.cascade_graph.reachable(supplier_ids))
+
+@timed
+def get_downstream_impact(supplier_id, suppliers=None, dependencies=None):
+    if suppliers is None:
+        from data.seed_data import get_data
+        d = get_data()
+        suppliers, dependencies = d["suppliers"], d["dependencies"]
+    from engines.snapshot import get_snapshot
+    snap = get_snapshot(suppliers, dependencies)
+    source = snap.supplier_map.get(supplier_id)
+    if source is None:
+        return {"error": "Supplier not found"}
+    table = snap.score_table
+    downstream, by_tier = [], {}
+    for sid in get_downstream([supplier_id], suppliers, dependencies):
+        nd = snap.supplier_map.get(sid, {})
+        by_tier[nd.get("tier")] = by_tier.get(nd.get("tier"), 0) + 1
+        downstream.append({
+            "supplier_id": sid, "supplier_name": nd.get("name"),
+            "tier": nd.get("tier"), "country_code": nd.get("country_code"),
+            "risk_score": table.score_of(sid, 50), "risk_level": table.level_of(sid, "medium"),
+        })
+    return {
+        "supplier_id": supplier_id, "supplier_name": source["name"],
+        "tier": source["tier"], "country_code": source["country_code"],
+        "downstream_count": len(downstream),
+        "downstream_pct": round(len(downstream) / len(suppliers) * 100, 1),
+        "downstream_by_tier": [{"tier": t, "count": c} for t, c in sorted(by_tier.items(), key=lambda x: (x[0] is None, x[0]))],
+        "downstream": sorted(downstream, key=lambda x: x["risk_score"], reverse=True),
+    }
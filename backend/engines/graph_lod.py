@@ -0,0 +1,328 @@
+"""
+Level-of-detail views of the supply network for large graphs.
+
+The full /api/network/graph payload grows with the network; a browser
+cannot draw more than a few thousand nodes. A LodIndex (one per dataset
+version, see engines.snapshot) answers three bounded queries instead:
+
+  clusters   suppliers grouped by any of country / industry / tier into
+             super-nodes, with edges between groups aggregated (count,
+             volume, high-criticality count)
+  expand     the member suppliers of one cluster, their internal edges,
+             and their links to the other clusters
+  viewport   suppliers inside a lat/lng box: the suppliers themselves when
+             there are at most `limit`, otherwise the box clustered
+
+Nothing here needs the networkx graph: node fields come from the supplier
+table, edges from the cascade CSR adjacency, and centrality (per-cluster
+maximum, per-supplier value) is computed only when a view asks for it.
+
+Everything is vectorized over columns: group keys are factorized to
+integer codes and edges aggregated with np.unique, and boxes are answered
+from a uniform lat/lng grid whose cells are contiguous runs of a sorted
+row order, so only the cells overlapping the box are scanned.
+"""
+import math
+
+import numpy as np
+
+from data.supplier_table import column_values
+from engines.metrics import timed
+
+GROUP_FIELDS = ("country_code", "country_name", "industry", "tier", "component")
+GRID_CELL_DEG = 1.0
+_CRITICALITY_CODES = {"high": 2, "medium": 1, "low": 0}
+_KEY_SEP = "|"
+
+
+class GridIndex:
+    """Rows bucketed into GRID_CELL_DEG lat/lng cells; box queries scan only overlapping cells."""
+
+    def __init__(self, lat, lng, cell=GRID_CELL_DEG):
+        self.lat, self.lng, self.cell = lat, lng, cell
+        self.cols = int(math.ceil(360 / cell)) + 1
+        self.rows = int(math.ceil(180 / cell)) + 1
+        valid = np.isfinite(lat) & np.isfinite(lng)
+        cx = self._cx(np.where(valid, lng, 0))
+        cy = self._cy(np.where(valid, lat, 0))
+        cell_id = np.where(valid, cy * self.cols + cx, -1)
+        self.order = np.argsort(cell_id, kind="stable")
+        self.cell_ids = cell_id[self.order]
+
+    def _cx(self, lng):
+        return np.clip(((np.asarray(lng) + 180) // self.cell).astype(np.int64), 0, self.cols - 1)
+
+    def _cy(self, lat):
+        return np.clip(((np.asarray(lat) + 90) // self.cell).astype(np.int64), 0, self.rows - 1)
+
+    def query(self, min_lat, max_lat, min_lng, max_lng):
+        """Rows inside the box, ascending. min_lng > max_lng crosses the antimeridian."""
+        if min_lng > max_lng:
+            return np.union1d(self.query(min_lat, max_lat, min_lng, 180.0),
+                              self.query(min_lat, max_lat, -180.0, max_lng))
+        cx0, cx1 = int(self._cx(min_lng)), int(self._cx(max_lng))
+        cy0, cy1 = int(self._cy(min_lat)), int(self._cy(max_lat))
+        starts = np.arange(cy0, cy1 + 1) * self.cols
+        lo = np.searchsorted(self.cell_ids, starts + cx0, side="left")
+        hi = np.searchsorted(self.cell_ids, starts + cx1, side="right")
+        if not len(lo) or not (hi - lo).sum():
+            return np.empty(0, dtype=np.int64)
+        rows = self.order[np.concatenate([np.arange(a, b) for a, b in zip(lo.tolist(), hi.tolist()) if b > a])]
+        lat, lng = self.lat[rows], self.lng[rows]
+        inside = (lat >= min_lat) & (lat <= max_lat) & (lng >= min_lng) & (lng <= max_lng)
+        return np.sort(rows[inside])
+
+
+class LodIndex:
+    """Column arrays, dependency edges by row and a grid index for one dataset version."""
+
+    def __init__(self, suppliers, dependencies, cascade_graph, centrality=None):
+        self.suppliers, self.dependencies = suppliers, dependencies
+        self.ids = np.asarray(column_values(suppliers, "id"), dtype=np.int64)
+        n = len(self.ids)
+        self.columns = {name: column_values(suppliers, name) for name in GROUP_FIELDS}
+        self.lat = np.asarray(column_values(suppliers, "lat"), dtype=np.float64)
+        self.lng = np.asarray(column_values(suppliers, "lng"), dtype=np.float64)
+        self.geo = np.asarray(column_values(suppliers, "geographic_risk"), dtype=np.float64)
+        self.fin = np.asarray(column_values(suppliers, "financial_risk"), dtype=np.float64)
+        self._centrality_source = centrality   # supplier id -> centrality, or a callable returning it
+        self._centrality = None
+
+        cg = cascade_graph   # node i of the CSR graph is supplier row i
+        src = np.repeat(np.arange(cg.n_nodes, dtype=np.int64), np.diff(cg.indptr))
+        keep = (src < n) & (cg.indices < n)
+        self.src, self.dst = src[keep], cg.indices[keep]
+        self.volume = cg.volume[keep]
+        self.dep_pos = cg.edge_dependency[keep]
+        crit = np.array([_CRITICALITY_CODES.get(c, 1) for c in cg.edge_criticality], dtype=np.int8)
+        self.high = crit[keep] == 2
+        self.grid = GridIndex(self.lat, self.lng)
+        self._codes = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def centrality_map(self):
+        source = self._centrality_source
+        if callable(source):
+            source = self._centrality_source = source()
+        return source or {}
+
+    @property
+    def centrality(self):
+        """Centrality per row, resolved on first use."""
+        if self._centrality is None:
+            cmap = self.centrality_map
+            self._centrality = np.array([cmap.get(i, 0.0) for i in self.ids.tolist()], dtype=np.float64)
+        return self._centrality
+
+    # ── grouping ───────────────────────────────────────────────────────────
+    def group_codes(self, group_by):
+        """(per-row cluster code, cluster keys, key id -> code) for a tuple of GROUP_FIELDS."""
+        cached = self._codes.get(group_by)
+        if cached is None:
+            code = np.zeros(len(self), dtype=np.int64)
+            labels = []
+            for field in group_by:
+                column = self.columns[field]
+                _, first, inverse = np.unique(np.asarray(column, dtype=object).astype(str),
+                                              return_index=True, return_inverse=True)
+                labels.append([column[i] for i in first.tolist()])
+                code = code * len(first) + inverse.reshape(-1)
+            used, code = np.unique(code, return_inverse=True)
+            keys = []
+            for c in used.tolist():
+                key = []
+                for values in reversed(labels):
+                    c, i = divmod(c, len(values))
+                    key.append(values[i])
+                keys.append(tuple(reversed(key)))
+            cached = self._codes[group_by] = (code.reshape(-1), keys, {_key_id(k): i for i, k in enumerate(keys)})
+        return cached
+
+    def clusters(self, group_by, rows=None, centrality=False):
+        """Super-nodes and aggregated edges for `rows` (default: every supplier).
+
+        With `centrality`, each super-node also carries its members' max_centrality.
+        """
+        code, keys, _ = self.group_codes(group_by)
+        mask = None
+        if rows is not None:
+            mask = np.zeros(len(self), dtype=bool)
+            mask[rows] = True
+            rows = np.asarray(rows, dtype=np.int64)
+        else:
+            rows = np.arange(len(self))
+        c = code[rows]
+        k = len(keys)
+        size = np.bincount(c, minlength=k)
+        present = np.flatnonzero(size)
+
+        def mean(values):
+            return np.bincount(c, weights=values[rows], minlength=k) / np.maximum(size, 1)
+
+        lat, lng = mean(np.nan_to_num(self.lat)), mean(np.nan_to_num(self.lng))
+        geo, fin = mean(self.geo), mean(self.fin)
+        if centrality:
+            max_cent = np.zeros(k)
+            np.maximum.at(max_cent, c, self.centrality[rows])
+
+        src, dst, vol, high = self.src, self.dst, self.volume, self.high
+        if mask is not None:
+            inside = mask[src] & mask[dst]
+            src, dst, vol, high = src[inside], dst[inside], vol[inside], high[inside]
+        cs, cd = code[src], code[dst]
+        internal = np.bincount(cs[cs == cd], minlength=k)
+        cross = cs != cd
+        pair = cs[cross] * k + cd[cross]
+        pairs, inverse, counts = np.unique(pair, return_inverse=True, return_counts=True)
+        volume = np.bincount(inverse, weights=vol[cross], minlength=len(pairs))
+        n_high = np.bincount(inverse, weights=high[cross], minlength=len(pairs))
+
+        nodes = [{
+            "id": _key_id(keys[i]), "key": dict(zip(group_by, keys[i])), "size": int(size[i]),
+            "lat": round(float(lat[i]), 4), "lng": round(float(lng[i]), 4),
+            "avg_geographic_risk": round(float(geo[i]), 1), "avg_financial_risk": round(float(fin[i]), 1),
+            "internal_edges": int(internal[i]),
+            **({"max_centrality": round(float(max_cent[i]), 4)} if centrality else {}),
+        } for i in present.tolist()]
+        edges = [{
+            "source": _key_id(keys[p // k]), "target": _key_id(keys[p % k]), "count": int(n),
+            "volume_percent": round(float(v), 1), "high_criticality": int(h),
+        } for p, n, v, h in zip(pairs.tolist(), counts.tolist(), volume.tolist(), n_high.tolist())]
+        return {"level": "clusters", "group_by": list(group_by), "nodes": nodes, "edges": edges,
+                "supplier_count": int(len(rows))}
+
+    # ── detail ─────────────────────────────────────────────────────────────
+    def node(self, row, centrality=False):
+        """A supplier in get_graph_json's node format (centrality only when asked for)."""
+        sid = int(self.ids[row])
+        data = self.suppliers[row]
+        node = {
+            "id": sid, "name": data.get("name", ""),
+            "tier": data.get("tier", 1), "country_code": data.get("country_code", ""),
+            "country_name": data.get("country_name", ""), "industry": data.get("industry", ""),
+            "component": data.get("component", ""), "lat": data.get("lat", 0), "lng": data.get("lng", 0),
+            "geographic_risk": data.get("geographic_risk", 0),
+            "financial_risk": data.get("financial_risk", 0),
+        }
+        if centrality:
+            node["centrality"] = round(float(self.centrality[row]), 4)
+        return node
+
+    def detail(self, rows, centrality=False):
+        """Suppliers `rows` and the dependencies among them, in get_graph_json's format."""
+        mask = np.zeros(len(self), dtype=bool)
+        mask[rows] = True
+        inside = np.flatnonzero(mask[self.src] & mask[self.dst])
+        return {
+            "level": "suppliers",
+            "nodes": [self.node(r, centrality) for r in np.asarray(rows).tolist()],
+            "edges": [self._edge(e) for e in inside.tolist()],
+        }
+
+    def _edge(self, e):
+        u, v = int(self.ids[self.src[e]]), int(self.ids[self.dst[e]])
+        data = self.dependencies[self.dep_pos[e]]
+        return {"source": u, "target": v, "component": data.get("component", ""),
+                "volume_percent": data.get("volume_percent", 0),
+                "criticality": data.get("criticality", "medium")}
+
+    def expand(self, group_by, key, limit=None, centrality=False):
+        """Members of cluster `key`, edges among them, and their edges to other clusters (aggregated)."""
+        code, keys, code_of = self.group_codes(group_by)
+        c = code_of.get(_key_id(key))
+        if c is None:
+            return {"error": f"No cluster {_key_id(key)!r} for group_by={','.join(group_by)}"}
+        members = np.flatnonzero(code == c)
+        total = len(members)
+        if limit is not None and total > limit:
+            # keep the most central members; the rest stay folded into the cluster
+            members = np.sort(members[np.argsort(-self.centrality[members], kind="stable")[:limit]])
+        out = self.detail(members, centrality)
+        member = np.zeros(len(self), dtype=bool)
+        member[members] = True
+        links = []
+        for direction, near, far in (("out", self.src, self.dst), ("in", self.dst, self.src)):
+            e = np.flatnonzero(member[near] & (code[far] != c))
+            if not len(e):
+                continue
+            pair = self.ids[near[e]] * len(keys) + code[far[e]]
+            pairs, inverse, counts = np.unique(pair, return_inverse=True, return_counts=True)
+            volume = np.bincount(inverse, weights=self.volume[e], minlength=len(pairs))
+            for p, n, v in zip(pairs.tolist(), counts.tolist(), volume.tolist()):
+                sid, other = divmod(p, len(keys))
+                src, dst = (sid, _key_id(keys[other])) if direction == "out" else (_key_id(keys[other]), sid)
+                links.append({"source": src, "target": dst, "count": n, "volume_percent": round(v, 1)})
+        out.update({"level": "cluster", "cluster": _key_id(keys[c]), "group_by": list(group_by),
+                    "member_count": total, "truncated": total > len(members), "cluster_edges": links})
+        return out
+
+    # ── viewport ───────────────────────────────────────────────────────────
+    def viewport(self, min_lat, max_lat, min_lng, max_lng, limit, group_by, centrality=False):
+        rows = self.grid.query(min_lat, max_lat, min_lng, max_lng)
+        bbox = {"min_lat": min_lat, "max_lat": max_lat, "min_lng": min_lng, "max_lng": max_lng}
+        if len(rows) <= limit:
+            out = self.detail(rows, centrality)
+        else:
+            out = self.clusters(group_by, rows, centrality)
+        out["bbox"] = bbox
+        return out
+
+
+def _key_id(key):
+    return _KEY_SEP.join(str(v) for v in key)
+
+
+def parse_group_by(group_by):
+    """'country_code,tier' -> ('country_code', 'tier'); raises ValueError on unknown fields."""
+    fields = tuple(f.strip() for f in (group_by or "").split(",") if f.strip())
+    unknown = [f for f in fields if f not in GROUP_FIELDS]
+    if not fields or unknown:
+        raise ValueError(f"group_by must be a comma-separated subset of {', '.join(GROUP_FIELDS)}")
+    return fields
+
+
+@timed
+def build_lod_index(snapshot) -> LodIndex:
+    return LodIndex(snapshot.suppliers, snapshot.dependencies, snapshot.cascade_graph,
+                    lambda: snapshot.centrality)
+
+
+def _lod(suppliers, dependencies):
+    from engines.snapshot import get_snapshot
+    return get_snapshot(suppliers, dependencies).lod_index
+
+
+@timed
+def get_clustered_graph(suppliers, dependencies, group_by="country_code", centrality=False):
+    try:
+        fields = parse_group_by(group_by)
+    except ValueError as e:
+        return {"error": str(e)}
+    return _lod(suppliers, dependencies).clusters(fields, centrality=centrality)
+
+
+@timed
+def expand_cluster(suppliers, dependencies, key, group_by="country_code", limit=None, centrality=False):
+    try:
+        fields = parse_group_by(group_by)
+    except ValueError as e:
+        return {"error": str(e)}
+    parts = key.split(_KEY_SEP)
+    if len(parts) != len(fields):
+        return {"error": f"Cluster key {key!r} does not match group_by={','.join(fields)}"}
+    return _lod(suppliers, dependencies).expand(fields, parts, limit, centrality)
+
+
+@timed
+def get_viewport_graph(suppliers, dependencies, min_lat, max_lat, min_lng, max_lng, limit=2000,
+                       group_by="country_code", centrality=False):
+    try:
+        fields = parse_group_by(group_by)
+    except ValueError as e:
+        return {"error": str(e)}
+    if min_lat > max_lat:
+        return {"error": "min_lat must not exceed max_lat"}
+    return _lod(suppliers, dependencies).viewport(min_lat, max_lat, min_lng, max_lng, limit, fields, centrality)
@@ -0,0 +1,118 @@
+"""
+Risk inherited from upstream suppliers.
+
+A supplier's own score only looks at the supplier itself, but a tier-1
+partner that takes most of its input from a critical-risk tier-3 is
+exposed to that risk as well. Inherited risk is the damped propagation of
+upstream risk along dependency edges:
+
+    inherited[v] = sum_u w[v, u] * ((1 - d) * local[u] + d * inherited[u])
+
+where w[v, u] is u's share of v's input (volume_percent / 100) scaled by
+the edge's criticality, capped so a supplier's weights sum to at most 1,
+and d is the damping: the part of an upstream supplier's own inheritance
+that is passed further down. Each hop keeps at most d of what reaches it,
+so values stay on the 0-100 risk scale and the iteration converges
+geometrically (on an acyclic network it is exact after as many passes as
+the network is deep). A pass is one sparse matrix-vector product over all
+edges.
+
+A dependency edit only changes the weights of its target supplier, so
+set_row() patches that one row of an existing matrix rather than
+rebuilding it from every edge.
+"""
+import os
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from engines.criticality import CRITICALITY_WEIGHT, DEFAULT_CRITICALITY_WEIGHT
+
+INHERITED_RISK_DAMPING = float(os.getenv("RESILIO_INHERITED_RISK_DAMPING", "0.5"))
+TOLERANCE = 1e-6   # largest change, in risk points, at which propagation stops
+MAX_PASSES = 200
+
+
+def propagation_matrix(row_of, incoming):
+    """Sparse (target row, source row) edge weights for the suppliers in `row_of`.
+
+    `incoming` is DependencyIndex.incoming; dependencies on suppliers outside
+    `row_of` are ignored.
+    """
+    dst, src, weight = [], [], []
+    for to_id, edges in incoming.items():
+        v = row_of.get(to_id)
+        if v is None:
+            continue
+        for from_id, dep in edges.items():
+            u = row_of.get(from_id)
+            if u is None:
+                continue
+            dst.append(v)
+            src.append(u)
+            weight.append(_weight(dep))
+    n = len(row_of)
+    matrix = csr_matrix((np.asarray(weight, dtype=np.float64), (dst, src)), shape=(n, n))
+    matrix.sort_indices()   # fixed summation order: the same edges always give the same result
+    total = np.asarray(matrix.sum(axis=1)).ravel()
+    matrix.data /= np.repeat(np.maximum(total, 1), np.diff(matrix.indptr))
+    return matrix
+
+
+def _weight(dep):
+    return (min(max(dep["volume_percent"], 0), 100) / 100
+            * CRITICALITY_WEIGHT.get(dep["criticality"], DEFAULT_CRITICALITY_WEIGHT))
+
+
+def set_row(matrix, v, row_of, edges):
+    """`matrix` with row `v` rebuilt from `edges`, that supplier's incoming {from_id: dep}.
+
+    Returns `matrix` patched in place when the row keeps its number of
+    entries, else a new matrix. Entries come out exactly as
+    propagation_matrix() builds them.
+    """
+    row = sorted((row_of[u], _weight(dep)) for u, dep in edges.items() if u in row_of)
+    cols = np.asarray([u for u, _ in row], dtype=matrix.indices.dtype)
+    weights = np.asarray([w for _, w in row], dtype=np.float64)
+    if len(row):   # summed the way matrix.sum(axis=1) sums a row, so the result is bit-identical
+        weights /= max(np.add.reduceat(weights, [0])[0], 1)
+    indptr = matrix.indptr
+    a, b = indptr[v], indptr[v + 1]
+    if b - a == len(row):
+        matrix.indices[a:b] = cols
+        matrix.data[a:b] = weights
+        return matrix
+    indptr = indptr.copy()
+    indptr[v + 1:] += len(row) - (b - a)
+    return csr_matrix((np.concatenate((matrix.data[:a], weights, matrix.data[b:])),
+                       np.concatenate((matrix.indices[:a], cols, matrix.indices[b:])), indptr),
+                      shape=matrix.shape)
+
+
+def add_row(matrix):
+    """`matrix` with an empty row and column appended (a new supplier, no dependencies yet)."""
+    n = matrix.shape[0] + 1
+    return csr_matrix((matrix.data, matrix.indices, np.append(matrix.indptr, matrix.indptr[-1])), shape=(n, n))
+
+
+def remove_row(matrix, r):
+    """`matrix` without row and column `r`; the supplier's dependencies must already be patched out."""
+    n = matrix.shape[0] - 1
+    indices = matrix.indices - (matrix.indices > r)
+    return csr_matrix((matrix.data, indices.astype(matrix.indices.dtype), np.delete(matrix.indptr, r + 1)),
+                      shape=(n, n))
+
+
+def propagate(matrix, local, damping=INHERITED_RISK_DAMPING):
+    """Inherited risk per row for local risk scores `local` (see module docstring)."""
+    base = matrix @ ((1 - damping) * local)
+    inherited = base
+    for _ in range(MAX_PASSES):
+        if not damping or not len(base):
+            break
+        step = base + damping * (matrix @ inherited)
+        done = np.abs(step - inherited).max() <= TOLERANCE
+        inherited = step
+        if done:
+            break
+    return inherited
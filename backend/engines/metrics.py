@@ -0,0 +1,147 @@
+"""
+Request and engine-stage timing.
+
+Engine functions are wrapped with @timed (or time a block with `span`),
+which records each call in a per-stage histogram and, inside an HTTP
+request, in that request's timings. routers.metrics.TimingMiddleware
+times every request per route and returns the stages it ran as a
+`Server-Timing` header, so browser dev tools show where a slow request
+went (graph build, centrality, scoring, serialization, ...). render()
+exposes all histograms in Prometheus text format for /api/metrics.
+
+With RESILIO_METRICS=0 nothing is wrapped and the middleware is not
+installed, so instrumentation costs nothing.
+"""
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+ENABLED = os.getenv("RESILIO_METRICS", "1").lower() not in ("0", "false", "no", "off")
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """Prometheus-style cumulative histogram keyed by label values."""
+
+    def __init__(self, name, help_text, labels, buckets=BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}   # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, seconds, *label_values):
+        i = bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][i] += 1
+            series[1] += seconds
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((k, (list(c), s, n)) for k, (c, s, n) in self._series.items())
+        for values, (counts, total, n) in series:
+            labels = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.labels, values))
+            sep = "," if labels else ""
+            running = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                running += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{self.name}_bucket{{{labels}{sep}le="{le}"}} {running}')
+            lines.append(f"{self.name}_sum{{{labels}}} {total}")
+            lines.append(f"{self.name}_count{{{labels}}} {n}")
+        return lines
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REQUESTS = Histogram("resilio_http_request_duration_seconds", "HTTP request latency by route.",
+                     ("method", "route", "status"))
+STAGES = Histogram("resilio_stage_duration_seconds", "Time spent per engine stage.", ("stage",))
+
+
+class _RequestTimings:
+    __slots__ = ("stages", "handler_done")
+
+    def __init__(self):
+        self.stages = {}          # stage -> [seconds, calls]
+        self.handler_done = None  # perf_counter() when the endpoint returned; the rest is serialization
+
+    def add(self, stage, seconds):
+        entry = self.stages.get(stage)
+        if entry is None:
+            self.stages[stage] = [seconds, 1]
+        else:
+            entry[0] += seconds
+            entry[1] += 1
+
+    def header(self, total):
+        parts = [f"total;dur={total * 1000:.2f}"]
+        for stage, (seconds, calls) in self.stages.items():
+            desc = f';desc="x{calls}"' if calls > 1 else ""
+            parts.append(f"{stage};dur={seconds * 1000:.2f}{desc}")
+        return ", ".join(parts)
+
+
+_current = ContextVar("resilio_request_timings", default=None)
+
+
+def record(stage, seconds):
+    STAGES.observe(seconds, stage)
+    timings = _current.get()
+    if timings is not None:
+        timings.add(stage, seconds)
+
+
+@contextmanager
+def _span(stage):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, time.perf_counter() - start)
+
+
+_NOOP = nullcontext()
+
+
+def span(stage):
+    """Context manager timing a block as `stage` (a shared no-op when metrics are off)."""
+    return _span(stage) if ENABLED else _NOOP
+
+
+def timed(fn=None, *, stage=None):
+    """Decorator recording each call of an engine function as a stage (its name, without a leading _)."""
+    if fn is None:
+        return functools.partial(timed, stage=stage)
+    if not ENABLED:
+        return fn
+    stage = stage or fn.__name__.lstrip("_")
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            record(stage, time.perf_counter() - start)
+    return wrapper
+
+
+def render() -> str:
+    """Every histogram in Prometheus text exposition format."""
+    if not ENABLED:
+        return "# metrics disabled (RESILIO_METRICS=0)\n"
+    return "\n".join(REQUESTS.render() + STAGES.render()) + "\n"
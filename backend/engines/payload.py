@@ -0,0 +1,89 @@
+"""
+Responses serialized once per dataset version.
+
+A SerializedPayload holds a JSON body as bytes (orjson when installed, the
+standard library otherwise), a strong ETag derived from those bytes, and
+compressed variants built on first request. Snapshots cache one per
+version, so an unchanged dataset is never re-serialized and clients that
+already hold it can be answered with 304 Not Modified.
+"""
+import gzip
+import hashlib
+import json
+import threading
+
+try:
+    import orjson
+except ImportError:   # optional: ~5-10x faster encoding
+    orjson = None
+
+try:
+    import brotli
+except ImportError:   # optional: only gzip is offered without it
+    brotli = None
+
+MIN_COMPRESS_BYTES = 1024
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def dumps(obj) -> bytes:
+    """Compact JSON bytes, as FastAPI's JSONResponse would render them."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+class SerializedPayload:
+    """A JSON body, its ETag, and lazily compressed copies."""
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        self._encoded = {}
+        self._lock = threading.Lock()
+
+    def etag(self, encoding=None) -> str:
+        """Strong ETag of one representation (each content-coding gets its own, per RFC 9110)."""
+        return f'"{self.digest}-{encoding}"' if encoding else f'"{self.digest}"'
+
+    @property
+    def etags(self):
+        return {self.etag()} | {self.etag(e) for e in ENCODINGS}
+
+    def encoded(self, encoding) -> bytes:
+        data = self._encoded.get(encoding)
+        if data is None:
+            with self._lock:
+                data = self._encoded.get(encoding)
+                if data is None:
+                    if encoding == "gzip":
+                        data = gzip.compress(self.body, compresslevel=6, mtime=0)
+                    elif encoding == "br" and brotli is not None:
+                        data = brotli.compress(self.body, quality=5)
+                    else:
+                        raise ValueError(f"unsupported encoding: {encoding}")
+                    self._encoded[encoding] = data
+        return data
+
+    def negotiate(self, accept_encoding: str):
+        """Best content-coding the client accepts (None for identity or small bodies)."""
+        if len(self.body) < MIN_COMPRESS_BYTES or not accept_encoding:
+            return None
+        offered = {}
+        for part in accept_encoding.lower().split(","):
+            name, _, params = part.strip().partition(";")
+            q = 1.0
+            if params.strip().startswith("q="):
+                try:
+                    q = float(params.strip()[2:])
+                except ValueError:
+                    q = 0.0
+            offered[name.strip()] = q
+        for encoding in ENCODINGS:
+            if offered.get(encoding, offered.get("*", 0)) > 0:
+                return encoding
+        return None
+
+
+def build_payload(obj) -> SerializedPayload:
+    return SerializedPayload(dumps(obj))
@@ -0,0 +1,39 @@
+"""
+Worker process pools shared by the CPU-bound engines.
+
+Pools are created on first use, one per worker count, and live until the
+app shuts down (see the lifespan in main.py), so a request never pays for
+starting processes. Workers are started with "forkserver" where the
+platform has it and "spawn" otherwise: the API server runs request
+threads, and forking it could copy a lock another thread holds into a
+child where nothing will ever release it.
+"""
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+_pools = {}
+_lock = threading.Lock()
+
+
+def _context():
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def get_pool(workers: int) -> ProcessPoolExecutor:
+    """The shared pool with `workers` processes."""
+    with _lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            pool = _pools[workers] = ProcessPoolExecutor(max_workers=workers, mp_context=_context())
+        return pool
+
+
+def shutdown_pools():
+    """Stop every pool's workers; the next get_pool() starts a fresh pool."""
+    with _lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,232 @@
+"""
+Transitive downstream reachability over the CSR dependency graph.
+
+Every node gets a bitset (a Python int) of the nodes downstream of it, so
+"what is downstream of X" for any set of suppliers is an OR of bitsets and
+its size a popcount. Strongly connected components are condensed first, and
+Tarjan emits them sinks-first, so each component's bitset is built from
+already finished successors in a single pass. Bit positions follow that
+same order, which keeps the bitsets of downstream-heavy tiers short.
+"""
+import numpy as np
+from engines.metrics import timed
+
+
+def _strongly_connected(n, indptr, indices):
+    """Iterative Tarjan SCC; components come out in reverse topological order."""
+    index = [-1] * n
+    low = [0] * n
+    on_stack = [False] * n
+    stack, comps, counter = [], [], 0
+    for root in range(n):
+        if index[root] != -1:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        work = [(root, indptr[root])]
+        while work:
+            u, e = work[-1]
+            if e < indptr[u + 1]:
+                work[-1] = (u, e + 1)
+                v = indices[e]
+                if index[v] == -1:
+                    index[v] = low[v] = counter
+                    counter += 1
+                    stack.append(v)
+                    on_stack[v] = True
+                    work.append((v, indptr[v]))
+                elif on_stack[v] and index[v] < low[u]:
+                    low[u] = index[v]
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    if low[u] < low[parent]:
+                        low[parent] = low[u]
+                if low[u] == index[u]:
+                    comp = []
+                    while True:
+                        w = stack.pop()
+                        on_stack[w] = False
+                        comp.append(w)
+                        if w == u:
+                            break
+                    comps.append(comp)
+    return comps
+
+
+class ReachabilityIndex:
+    """Downstream bitsets for every supplier, kept current as edges change.
+
+    Built from a CascadeGraph, but owns its adjacency afterwards so that
+    dependencies can be added or removed without rebuilding.
+    """
+
+    def __init__(self, cg):
+        n = cg.n_nodes
+        indptr, indices = cg._indptr, cg._indices
+        self.node_ids = list(cg.node_ids)
+        self.index_of = dict(cg.index_of)
+        self.succ = [set(indices[indptr[u]:indptr[u + 1]]) for u in range(n)]
+        self.pred = [set() for _ in range(n)]
+        for u in range(n):
+            for v in self.succ[u]:
+                self.pred[v].add(u)
+
+        comps = _strongly_connected(n, indptr, indices)
+        self.node_at = [u for comp in comps for u in comp]
+        self.bit_of = [0] * n
+        for pos, u in enumerate(self.node_at):
+            self.bit_of[u] = pos
+        comp_of = [0] * n
+        for c, comp in enumerate(comps):
+            for u in comp:
+                comp_of[u] = c
+
+        members = [0] * len(comps)
+        reach = [0] * len(comps)
+        for c, comp in enumerate(comps):
+            mask, cyclic = 0, False
+            for u in comp:
+                members[c] |= 1 << self.bit_of[u]
+                for v in self.succ[u]:
+                    d = comp_of[v]
+                    if d != c:
+                        mask |= members[d] | reach[d]
+                    else:
+                        cyclic = True
+            # Members of a cycle (or a self-loop) are downstream of each other
+            reach[c] = mask | members[c] if cyclic else mask
+        self.downstream_bits = [reach[comp_of[u]] for u in range(n)]
+
+    # ── queries ────────────────────────────────────────────────────────────
+    def nodes_of(self, supplier_ids):
+        index_of = self.index_of
+        return [index_of[sid] for sid in supplier_ids if sid in index_of]
+
+    def mask_of(self, nodes):
+        """Bitset of the given node indices themselves."""
+        mask = 0
+        for u in nodes:
+            mask |= 1 << self.bit_of[u]
+        return mask
+
+    def downstream_mask(self, nodes):
+        """Bitset of every node downstream of any of `nodes`, excluding `nodes` themselves."""
+        mask = 0
+        for u in nodes:
+            mask |= self.downstream_bits[u]
+        return mask & ~self.mask_of(nodes)
+
+    def nodes_in(self, mask):
+        """Node indices whose bits are set in `mask`."""
+        if not mask:
+            return []
+        raw = np.frombuffer(mask.to_bytes((mask.bit_length() + 7) // 8, "little"), dtype=np.uint8)
+        positions = np.flatnonzero(np.unpackbits(raw, bitorder="little"))
+        node_at = self.node_at
+        return [node_at[p] for p in positions.tolist()]
+
+    def downstream(self, supplier_ids):
+        """Supplier ids downstream of any of `supplier_ids`, excluding those suppliers."""
+        node_ids = self.node_ids
+        return [node_ids[u] for u in self.nodes_in(self.downstream_mask(self.nodes_of(supplier_ids)))]
+
+    def count_downstream(self, supplier_ids):
+        return self.downstream_mask(self.nodes_of(supplier_ids)).bit_count()
+
+    # ── incremental maintenance ────────────────────────────────────────────
+    def _node(self, supplier_id):
+        u = self.index_of.get(supplier_id)
+        if u is None:
+            u = self.index_of[supplier_id] = len(self.node_ids)
+            self.node_ids.append(supplier_id)
+            self.succ.append(set())
+            self.pred.append(set())
+            self.bit_of.append(len(self.node_at))
+            self.node_at.append(u)
+            self.downstream_bits.append(0)
+        return u
+
+    def _ancestors(self, u):
+        """`u` plus every node upstream of it."""
+        seen, stack = {u}, [u]
+        while stack:
+            for w in self.pred[stack.pop()]:
+                if w not in seen:
+                    seen.add(w)
+                    stack.append(w)
+        return seen
+
+    def add_node(self, supplier_id):
+        self._node(supplier_id)
+
+    def add_edge(self, from_id, to_id):
+        """Account for a new dependency: everything upstream of it gains `to_id` and its downstream."""
+        u, v = self._node(from_id), self._node(to_id)
+        if v in self.succ[u]:
+            return
+        self.succ[u].add(v)
+        self.pred[v].add(u)
+        bits = self.downstream_bits
+        gain = (1 << self.bit_of[v]) | bits[v]
+        # Ancestors of a node already covering `gain` cover it too, so stop there
+        stack = [u]
+        while stack:
+            w = stack.pop()
+            if gain & ~bits[w]:
+                bits[w] |= gain
+                stack.extend(self.pred[w])
+
+    def remove_edge(self, from_id, to_id):
+        """Drop a dependency and recompute the bitsets of everything upstream of it."""
+        u, v = self.index_of.get(from_id), self.index_of.get(to_id)
+        if u is None or v is None or v not in self.succ[u]:
+            return
+        self.succ[u].discard(v)
+        self.pred[v].discard(u)
+        self._recompute(self._ancestors(u))
+
+    def remove_node(self, supplier_id):
+        """Detach a supplier from the graph (its index stays allocated but isolated)."""
+        u = self.index_of.get(supplier_id)
+        if u is None:
+            return
+        affected = set()
+        for w in list(self.pred[u]):
+            self.succ[w].discard(u)
+            affected |= self._ancestors(w)
+        for v in self.succ[u]:
+            self.pred[v].discard(u)
+        self.pred[u].clear()
+        self.succ[u].clear()
+        self.downstream_bits[u] = 0
+        self._recompute(affected)
+
+    def _recompute(self, affected):
+        """Least fixed point of bits[w] = OR(succ bit | succ bits) over `affected`.
+
+        Iterating sinks-first converges in one pass on a DAG whose order is
+        unchanged and in a few more after edges were added against it.
+        """
+        bits, bit_of, succ = self.downstream_bits, self.bit_of, self.succ
+        order = sorted(affected, key=bit_of.__getitem__)
+        for w in order:
+            bits[w] = 0
+        changed = True
+        while changed:
+            changed = False
+            for w in order:
+                mask = 0
+                for x in succ[w]:
+                    mask |= (1 << bit_of[x]) | bits[x]
+                if mask != bits[w]:
+                    bits[w] = mask
+                    changed = True
+
+
+@timed
+def build_reachability_index(cg) -> ReachabilityIndex:
+    return ReachabilityIndex(cg)
@@ -1,56 +1,55 @@
-from engines.risk_engine import get_scored_suppliers
+from engines.snapshot import get_snapshot
+from engines.scoring_kernel import RISK_LEVELS
+import numpy as np
 import random
+from engines.metrics import timed
 
 _rng = random.Random(77)
 
-def get_recommendations(suppliers=None, dependencies=None):
+@timed
+def get_recommendations(suppliers=None, dependencies=None, top_k=1, limit=25):
+    """Lower-risk alternatives for every high/critical risk supplier.
+
+    With top_k > 1 each recommendation also lists the `top_k` best
+    alternatives, lowest risk first.
+    """
     if suppliers is None:
         from data.seed_data import get_data
         d = get_data(); suppliers, dependencies = d["suppliers"], d["dependencies"]
-    scored = get_scored_suppliers(suppliers, dependencies)
+    snap = get_snapshot(suppliers, dependencies)
+    table = snap.score_table
+    alt_index = snap.alternative_index
+    scores = table.risk_score
+
+    def alt_fields(score, r):
+        alt = suppliers[r]
+        return {"alt_supplier_id": alt["id"], "alt_supplier_name": alt["name"],
+                "alt_country": alt["country_name"], "alt_risk_score": score}
 
     # Only recommend for high/critical risk suppliers
-    high_risk = [s for s in scored if s["risk_score"] >= 55]
+    high_risk = np.flatnonzero(scores >= 55).tolist()
 
     recommendations = []
-    for risky in high_risk:
-        # Find alternative suppliers: same industry, same component or similar, different country, lower risk
-        alternatives = [
-            s for s in scored
-            if s["id"] != risky["id"]
-            and s["industry"] == risky["industry"]
-            and s["country_code"] != risky["country_code"]
-            and s["risk_score"] < risky["risk_score"] - 10
-            and s["tier"] == risky["tier"]
-        ]
-
-        if not alternatives:
-            alternatives = [
-                s for s in scored
-                if s["id"] != risky["id"]
-                and s["country_code"] != risky["country_code"]
-                and s["risk_score"] < risky["risk_score"] - 15
-                and s["tier"] == risky["tier"]
-            ]
+    for r in high_risk:
+        risky = suppliers[r]
+        risky_score = float(scores[r])
+        found = alt_index.alternatives(r, k=top_k)
 
-        if alternatives:
-            best_alt = min(alternatives, key=lambda x: x["risk_score"])
-            risk_reduction = round(risky["risk_score"] - best_alt["risk_score"], 1)
+        if found:
+            best_score, best_row = found[0]
+            risk_reduction = round(risky_score - best_score, 1)
             cost_change = round(_rng.uniform(-5, 18), 1)
             lead_time_change = _rng.randint(-5, 15)
 
-            recommendations.append({
+            rec = {
                 "risky_supplier_id": risky["id"],
                 "risky_supplier_name": risky["name"],
                 "risky_country": risky["country_name"],
-                "risky_risk_score": risky["risk_score"],
-                "risky_risk_level": risky["risk_level"],
+                "risky_risk_score": risky_score,
+                "risky_risk_level": RISK_LEVELS[table.level[r]],
                 "industry": risky["industry"],
                 "component": risky["component"],
-                "alt_supplier_id": best_alt["id"],
-                "alt_supplier_name": best_alt["name"],
-                "alt_country": best_alt["country_name"],
-                "alt_risk_score": best_alt["risk_score"],
+                **alt_fields(best_score, best_row),
                 "risk_reduction_pct": risk_reduction,
                 "cost_change_pct": cost_change,
                 "lead_time_change_days": lead_time_change,
@@ -59,6 +58,9 @@ def get_recommendations(suppliers=None, dependencies=None):
                     else "Moderate" if risk_reduction > 15
                     else "Weak"
                 ),
-            })
+            }
+            if top_k > 1:
+                rec["alternatives"] = [alt_fields(score, alt_row) for score, alt_row in found]
+            recommendations.append(rec)
 
-    return sorted(recommendations, key=lambda x: x["risky_risk_score"], reverse=True)[:25]
+    return sorted(recommendations, key=lambda x: x["risky_risk_score"], reverse=True)[:limit]
@@ -1,6 +1,11 @@
-from engines.risk_engine import get_scored_suppliers, get_overview
-from engines.graph_engine import simulate_disruption
+from engines.risk_engine import get_overview
+from engines.graph_engine import simulate_disruption, count_downstream
+from engines.snapshot import get_snapshot
+from engines.monte_carlo import simulate_monte_carlo
+from engines.geo_index import suppliers_in_area, validate_area
+from data.supplier_table import column_values
 import random
+from engines.metrics import timed
 
 _rng = random.Random(55)
 
@@ -12,39 +17,71 @@ SCENARIO_DEFINITIONS = {
     "pandemic":            {"label":"Pandemic / Workforce Shutdown","description":"Epidemic forces factory shutdowns across the target country.","icon":"🦠","recovery_days_range":(30,90),"impact_multiplier":0.9},
 }
 
+def _resolve_area(snap, center_lat=None, center_lng=None, radius_km=None, polygon=None):
+    """(supplier ids, label) inside a geographic target, None if none was given; plus an error message."""
+    if polygon is None and center_lat is None and center_lng is None and radius_km is None:
+        return None, None
+    error = validate_area(center_lat, center_lng, radius_km, polygon)
+    if error:
+        return None, error
+    return suppliers_in_area(snap.geo_index, center_lat, center_lng, radius_km, polygon), None
+
+def _resolve_targets(suppliers, supplier_map, target_country=None, target_supplier_id=None, area=None):
+    """Initial affected supplier ids and a display label, or an error message.
+
+    Targets are tried in order: supplier id, area (from _resolve_area), country.
+    """
+    if target_supplier_id:
+        initial_affected = [target_supplier_id]
+        target_label = supplier_map[target_supplier_id]["name"] if target_supplier_id in supplier_map else f"Supplier {target_supplier_id}"
+    elif area is not None:
+        initial_affected, target_label = area
+        if not initial_affected:
+            return None, None, f"No suppliers found in: {target_label}"
+    elif target_country:
+        wanted = target_country.lower()
+        initial_affected = [sid for sid, code, name in zip(column_values(suppliers, "id"), column_values(suppliers, "country_code"),
+                                                           column_values(suppliers, "country_name"))
+                            if code == target_country or name.lower() == wanted]
+        target_label = target_country
+    else:
+        return None, None, "Must provide target_country, target_supplier_id or an area (center and radius, or polygon)"
+
+    if not initial_affected:
+        return None, None, f"No suppliers found for: {target_country or target_supplier_id}"
+    return initial_affected, target_label, None
+
+@timed
 def run_scenario(scenario_type: str, target_country: str = None, target_supplier_id: int = None,
-                 severity: float = 1.0, suppliers=None, dependencies=None):
+                 severity: float = 1.0, suppliers=None, dependencies=None, center_lat: float = None,
+                 center_lng: float = None, radius_km: float = None, polygon=None):
     if scenario_type not in SCENARIO_DEFINITIONS:
         return {"error": f"Unknown scenario: {scenario_type}"}
+    if not severity > 0:
+        return {"error": "severity must be positive"}
 
     if suppliers is None:
         from data.seed_data import get_data
         d = get_data(); suppliers, dependencies = d["suppliers"], d["dependencies"]
 
     scenario_def = SCENARIO_DEFINITIONS[scenario_type]
-    scored = get_scored_suppliers(suppliers, dependencies)
-
-    # Determine affected initial nodes
-    if target_supplier_id:
-        initial_affected = [target_supplier_id]
-        target_label = next((s["name"] for s in suppliers if s["id"] == target_supplier_id), f"Supplier {target_supplier_id}")
-    elif target_country:
-        initial_affected = [s["id"] for s in suppliers if s["country_code"] == target_country or s["country_name"].lower() == target_country.lower()]
-        target_label = target_country
-    else:
-        return {"error": "Must provide target_country or target_supplier_id"}
+    snap = get_snapshot(suppliers, dependencies)
+    supplier_map = snap.supplier_map
 
-    if not initial_affected:
-        return {"error": f"No suppliers found for: {target_country or target_supplier_id}"}
+    area, error = _resolve_area(snap, center_lat, center_lng, radius_km, polygon)
+    if error:
+        return {"error": error}
+    initial_affected, target_label, error = _resolve_targets(suppliers, supplier_map, target_country, target_supplier_id, area)
+    if error:
+        return {"error": error}
 
     cascade = simulate_disruption(initial_affected, suppliers, dependencies)
 
-    score_map = {s["id"]: s for s in scored}
+    table = snap.score_table
     enriched_cascade = []
     for c in cascade:
         sid = c["supplier_id"]
-        scored_data = score_map.get(sid, {})
-        enriched_cascade.append({**c, "risk_score": scored_data.get("risk_score", 50), "risk_level": scored_data.get("risk_level", "medium")})
+        enriched_cascade.append({**c, "risk_score": table.score_of(sid, 50), "risk_level": table.level_of(sid, "medium")})
 
     total_suppliers = len(suppliers)
     directly_affected = len(initial_affected)
@@ -55,6 +92,7 @@ def run_scenario(scenario_type: str, target_country: str = None, target_supplier
 
     before = get_overview(suppliers, dependencies)
     after_resilience = max(0, before["resilience_score"] - (impact_pct * 0.6))
+    capacity = snap.capacity_index.lost_capacity(initial_affected)
 
     return {
         "scenario_type": scenario_type,
@@ -66,9 +104,114 @@ def run_scenario(scenario_type: str, target_country: str = None, target_supplier
         "cascade_affected_count": cascaded_affected,
         "total_affected_pct": total_affected_pct,
         "estimated_production_impact_pct": impact_pct,
+        "lost_capacity_pct": capacity["lost_capacity_pct"],
+        "tier1_capacity_affected_count": capacity["tier1_affected_count"],
+        "tier1_cut_off_count": capacity["tier1_cut_off_count"],
         "estimated_recovery_days": recovery_days,
         "before_resilience_score": before["resilience_score"],
         "after_resilience_score": round(after_resilience, 1),
         "cascade_details": sorted(enriched_cascade, key=lambda x: x.get("risk_score", 0), reverse=True)[:30],
-        "initial_affected_suppliers": [{"id": sid, "name": next((s["name"] for s in suppliers if s["id"] == sid), f"S{sid}"), "country": next((s["country_name"] for s in suppliers if s["id"] == sid), "")} for sid in initial_affected[:10]],
+        "initial_affected_suppliers": [{"id": sid, "name": supplier_map[sid]["name"] if sid in supplier_map else f"S{sid}", "country": supplier_map[sid]["country_name"] if sid in supplier_map else ""} for sid in initial_affected[:10]],
+    }
+
+@timed
+def run_monte_carlo(scenario_type: str, target_country: str = None, target_supplier_id: int = None,
+                    severity: float = 1.0, trials: int = 1000, seed: int = 42,
+                    suppliers=None, dependencies=None, center_lat: float = None,
+                    center_lng: float = None, radius_km: float = None, polygon=None):
+    """Distribution of scenario outcomes over `trials` stochastic cascades."""
+    if scenario_type not in SCENARIO_DEFINITIONS:
+        return {"error": f"Unknown scenario: {scenario_type}"}
+    if not severity > 0:
+        return {"error": "severity must be positive"}
+
+    if suppliers is None:
+        from data.seed_data import get_data
+        d = get_data(); suppliers, dependencies = d["suppliers"], d["dependencies"]
+
+    scenario_def = SCENARIO_DEFINITIONS[scenario_type]
+    snap = get_snapshot(suppliers, dependencies)
+    area, error = _resolve_area(snap, center_lat, center_lng, radius_km, polygon)
+    if error:
+        return {"error": error}
+    initial_affected, target_label, error = _resolve_targets(suppliers, snap.supplier_map, target_country, target_supplier_id, area)
+    if error:
+        return {"error": error}
+
+    result = simulate_monte_carlo(
+        snap.cascade_graph, initial_affected, severity,
+        scenario_def["recovery_days_range"], scenario_def["impact_multiplier"],
+        total_suppliers=len(suppliers), trials=trials, seed=seed,
+    )
+    return {
+        "scenario_type": scenario_type,
+        "scenario_label": scenario_def["label"],
+        "target": target_label,
+        "directly_affected_count": len(initial_affected),
+        **result,
+    }
+
+@timed
+def run_sweep(scenario_type: str, target_kind: str = "country", targets=None, tier: int = None,
+              severity: float = 1.0, limit: int = None, suppliers=None, dependencies=None):
+    """Headline scenario metrics for every target of a kind, ranked by production impact.
+
+    All cascades share one downstream-reachability index and one baseline overview, so
+    sweeping every country or supplier costs about as much as a single run.
+    """
+    if scenario_type not in SCENARIO_DEFINITIONS:
+        return {"error": f"Unknown scenario: {scenario_type}"}
+    if not severity > 0:
+        return {"error": "severity must be positive"}
+    if target_kind not in ("country", "supplier"):
+        return {"error": f"Unknown target kind: {target_kind}"}
+
+    if suppliers is None:
+        from data.seed_data import get_data
+        d = get_data(); suppliers, dependencies = d["suppliers"], d["dependencies"]
+
+    scenario_def = SCENARIO_DEFINITIONS[scenario_type]
+    snap = get_snapshot(suppliers, dependencies)
+
+    # target key -> (label, initial affected supplier ids)
+    groups = {}
+    if target_kind == "country":
+        wanted = {str(t).lower() for t in targets} if targets else None
+        for sid, cc, cn in zip(column_values(suppliers, "id"), column_values(suppliers, "country_code"),
+                               column_values(suppliers, "country_name")):
+            if wanted is None or cc.lower() in wanted or cn.lower() in wanted:
+                groups.setdefault(cc, (cn, []))[1].append(sid)
+    else:
+        supplier_map = snap.supplier_map
+        ids = targets or [s["id"] for s in suppliers if tier is None or s["tier"] == tier]
+        for sid in ids:
+            if sid in supplier_map:
+                groups[sid] = (supplier_map[sid]["name"], [sid])
+
+    before = get_overview(suppliers, dependencies)["resilience_score"]
+    total_suppliers = len(suppliers)
+    results = []
+    for key, (label, initial_affected) in groups.items():
+        cascaded = count_downstream(initial_affected, suppliers, dependencies)
+        total_affected_pct = round((len(initial_affected) + cascaded) / total_suppliers * 100, 1)
+        impact_pct = round(min(95, total_affected_pct * scenario_def["impact_multiplier"] * severity), 1)
+        results.append({
+            "target": key, "target_label": label,
+            "directly_affected_count": len(initial_affected),
+            "cascade_affected_count": cascaded,
+            "total_affected_pct": total_affected_pct,
+            "estimated_production_impact_pct": impact_pct,
+            "after_resilience_score": round(max(0, before - impact_pct * 0.6), 1),
+        })
+    results.sort(key=lambda r: r["estimated_production_impact_pct"], reverse=True)
+
+    lo, hi = scenario_def["recovery_days_range"]
+    return {
+        "scenario_type": scenario_type,
+        "scenario_label": scenario_def["label"],
+        "target_kind": target_kind,
+        "before_resilience_score": before,
+        "expected_recovery_days": (lo + hi) // 2,
+        "target_count": len(results),
+        "results": results[:limit] if limit else results,
     }
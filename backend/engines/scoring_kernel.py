@@ -0,0 +1,217 @@
+"""
+Columnar risk-scoring kernel.
+
+Supplier risk inputs are held as NumPy columns and the weighted score and
+risk level are computed for every supplier in one vectorized pass. Scored
+dicts are only materialized for the rows an endpoint actually returns, and
+dashboard aggregates (overview, country, industry) are grouped reductions
+over the columns instead of Python dict accumulation.
+
+The five local factors make up a supplier's local score. Inherited risk
+(engines.inherited_risk) propagates local scores downstream over the whole
+network, so while it has a weight it is recomputed for every row whenever
+any row is rescored, and the rows whose inherited value moved are rescored
+with it. Dependency edits patch the target's row of the propagation matrix.
+"""
+import os
+
+import numpy as np
+
+from data.supplier_table import column_values
+from engines import inherited_risk
+
+WEIGHTS = {"geo": 0.25, "fin": 0.20, "weather": 0.20, "concentration": 0.20, "centrality": 0.15}
+# Share of the final score taken by inherited upstream risk; the local factors share the rest.
+# Opt-in: at 0 the score is the local one and propagation is skipped (inherited_risk stays 0).
+INHERITED_RISK_WEIGHT = float(os.getenv("RESILIO_INHERITED_RISK_WEIGHT", "0"))
+RISK_LEVELS = ("low", "medium", "high", "critical")
+LEVEL_THRESHOLDS = (35, 55, 75)   # medium, high, critical
+CRITICAL = RISK_LEVELS.index("critical")
+
+
+def _intern(values):
+    """Map values to dense int codes in first-seen order."""
+    codes, labels, idx = {}, [], []
+    for v in values:
+        code = codes.get(v)
+        if code is None:
+            code = codes[v] = len(labels)
+            labels.append(v)
+        idx.append(code)
+    return labels, np.asarray(idx, dtype=np.int32)
+
+
+class ScoreTable:
+    """Risk scores for a supplier list, one NumPy column per factor."""
+
+    def __init__(self, suppliers, centrality, max_in_volume, dependency_index=None):
+        self.suppliers = suppliers
+        self.dependency_index = dependency_index
+        n = len(suppliers)
+        self.ids = column_values(suppliers, "id")
+        self.row_of = {sid: r for r, sid in enumerate(self.ids)}
+        self.geo = np.array(column_values(suppliers, "geographic_risk"), dtype=np.float64)
+        self.fin = np.array(column_values(suppliers, "financial_risk"), dtype=np.float64)
+        self.centrality = np.fromiter((centrality.get(sid, 0) for sid in self.ids), np.float64, n)
+        self.concentration = np.minimum(
+            100, np.fromiter((max_in_volume.get(sid, 0) for sid in self.ids), np.float64, n))
+        self.weather = np.empty(n)
+        self.centrality_risk = np.empty(n)
+        self.local_score = np.empty(n)
+        self.inherited = np.zeros(n)
+        self._propagation = None
+        self.risk_score = np.empty(n)
+        self.level = np.empty(n, dtype=np.int8)
+        self._derive(slice(None))
+
+        self.countries, self.country_idx = _intern(column_values(suppliers, "country_code"))
+        self.industries, self.industry_idx = _intern(column_values(suppliers, "industry"))
+
+    def _derive(self, rows):
+        """Recompute derived factors, score and level for `rows` from the input columns.
+
+        Returns the rows rescored: `rows` plus any whose inherited risk changed.
+        """
+        geo, fin, conc = self.geo[rows], self.fin[rows], self.concentration[rows]
+        weather = np.minimum(100, geo * 0.8 + 10)
+        centrality_risk = np.minimum(100, self.centrality[rows] * 500)
+        raw = (
+            geo * WEIGHTS["geo"] + fin * WEIGHTS["fin"] +
+            weather * WEIGHTS["weather"] + conc * WEIGHTS["concentration"] +
+            centrality_risk * WEIGHTS["centrality"]
+        )
+        self.weather[rows] = weather
+        self.centrality_risk[rows] = centrality_risk
+        self.local_score[rows] = np.clip(raw, 0, 100)
+        changed = self._inherit()
+        if not isinstance(rows, slice):
+            rows = np.union1d(rows, changed)
+        raw = self.local_score[rows] * (1 - INHERITED_RISK_WEIGHT) + self.inherited[rows] * INHERITED_RISK_WEIGHT
+        score = np.round(np.clip(raw, 0, 100), 1)
+        medium, high, critical = LEVEL_THRESHOLDS
+        self.risk_score[rows] = score
+        self.level[rows] = np.select([score >= critical, score >= high, score >= medium], [3, 2, 1], default=0)
+        return rows
+
+    def _inherit(self):
+        """Re-propagate local scores downstream; returns the rows whose inherited risk changed."""
+        if self.dependency_index is None or not INHERITED_RISK_WEIGHT:
+            return np.zeros(0, dtype=np.int64)
+        if self._propagation is None:
+            self._propagation = inherited_risk.propagation_matrix(self.row_of, self.dependency_index.incoming)
+        inherited = inherited_risk.propagate(self._propagation, self.local_score)
+        changed = np.flatnonzero(inherited != self.inherited)
+        self.inherited = inherited
+        return changed
+
+    # ── incremental maintenance (see AnalysisSnapshot mutation hooks) ─────
+    def update_rows(self, rows, centrality, max_in_volume):
+        """Re-read inputs for `rows` from the supplier dicts and rescore them.
+
+        Returns every row whose score was recomputed, which includes the ones
+        downstream of `rows` whose inherited risk changed.
+        """
+        rows = np.asarray(sorted(rows), dtype=np.int64)
+        if not len(rows):
+            return rows
+        suppliers, ids = self.suppliers, self.ids
+        self.geo[rows] = [suppliers[r]["geographic_risk"] for r in rows.tolist()]
+        self.fin[rows] = [suppliers[r]["financial_risk"] for r in rows.tolist()]
+        self.centrality[rows] = [centrality.get(ids[r], 0) for r in rows.tolist()]
+        self.concentration[rows] = np.minimum(100, [max_in_volume.get(ids[r], 0) for r in rows.tolist()])
+        for r in rows.tolist():
+            self.country_idx[r] = self._code(self.countries, suppliers[r]["country_code"])
+            self.industry_idx[r] = self._code(self.industries, suppliers[r]["industry"])
+        return self._derive(rows)
+
+    def set_centrality(self, centrality):
+        """Replace the whole centrality column and rescore every row."""
+        self.centrality[:] = [centrality.get(sid, 0) for sid in self.ids]
+        self._derive(slice(None))
+
+    def update_propagation(self, supplier_id):
+        """Dependencies into `supplier_id` changed: patch its row of the propagation matrix."""
+        r = self.row_of.get(supplier_id)
+        if self._propagation is not None and r is not None:
+            edges = self.dependency_index.incoming.get(supplier_id, {})
+            self._propagation = inherited_risk.set_row(self._propagation, r, self.row_of, edges)
+
+    @staticmethod
+    def _code(labels, value):
+        try:
+            return labels.index(value)
+        except ValueError:
+            labels.append(value)
+            return len(labels) - 1
+
+    _COLUMNS = ("geo", "fin", "centrality", "concentration", "weather", "centrality_risk",
+                "local_score", "inherited", "risk_score", "level", "country_idx", "industry_idx")
+
+    def append_row(self, centrality, max_in_volume):
+        """Score the supplier just appended to the supplier list."""
+        r = len(self.ids)
+        self.ids.append(self.suppliers[r]["id"])
+        self.row_of[self.ids[r]] = r
+        for col in self._COLUMNS:
+            arr = getattr(self, col)
+            setattr(self, col, np.append(arr, np.zeros(1, dtype=arr.dtype)))
+        if self._propagation is not None:
+            self._propagation = inherited_risk.add_row(self._propagation)
+        self.update_rows([r], centrality, max_in_volume)
+
+    def remove_row(self, r):
+        """Drop row `r` (the supplier has already been removed from the list)."""
+        del self.row_of[self.ids.pop(r)]
+        for sid in self.ids[r:]:
+            self.row_of[sid] -= 1
+        for col in self._COLUMNS:
+            setattr(self, col, np.delete(getattr(self, col), r))
+        if self._propagation is not None:
+            self._propagation = inherited_risk.remove_row(self._propagation, r)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def score_of(self, supplier_id, default=None):
+        r = self.row_of.get(supplier_id)
+        return default if r is None else float(self.risk_score[r])
+
+    def level_of(self, supplier_id, default=None):
+        r = self.row_of.get(supplier_id)
+        return default if r is None else RISK_LEVELS[self.level[r]]
+
+    def row(self, r):
+        """Materialize one scored supplier dict."""
+        return {
+            **self.suppliers[r],
+            "risk_score": float(self.risk_score[r]), "risk_level": RISK_LEVELS[self.level[r]],
+            "geo_risk": round(float(self.geo[r]), 1), "fin_risk": round(float(self.fin[r]), 1),
+            "weather_risk": round(float(self.weather[r]), 1),
+            "concentration_risk": round(float(self.concentration[r]), 1),
+            "centrality_risk": round(float(self.centrality_risk[r]), 1),
+            "centrality_score": round(float(self.centrality[r]), 4),
+            "inherited_risk": round(float(self.inherited[r]), 1),
+        }
+
+    def rows(self, rows=None):
+        if rows is None:
+            rows = range(len(self))
+        return [self.row(int(r)) for r in rows]
+
+    def top(self, limit):
+        """Row indices of the `limit` highest scores (ties keep dataset order)."""
+        return np.argsort(-self.risk_score, kind="stable")[:limit]
+
+    def level_counts(self):
+        return np.bincount(self.level, minlength=len(RISK_LEVELS))
+
+    def group_stats(self, group_idx, n_groups):
+        """Per-group supplier count, summed risk score and critical count."""
+        counts = np.bincount(group_idx, minlength=n_groups)
+        totals = np.bincount(group_idx, weights=self.risk_score, minlength=n_groups)
+        critical = np.bincount(group_idx, weights=self.level == CRITICAL, minlength=n_groups)
+        return counts, totals, critical.astype(np.int64)
+
+
+def build_score_table(suppliers, centrality, dependency_index) -> ScoreTable:
+    return ScoreTable(suppliers, centrality, dependency_index.max_in_volume, dependency_index)
@@ -0,0 +1,593 @@
+"""
+Per-dataset analysis snapshot shared by every engine.
+
+A single dashboard load fans out to 6-8 endpoints, and each of them used to
+rebuild the supplier graph and rerun betweenness centrality from scratch.
+An AnalysisSnapshot holds those derived structures for one
+(suppliers, dependencies) dataset; they are built lazily on first use and
+reused by every engine until the dataset is invalidated.
+
+Edits made through data.company_data's mutation API are applied to the
+already built structures in place (see the on_* hooks): the dependency
+index, graph and reachability bitsets are patched, only the affected risk
+rows are rescored, and exact centrality is recomputed lazily for just the
+weakly connected components an edit touched. Sampled centrality keeps its
+pivots: a dependency edit reruns only the passes from pivots upstream of
+the edge, which gives the same values as sampling afresh.
+"""
+import itertools
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from engines.metrics import timed
+
+_MAX_SNAPSHOTS = 32
+_snapshots = OrderedDict()
+_lock = threading.Lock()
+_versions = itertools.count(1)
+_EXACT = ("exact", None)
+_ALL = None   # "every row changed" marker for _centrality_changed
+
+
+class AnalysisSnapshot:
+    """Lazily computed graph, centrality, scores and lookup indexes for one dataset."""
+
+    def __init__(self, suppliers, dependencies):
+        self.suppliers = suppliers
+        self.dependencies = dependencies
+        self.version = next(_versions)
+        self._lock = threading.RLock()
+        self._graph = None
+        self._dependency_index = None
+        self._cascade_graph = None
+        self._reachability = None
+        self._centrality = {}
+        self._score_table = None
+        self._scored = None
+        self._score_map = None
+        self._supplier_map = None
+        # Pending incremental work, applied on the next read
+        self._centrality_dirty = set()   # nodes whose component's exact centrality is stale
+        self._centrality_rescale = False  # node count changed: normalization of every node is stale
+        self._exact_n = 0                 # node count the cached exact centrality is normalized for
+        self._centrality_changed = set()  # ids whose centrality changed since the score table synced
+        self._stale_rows = set()          # ids whose non-centrality score inputs changed
+        self._table_centrality_key = None
+        self._sampled = {}                # sampled centrality key -> its pivot ids, for patching
+        self._alternatives = None         # (version, AlternativeIndex)
+        self._graph_payload = None        # (version, SerializedPayload)
+        self._lod = None                  # (version, LodIndex)
+        self._risk_order = None           # (version, (rows, -risk keys, ids)) for sorted supplier pages
+        self._dominators = None           # (version, DominatorTree)
+        self._capacity = None             # (version, CapacityIndex)
+        self._geo = None                  # (version, GeoIndex)
+        self._alert_columns = None        # AlertColumns of the last alert list seen
+        self._alert_index = None          # (version, AlertIndex)
+
+    @property
+    def graph(self):
+        if self._graph is None:
+            with self._lock:
+                if self._graph is None:
+                    from engines.graph_engine import _build_graph
+                    self._graph = _build_graph(self.suppliers, self.dependencies)
+        return self._graph
+
+    @property
+    def dependency_index(self):
+        if self._dependency_index is None:
+            with self._lock:
+                if self._dependency_index is None:
+                    from engines.dependency_index import build_dependency_index
+                    self._dependency_index = build_dependency_index(self.dependencies)
+        return self._dependency_index
+
+    @property
+    def cascade_graph(self):
+        """CSR adjacency for disruption cascades (engines.cascade_engine)."""
+        if self._cascade_graph is None:
+            with self._lock:
+                if self._cascade_graph is None:
+                    from engines.cascade_engine import build_cascade_graph
+                    self._cascade_graph = build_cascade_graph(self.suppliers, self.dependencies)
+        return self._cascade_graph
+
+    @property
+    def reachability(self):
+        """Downstream bitsets per node (engines.reachability), or None for very large graphs."""
+        if self._reachability is None:
+            with self._lock:
+                if self._reachability is None:
+                    from engines.graph_engine import REACHABILITY_MAX_NODES
+                    from engines.reachability import build_reachability_index
+                    cg = self.cascade_graph
+                    self._reachability = (
+                        build_reachability_index(cg) if cg.n_nodes <= REACHABILITY_MAX_NODES else False)
+        return self._reachability or None
+
+    @property
+    def dominator_tree(self):
+        """Supply dominator tree (engines.dominators), rebuilt after edits."""
+        cached = self._dominators
+        if cached is None or cached[0] != self.version:
+            with self._lock:
+                cached = self._dominators
+                if cached is None or cached[0] != self.version:
+                    from data.supplier_table import column_values
+                    from engines.dominators import build_dominator_tree
+                    version = self.version
+                    tiers = dict(zip(column_values(self.suppliers, "id"), column_values(self.suppliers, "tier")))
+                    self._dominators = cached = (version, build_dominator_tree(self.cascade_graph, tiers))
+        return cached[1]
+
+    @property
+    def capacity_index(self):
+        """Max-flow / min-cut redundancy of tier-1 supply (engines.capacity), rebuilt after edits."""
+        cached = self._capacity
+        if cached is None or cached[0] != self.version:
+            with self._lock:
+                cached = self._capacity
+                if cached is None or cached[0] != self.version:
+                    from engines.capacity import build_capacity_index
+                    version = self.version
+                    self._capacity = cached = (version, build_capacity_index(self.cascade_graph, self.suppliers))
+        return cached[1]
+
+    @property
+    def geo_index(self):
+        """KD-tree over supplier locations (engines.geo_index), rebuilt after edits."""
+        cached = self._geo
+        if cached is None or cached[0] != self.version:
+            with self._lock:
+                cached = self._geo
+                if cached is None or cached[0] != self.version:
+                    from engines.geo_index import build_geo_index
+                    version = self.version
+                    self._geo = cached = (version, build_geo_index(self.suppliers))
+        return cached[1]
+
+    def _node_count(self):
+        if self._graph is not None:
+            return self._graph.number_of_nodes()
+        return self.cascade_graph.n_nodes
+
+    @property
+    def centrality(self):
+        """Betweenness centrality using the configured default backend."""
+        return self.get_centrality()
+
+    def get_centrality(self, mode=None, k=None):
+        """Betweenness centrality for a given backend, cached per resolved (mode, k)."""
+        from engines.graph_engine import compute_centrality, resolve_centrality_mode
+        key = resolve_centrality_mode(self._node_count(), mode, k)
+        cached = self._centrality.get(key)
+        if cached is not None and not (key == _EXACT and (self._centrality_dirty or self._centrality_rescale)):
+            return cached
+        with self._lock:
+            if key == _EXACT and key in self._centrality:
+                self._refresh_exact_centrality()
+            if key not in self._centrality and key[0] == "dominator":
+                self._centrality[key] = self.dominator_tree.centrality()
+                self._centrality_changed = _ALL
+            if key not in self._centrality:
+                self._centrality[key] = compute_centrality(self.graph, *key)
+                if key[0] == "sampled":
+                    from engines.betweenness import sample_pivots
+                    from engines.graph_engine import CENTRALITY_SEED
+                    self._sampled[key] = set(sample_pivots(self.graph, key[1], CENTRALITY_SEED))
+                if key == _EXACT:
+                    self._exact_n = self.graph.number_of_nodes()
+                    self._centrality_dirty.clear()
+                    self._centrality_rescale = False
+                self._centrality_changed = _ALL
+            return self._centrality[key]
+
+    @timed
+    def _refresh_exact_centrality(self):
+        """Bring cached exact centrality up to date after edits.
+
+        Betweenness only counts paths inside a weakly connected component, so
+        unnormalized values are recomputed per touched component and scaled by
+        the normalization for the whole graph.
+        """
+        from engines.graph_engine import exact_betweenness
+        G = self.graph
+        cent = self._centrality[_EXACT]
+        n = G.number_of_nodes()
+        if n <= 2:
+            del self._centrality[_EXACT]
+            return
+        scale = 1 / ((n - 1) * (n - 2))
+        if self._centrality_rescale:
+            old_n, self._exact_n = self._exact_n, n
+            for v in [v for v in cent if v not in G]:
+                del cent[v]
+            if old_n > 2:
+                factor = (old_n - 1) * (old_n - 2) * scale
+                for v in cent:
+                    cent[v] *= factor
+            self._centrality_changed = _ALL
+            self._centrality_rescale = False
+        done = set()
+        for v in self._centrality_dirty:
+            if v in done or v not in G:
+                continue
+            comp = _weak_component(G, v)
+            done |= comp
+            sub = exact_betweenness(G.subgraph(comp), normalized=False)
+            for u, b in sub.items():
+                cent[u] = b * scale
+        self._centrality_dirty.clear()
+        if self._centrality_changed is not _ALL:
+            self._centrality_changed |= done
+
+    @property
+    def score_table(self):
+        """Columnar risk scores (engines.scoring_kernel.ScoreTable)."""
+        if self._score_table is None:
+            with self._lock:
+                if self._score_table is None:
+                    from engines.risk_engine import compute_score_table
+                    centrality = self.centrality
+                    self._score_table = compute_score_table(
+                        self.suppliers, self.dependencies, centrality=centrality,
+                        dependency_index=self.dependency_index)
+                    self._table_centrality_key = self._default_centrality_key()
+                    self._centrality_changed = set()
+                    self._stale_rows = set()
+        elif self._scores_pending():
+            with self._lock:
+                if self._scores_pending():
+                    self._refresh_score_table()
+        return self._score_table
+
+    def _default_centrality_key(self):
+        from engines.graph_engine import resolve_centrality_mode
+        return resolve_centrality_mode(self._node_count())
+
+    def _scores_pending(self):
+        return bool(self._stale_rows or self._centrality_changed is _ALL or self._centrality_changed
+                    or (_EXACT in self._centrality and (self._centrality_dirty or self._centrality_rescale))
+                    or self._default_centrality_key() not in self._centrality)
+
+    @timed
+    def _refresh_score_table(self):
+        table = self._score_table
+        centrality = self.centrality
+        key = self._default_centrality_key()
+        changed = self._centrality_changed if key == self._table_centrality_key else _ALL
+        max_in_volume = self.dependency_index.max_in_volume
+        row_of = table.row_of
+        if changed is _ALL:
+            table.set_centrality(centrality)
+            table.update_rows([row_of[i] for i in self._stale_rows if i in row_of], centrality, max_in_volume)
+            rows = None
+        else:
+            rows = [row_of[i] for i in changed | self._stale_rows if i in row_of]
+            rows = table.update_rows(rows, centrality, max_in_volume).tolist()
+        self._table_centrality_key = key
+        self._centrality_changed = set()
+        self._stale_rows = set()
+
+        if rows is None or self._scored is None:
+            self._scored = self._score_map = None
+            return
+        for r in rows:
+            row = table.row(r)
+            self._scored[r] = row
+            if self._score_map is not None:
+                self._score_map[row["id"]] = row
+
+    @property
+    def scored(self):
+        """Scored supplier dicts, in dataset order. Treat as read-only."""
+        table = self.score_table
+        if self._scored is None:
+            with self._lock:
+                if self._scored is None:
+                    self._scored = table.rows()
+        return self._scored
+
+    @property
+    def score_map(self):
+        """Supplier id -> scored supplier dict."""
+        scored = self.scored
+        if self._score_map is None:
+            self._score_map = {s["id"]: s for s in scored}
+        return self._score_map
+
+    @property
+    def alternative_index(self):
+        """Alternative-supplier search index over the current scores."""
+        cached = self._alternatives
+        if cached is None or cached[0] != self.version:
+            with self._lock:
+                from engines.alternatives import build_alternative_index
+                table = self.score_table
+                self._alternatives = cached = (self.version, build_alternative_index(table))
+        return cached[1]
+
+    @property
+    def graph_payload(self):
+        """get_graph_json() serialized for the current version (engines.payload.SerializedPayload)."""
+        cached = self._graph_payload
+        if cached is None or cached[0] != self.version:
+            with self._lock:
+                cached = self._graph_payload
+                if cached is None or cached[0] != self.version:
+                    from engines.graph_engine import get_graph_json
+                    from engines.payload import build_payload
+                    version = self.version
+                    self._graph_payload = cached = (
+                        version, build_payload(get_graph_json(self.suppliers, self.dependencies)))
+        return cached[1]
+
+    @property
+    def lod_index(self):
+        """Clustering / viewport index for level-of-detail graph views (engines.graph_lod)."""
+        cached = self._lod
+        if cached is None or cached[0] != self.version:
+            with self._lock:
+                cached = self._lod
+                if cached is None or cached[0] != self.version:
+                    from engines.graph_lod import build_lod_index
+                    version = self.version
+                    self._lod = cached = (version, build_lod_index(self))
+        return cached[1]
+
+    @property
+    def risk_order(self):
+        """Supplier rows by risk score descending, then id (engines.supplier_query)."""
+        cached = self._risk_order
+        if cached is None or cached[0] != self.version:
+            with self._lock:
+                from engines.supplier_query import risk_order
+                version = self.version
+                self._risk_order = cached = (version, risk_order(self))
+        return cached[1]
+
+    def alert_index(self, raw_alerts):
+        """Alerts enriched with the current scores (engines.alert_index.AlertIndex)."""
+        cached = self._alert_index
+        if cached is None or cached[0] != self.version or not cached[1].columns.matches(raw_alerts):
+            with self._lock:
+                from engines.alert_index import AlertColumns, build_alert_index
+                columns = self._alert_columns
+                if columns is None or not columns.matches(raw_alerts):
+                    self._alert_columns = columns = AlertColumns(raw_alerts)
+                table = self.score_table
+                version = self.version
+                self._alert_index = cached = (version, build_alert_index(columns, table))
+        return cached[1]
+
+    @property
+    def supplier_map(self):
+        """Supplier id -> raw supplier dict."""
+        if self._supplier_map is None:
+            self._supplier_map = {s["id"]: s for s in self.suppliers}
+        return self._supplier_map
+
+    # ── mutation hooks ─────────────────────────────────────────────────────
+    # Called by data.company_data after it has changed the supplier or
+    # dependency list in place, while holding this snapshot's lock.
+
+    def _edited(self, *node_ids):
+        self.version = next(_versions)
+        self._cascade_graph = None   # CSR arrays are immutable: rebuilt on next use
+        for key in [key for key in self._centrality if key[0] == "dominator"]:
+            del self._centrality[key]   # read off the dominator tree, which is rebuilt anyway
+        if _EXACT in self._centrality:
+            self._centrality_dirty.update(node_ids)
+
+    def _sampled_passes(self, u):
+        """Single-source dependencies, on the current graph, of the sampled pivots upstream of `u`.
+
+        Only passes from these pivots can cross an edge out of `u`, so they are
+        all an edit to such an edge changes (see _patch_sampled).
+        """
+        if not self._sampled or self._graph is None:
+            return {}
+        from engines.betweenness import single_source_dependencies
+        G = self._graph
+        pivots = set().union(*self._sampled.values()) & _upstream(G, u)
+        return {p: single_source_dependencies(G._succ, p) for p in pivots}
+
+    def _patch_sampled(self, before):
+        """Swap the `before` passes' contributions for those of the same pivots on the edited graph."""
+        if not before:
+            return
+        from engines.betweenness import single_source_dependencies
+        G = self._graph
+        n = G.number_of_nodes()
+        after = {p: single_source_dependencies(G._succ, p) for p in before}
+        changed = set()
+        for key, pivots in self._sampled.items():
+            cent = self._centrality[key]
+            k = len(pivots)
+            for p in pivots.intersection(before):
+                old, new = before[p], after[p]
+                for w in old.keys() | new.keys():
+                    d = new.get(w, 0.0) - old.get(w, 0.0)
+                    if d:
+                        cent[w] = max(0.0, cent[w] + d / ((k - (w in pivots)) * (n - 2)))
+                        changed.add(w)
+        if self._centrality_changed is not _ALL:
+            self._centrality_changed |= changed
+
+    def _rescale_sampled(self, old_n, removed=None):
+        """Renormalize sampled centrality for a new node count, dropping a removed pivot."""
+        n = self._graph.number_of_nodes()
+        for key in list(self._sampled):
+            pivots, cent = self._sampled[key], self._centrality[key]
+            k = len(pivots)
+            pivots.discard(removed)
+            if len(pivots) < 2 or n <= 2 or old_n <= 2:
+                del self._sampled[key], self._centrality[key]   # too small to patch: sampled afresh
+                continue
+            scale_pivot = (k - 1) * (old_n - 2) / ((len(pivots) - 1) * (n - 2))
+            scale_other = k * (old_n - 2) / (len(pivots) * (n - 2))
+            for v in cent:
+                cent[v] *= scale_pivot if v in pivots else scale_other
+        self._centrality_changed = _ALL
+
+    def on_supplier_added(self, supplier):
+        sid = supplier["id"]
+        self._edited(sid)
+        self._centrality_rescale = True
+        if self._supplier_map is not None:
+            self._supplier_map[sid] = supplier
+        if self._graph is not None:
+            from engines.graph_engine import node_attributes
+            self._graph.add_node(sid, **node_attributes(supplier))
+        if self._reachability:
+            self._reachability.add_node(sid)
+        for key in self._centrality.keys() & (self._sampled.keys() | {_EXACT}):
+            self._centrality[key][sid] = 0.0
+        if self._sampled:
+            self._rescale_sampled(self._graph.number_of_nodes() - 1)
+        if self._score_table is not None:
+            self._score_table.append_row({}, self.dependency_index.max_in_volume)
+            self._stale_rows.add(sid)
+        self._scored = self._score_map = None
+
+    def on_supplier_updated(self, supplier):
+        sid = supplier["id"]
+        self.version = next(_versions)
+        if self._graph is not None and sid in self._graph:
+            from engines.graph_engine import node_attributes
+            self._graph.nodes[sid].update(node_attributes(supplier))
+        self._stale_rows.add(sid)
+
+    def on_supplier_removed(self, supplier, removed_dependencies):
+        sid = supplier["id"]
+        for dep in removed_dependencies:
+            self.on_dependency_removed(dep)
+        self._edited()
+        self._centrality_rescale = True
+        self._centrality_dirty.discard(sid)
+        self._stale_rows.discard(sid)
+        if self._supplier_map is not None:
+            self._supplier_map.pop(sid, None)
+        if self._graph is not None and sid in self._graph:
+            self._graph.remove_node(sid)
+            for key in self._sampled:
+                self._centrality[key].pop(sid, None)
+            if self._sampled:
+                self._rescale_sampled(self._graph.number_of_nodes() + 1, sid)
+        if self._reachability:
+            self._reachability.remove_node(sid)
+        if self._score_table is not None and sid in self._score_table.row_of:
+            self._score_table.remove_row(self._score_table.row_of[sid])
+        self._scored = self._score_map = None
+
+    def on_dependency_added(self, dep):
+        src, dst = dep["from_supplier_id"], dep["to_supplier_id"]
+        self._edited(src, dst)
+        if self._dependency_index is not None:
+            self._dependency_index.add(dep)
+        if self._score_table is not None:
+            self._score_table.update_propagation(dst)
+        if self._graph is not None:
+            before = {} if self._graph.has_edge(src, dst) else self._sampled_passes(src)
+            self._graph.add_edge(src, dst, component=dep["component"],
+                                 volume_percent=dep["volume_percent"], criticality=dep["criticality"])
+            self._patch_sampled(before)
+        if self._reachability:
+            self._reachability.add_edge(src, dst)
+        self._stale_rows.add(dst)
+
+    def on_dependency_removed(self, dep):
+        src, dst = dep["from_supplier_id"], dep["to_supplier_id"]
+        self._edited(src, dst)
+        if self._dependency_index is not None:
+            self._dependency_index.remove(dep)
+        if self._score_table is not None:
+            self._score_table.update_propagation(dst)
+        if self._graph is not None and self._graph.has_edge(src, dst):
+            before = self._sampled_passes(src)
+            self._graph.remove_edge(src, dst)
+            self._patch_sampled(before)
+        if self._reachability:
+            self._reachability.remove_edge(src, dst)
+        self._stale_rows.add(dst)
+
+
+def _weak_component(G, v):
+    """Nodes weakly connected to `v` in a DiGraph."""
+    seen, stack = {v}, [v]
+    while stack:
+        u = stack.pop()
+        for w in G._succ[u]:
+            if w not in seen:
+                seen.add(w)
+                stack.append(w)
+        for w in G._pred[u]:
+            if w not in seen:
+                seen.add(w)
+                stack.append(w)
+    return seen
+
+
+def _upstream(G, v):
+    """`v` and every node with a path to it in a DiGraph."""
+    seen, stack = {v}, [v]
+    while stack:
+        for w in G._pred[stack.pop()]:
+            if w not in seen:
+                seen.add(w)
+                stack.append(w)
+    return seen
+
+
+def _key(suppliers, dependencies):
+    return id(suppliers), id(dependencies)
+
+
+def get_snapshot(suppliers, dependencies=None) -> AnalysisSnapshot:
+    """Return the shared snapshot for this dataset, creating it on first use.
+
+    Datasets are identified by the identity of their lists, so callers that
+    mutate a list in place must either go through the snapshot's on_* hooks
+    (see editing()) or call invalidate() afterwards.
+    """
+    key = _key(suppliers, dependencies)
+    with _lock:
+        snap = _snapshots.get(key)
+        if snap is not None and snap.suppliers is suppliers and snap.dependencies is dependencies:
+            _snapshots.move_to_end(key)
+            return snap
+        snap = AnalysisSnapshot(suppliers, dependencies)
+        _snapshots[key] = snap
+        while len(_snapshots) > _MAX_SNAPSHOTS:
+            _snapshots.popitem(last=False)
+        return snap
+
+
+def peek_snapshot(suppliers, dependencies=None):
+    """The existing snapshot for this dataset, or None if none has been built."""
+    with _lock:
+        snap = _snapshots.get(_key(suppliers, dependencies))
+    if snap is not None and snap.suppliers is suppliers and snap.dependencies is dependencies:
+        return snap
+    return None
+
+
+@contextmanager
+def editing(suppliers, dependencies=None):
+    """Hold the dataset's snapshot lock while editing its lists; yields the snapshot or None."""
+    snap = peek_snapshot(suppliers, dependencies)
+    if snap is None:
+        yield None
+        return
+    with snap._lock:
+        yield snap
+
+
+def invalidate(suppliers=None):
+    """Drop cached snapshots built over `suppliers` (or every snapshot if None)."""
+    with _lock:
+        if suppliers is None:
+            _snapshots.clear()
+            return
+        for key in [k for k, s in _snapshots.items() if s.suppliers is suppliers]:
+            del _snapshots[key]
@@ -0,0 +1,130 @@
+"""
+Filtered, sorted, cursor-paginated supplier listing.
+
+Filters (tier, country, industry) are answered from the SupplierTable's
+inverted indexes: the most selective filter's posting list is walked and
+the others are checked on just the rows visited, so a page costs about
+its own size rather than the dataset's. Pages are keyset-paginated: the
+cursor carries the sort key of the last row returned, so inserts and
+deletes between requests never skip or repeat a supplier.
+
+Sorts: "id" (ascending) or "risk" (risk score descending, then id).
+"""
+import base64
+import json
+from bisect import bisect_right
+
+import numpy as np
+
+from engines.metrics import timed
+from engines.scoring_kernel import RISK_LEVELS
+
+SORTS = ("id", "risk")
+_CHUNK = 256
+_SMALL_POSTING = 4096   # risk sort: below this many candidates, sort them directly instead of scanning
+
+
+def encode_cursor(sort, key) -> str:
+    return base64.urlsafe_b64encode(json.dumps([sort, *key]).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, sort):
+    """The sort key stored in `cursor`; ValueError if it is malformed or from another sort."""
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(raw, list) or not raw or raw[0] != sort:
+        raise ValueError(f"Cursor does not belong to sort={sort}")
+    key = raw[1:]
+    if len(key) != (2 if sort == "risk" else 1) or not all(isinstance(v, (int, float)) for v in key):
+        raise ValueError("Invalid cursor")
+    return key
+
+
+def _walk(order, start, keep, limit):
+    """Rows of `order[start:]` passing `keep`, scanned in chunks until limit + 1 are found."""
+    found, pos, chunk = [], start, max(_CHUNK, 2 * limit)
+    while pos < len(order) and len(found) <= limit:
+        rows = order[pos:pos + chunk]
+        found.extend(rows[keep(rows)].tolist())
+        pos += chunk
+    return found[:limit + 1]
+
+
+def risk_order(snapshot):
+    """(rows sorted by risk descending then id, the -risk keys, the ids) for a snapshot's current scores."""
+    table = snapshot.score_table
+    ids = np.asarray(table.ids, dtype=np.int64)
+    order = np.lexsort((ids, -table.risk_score))
+    return order, -table.risk_score[order], ids[order]
+
+
+@timed
+def query_suppliers(suppliers, dependencies=None, tier=None, country=None, industry=None, sort="id",
+                    cursor=None, limit=200) -> dict:
+    """One page of suppliers: {"items": [...], "next_cursor": str | None}."""
+    if sort not in SORTS:
+        return {"error": f"sort must be one of {', '.join(SORTS)}"}
+    try:
+        after = decode_cursor(cursor, sort) if cursor else None
+    except ValueError as e:
+        return {"error": str(e)}
+
+    filters = [(name, value) for name, value in
+               (("tier", tier), ("country_code", country), ("industry", industry)) if value]
+    postings = sorted(((suppliers.postings(name, value), name, value) for name, value in filters),
+                      key=lambda p: len(p[0]))
+    if postings and not len(postings[0][0]):
+        return {"items": [], "next_cursor": None}
+
+    def matcher(checks):
+        def keep(rows):
+            mask = np.ones(len(rows), dtype=bool)
+            for _, name, value in checks:
+                mask &= suppliers.matches(name, value, rows)
+            return mask
+        return keep
+
+    ids = suppliers.column("id")
+    table = None
+    if sort == "id":
+        order = postings[0][0] if postings else suppliers.id_order()[0]
+        start = bisect_right(order, after[0], key=ids.item) if after else 0
+        rows = _walk(order, start, matcher(postings[1:]), limit)
+    else:
+        from engines.snapshot import get_snapshot
+        snap = get_snapshot(suppliers, dependencies)
+        table = snap.score_table
+        scores = table.risk_score
+        if postings and len(postings[0][0]) <= _SMALL_POSTING:
+            # few candidates: filter and sort them directly
+            candidates = postings[0][0]
+            candidates = candidates[matcher(postings[1:])(candidates)]
+            order = candidates[np.lexsort((ids[candidates], -scores[candidates]))]
+            start = 0
+            if after:
+                start = bisect_right(order, tuple(after), key=lambda r: (-scores.item(r), ids.item(r)))
+            rows = order[start:start + limit + 1].tolist()
+        else:
+            order, keys, sorted_ids = snap.risk_order
+            start = 0
+            if after:
+                # first position whose (-risk, id) is past the cursor's
+                lo = int(np.searchsorted(keys, after[0], side="left"))
+                hi = int(np.searchsorted(keys, after[0], side="right"))
+                start = lo + int(np.searchsorted(sorted_ids[lo:hi], after[1], side="right"))
+            rows = _walk(order, start, matcher(postings), limit)
+    more = len(rows) > limit
+    rows = rows[:limit]
+    items = suppliers.to_dicts(rows)
+    if table is not None:
+        for item, r in zip(items, rows):
+            item["risk_score"] = round(float(table.risk_score[r]), 1)
+            item["risk_level"] = RISK_LEVELS[table.level[r]]
+    next_cursor = None
+    if more and rows:
+        last = rows[-1]
+        key = [int(ids[last])] if sort == "id" else [-float(table.risk_score[last]), int(ids[last])]
+        next_cursor = encode_cursor(sort, key)
+    return {"items": items, "next_cursor": next_cursor}
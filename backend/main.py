@@ -1,13 +1,24 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 
 load_dotenv()
 
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    from engines.process_pool import shutdown_pools
+    shutdown_pools()
+    from db import repository
+    if repository._postgrest is not None:
+        await repository._postgrest.aclose()
+
 app = FastAPI(
     title="Resilio Supply Chain Analyzer API",
     description="Supply Chain Resilience & Risk Analyzer — Hackathon Edition",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -18,7 +29,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-from routers import suppliers, network, risk, alerts, recommendations, simulator, seed
+from engines import metrics as engine_metrics
+from routers import suppliers, network, risk, alerts, recommendations, simulator, seed, metrics
+
+if engine_metrics.ENABLED:
+    app.add_middleware(metrics.TimingMiddleware)
 
 app.include_router(suppliers.router)
 app.include_router(network.router)
@@ -27,6 +42,7 @@ app.include_router(alerts.router)
 app.include_router(recommendations.router)
 app.include_router(simulator.router)
 app.include_router(seed.router)
+app.include_router(metrics.router)
 
 @app.get("/")
 def root():
@@ -36,8 +52,12 @@ def root():
         "status": "operational",
         "endpoints": [
             "/api/suppliers",
+            "/api/suppliers/near",
             "/api/network/graph",
             "/api/network/spof",
+            "/api/network/redundancy",
+            "/api/network/impact/{supplier_id}",
+            "/api/network/dependencies",
             "/api/risk/overview",
             "/api/risk/top-risky",
             "/api/risk/country-exposure",
@@ -47,7 +67,10 @@ def root():
             "/api/recommendations",
             "/api/simulator/scenarios",
             "/api/simulator/run",
+            "/api/simulator/monte-carlo",
+            "/api/simulator/sweep",
             "/api/health",
+            "/api/metrics",
             "/docs",
         ]
     }
@@ -0,0 +1,93 @@
+"""
+Request timing middleware, a timed route class and GET /api/metrics (see engines.metrics).
+
+Routers are created with route_class=TimedRoute so the time between an
+endpoint returning and the response going out is reported as the
+`serialize` stage.
+"""
+import functools
+import inspect
+import time
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from fastapi.routing import APIRoute
+
+from engines import metrics
+
+
+def _timed_endpoint(endpoint):
+    """Wrap a route endpoint so the request knows when it returned (and records it as `handler`)."""
+    def done(start):
+        end = time.perf_counter()
+        metrics.record("handler", end - start)
+        timings = metrics._current.get()
+        if timings is not None:
+            timings.handler_done = end
+
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                done(start)
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                done(start)
+    return wrapper
+
+
+class TimedRoute(APIRoute):
+    """APIRoute whose endpoint is timed, so response serialization can be told apart from the handler."""
+
+    def __init__(self, path, endpoint, **kwargs):
+        super().__init__(path, _timed_endpoint(endpoint) if metrics.ENABLED else endpoint, **kwargs)
+
+
+class TimingMiddleware:
+    """ASGI middleware: per-route latency histogram plus a Server-Timing header on every HTTP response."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        timings = metrics._RequestTimings()
+        token = metrics._current.set(timings)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_timed(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                now = time.perf_counter()
+                if timings.handler_done is not None:
+                    metrics.record("serialize", now - timings.handler_done)
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"server-timing", timings.header(now - start).encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_timed)
+        finally:
+            metrics._current.reset(token)
+            route = scope.get("route")
+            metrics.REQUESTS.observe(time.perf_counter() - start, scope["method"],
+                             getattr(route, "path", "unmatched"), str(status))
+
+
+router = APIRouter(prefix="/api/metrics", tags=["metrics"])
+
+@router.get("", response_class=PlainTextResponse)
+def get_metrics():
+    """Per-route request and per-stage engine latency histograms, Prometheus text format."""
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
@@ -1,16 +1,107 @@
-from fastapi import APIRouter, Depends
-from db.org_dep import get_org
-from data.company_data import get_company_data
-from engines.graph_engine import get_graph_json, get_single_points_of_failure
+from fastapi import APIRouter, Depends, Query, Request, Response
+from pydantic import BaseModel, Field
+from typing import Literal, Optional
+from db.org_dep import get_loaded_org
+from data.company_data import get_company_data, add_dependency, remove_dependency
+from engines.graph_engine import get_graph_payload, get_single_points_of_failure, get_downstream_impact, get_redundancy
+from engines.graph_lod import get_clustered_graph, expand_cluster, get_viewport_graph
+from routers.metrics import TimedRoute
 
-router = APIRouter(prefix="/api/network", tags=["network"])
+router = APIRouter(prefix="/api/network", tags=["network"], route_class=TimedRoute)
+
+class DependencyCreate(BaseModel):
+    from_supplier_id: int
+    to_supplier_id: int
+    component: Optional[str] = None
+    volume_percent: float = Field(50, gt=0, le=100)
+    criticality: Literal["high", "medium", "low"] = "medium"
+
+def _payload_response(payload, request: Request) -> Response:
+    """Serve a SerializedPayload: 304 if the client's copy is current, else the (compressed) bytes."""
+    encoding = payload.negotiate(request.headers.get("accept-encoding", ""))
+    headers = {"ETag": payload.etag(encoding), "Cache-Control": "no-cache", "Vary": "Accept-Encoding, X-Org-ID"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+        if "*" in tags or tags & payload.etags:
+            return Response(status_code=304, headers=headers)
+    if encoding is None:
+        return Response(payload.body, media_type="application/json", headers=headers)
+    headers["Content-Encoding"] = encoding
+    return Response(payload.encoded(encoding), media_type="application/json", headers=headers)
 
 @router.get("/graph")
-def network_graph(org: str = Depends(get_org)):
+def network_graph(request: Request, org: str = Depends(get_loaded_org)):
+    data = get_company_data(org)
+    return _payload_response(get_graph_payload(data["suppliers"], data["dependencies"]), request)
+
+@router.get("/graph/clusters")
+def network_clusters(group_by: str = "country_code", centrality: bool = False,
+                     org: str = Depends(get_loaded_org)):
+    """Suppliers grouped into super-nodes (by any of country_code, industry, tier, ...) with aggregated edges.
+
+    `centrality` adds each cluster's max_centrality, which costs a centrality computation on large networks.
+    """
+    data = get_company_data(org)
+    return get_clustered_graph(data["suppliers"], data["dependencies"], group_by, centrality)
+
+@router.get("/graph/clusters/{key:path}")
+def network_cluster_detail(
+    key: str,
+    group_by: str = "country_code",
+    limit: int = Query(2000, ge=1, le=20000),
+    centrality: bool = False,
+    org: str = Depends(get_loaded_org),
+):
+    """One cluster expanded into its suppliers (most central first when over `limit`)."""
     data = get_company_data(org)
-    return get_graph_json(data["suppliers"], data["dependencies"])
+    return expand_cluster(data["suppliers"], data["dependencies"], key, group_by, limit, centrality)
+
+@router.get("/graph/viewport")
+def network_viewport(
+    min_lat: float = Query(..., ge=-90, le=90),
+    max_lat: float = Query(..., ge=-90, le=90),
+    min_lng: float = Query(..., ge=-180, le=180),
+    max_lng: float = Query(..., ge=-180, le=180),
+    limit: int = Query(2000, ge=1, le=20000),
+    group_by: str = "country_code",
+    centrality: bool = False,
+    org: str = Depends(get_loaded_org),
+):
+    """Suppliers in a map box, or the box clustered when it holds more than `limit`."""
+    data = get_company_data(org)
+    return get_viewport_graph(data["suppliers"], data["dependencies"], min_lat, max_lat, min_lng, max_lng,
+                              limit, group_by, centrality)
 
 @router.get("/spof")
-def single_points_of_failure(org: str = Depends(get_org)):
+def single_points_of_failure(
+    method: Optional[str] = Query(None, pattern="^(structural|centrality)$"),
+    centrality_mode: Optional[str] = Query(None, pattern="^(exact|sampled|dominator|auto)$"),
+    org: str = Depends(get_loaded_org),
+):
+    data = get_company_data(org)
+    return get_single_points_of_failure(data["suppliers"], data["dependencies"], centrality_mode=centrality_mode,
+                                        method=method)
+
+@router.get("/redundancy")
+def redundancy(limit: int = Query(50, ge=1, le=5000), org: str = Depends(get_loaded_org)):
+    """Max-flow capacity and node-disjoint supply paths per tier-1 supplier, least redundant first."""
     data = get_company_data(org)
-    return get_single_points_of_failure(data["suppliers"], data["dependencies"])
+    return get_redundancy(data["suppliers"], data["dependencies"], limit)
+
+@router.get("/impact/{supplier_id}")
+def downstream_impact(supplier_id: int, org: str = Depends(get_loaded_org)):
+    data = get_company_data(org)
+    return get_downstream_impact(supplier_id, data["suppliers"], data["dependencies"])
+
+@router.post("/dependencies")
+def create_dependency(req: DependencyCreate, org: str = Depends(get_loaded_org)):
+    try:
+        return add_dependency(org, **req.model_dump())
+    except ValueError as e:
+        return {"error": str(e)}
+
+@router.delete("/dependencies/{dependency_id}")
+def delete_dependency(dependency_id: int, org: str = Depends(get_loaded_org)):
+    dep = remove_dependency(org, dependency_id)
+    return {"deleted": dependency_id} if dep is not None else {"error": "Dependency not found"}
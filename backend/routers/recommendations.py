@@ -1,11 +1,16 @@
-from fastapi import APIRouter, Depends
-from db.org_dep import get_org
+from fastapi import APIRouter, Depends, Query
+from db.org_dep import get_loaded_org
 from data.company_data import get_company_data
 from engines.recommendation_engine import get_recommendations
+from routers.metrics import TimedRoute
 
-router = APIRouter(prefix="/api/recommendations", tags=["recommendations"])
+router = APIRouter(prefix="/api/recommendations", tags=["recommendations"], route_class=TimedRoute)
 
 @router.get("")
-def list_recommendations(org: str = Depends(get_org)):
+def list_recommendations(
+    top_k: int = Query(1, ge=1, le=20),
+    limit: int = Query(25, ge=1),
+    org: str = Depends(get_loaded_org),
+):
     data = get_company_data(org)
-    return get_recommendations(data["suppliers"], data["dependencies"])
+    return get_recommendations(data["suppliers"], data["dependencies"], top_k=top_k, limit=limit)
@@ -1,119 +1,75 @@
-from fastapi import APIRouter
+import time
+from fastapi import APIRouter, Depends, Query, Request
 from db.supabase_client import get_supabase
-from data.seed_data import get_data
+from db.org_dep import get_org
+from db import bulk_loader
+from db.repository import get_postgrest, get_repository, synthetic_org_data
+from data import company_data
+from routers.metrics import TimedRoute
 
-router = APIRouter(prefix="/api/seed", tags=["seed"])
+router = APIRouter(prefix="/api/seed", tags=["seed"], route_class=TimedRoute)
 
-@router.post("")
-def seed_database():
-    """Push all synthetic data into Supabase tables."""
-    sb = get_supabase()
-    if not sb:
-        return {"error": "Supabase not connected. Check credentials in .env"}
-
-    data = get_data()
-    results = {}
-
-    # Clear existing data
-    try:
-        sb.table("disruption_alerts").delete().neq("id", 0).execute()
-        sb.table("dependencies").delete().neq("id", 0).execute()
-        sb.table("suppliers").delete().neq("id", 0).execute()
-        sb.table("country_risk").delete().neq("country_code", "").execute()
-    except Exception as e:
-        return {"error": f"Failed to clear tables: {e}. Did you run schema.sql in Supabase?"}
-
-    # Insert suppliers
-    try:
-        suppliers_to_insert = []
-        for s in data["suppliers"]:
-            suppliers_to_insert.append({
-                "id": s["id"],
-                "name": s["name"],
-                "tier": s["tier"],
-                "country_code": s["country_code"],
-                "country_name": s["country_name"],
-                "industry": s["industry"],
-                "component": s["component"],
-                "lat": s["lat"],
-                "lng": s["lng"],
-                "geographic_risk": s["geographic_risk"],
-                "financial_risk": s["financial_risk"],
-                "annual_revenue_m": s["annual_revenue_m"],
-                "employees": s["employees"],
-                "years_operating": s["years_operating"],
-                "certifications": s["certifications"],
-                "on_time_delivery_pct": s["on_time_delivery_pct"],
-                "is_active": s["is_active"],
-            })
-        # Insert in batches of 50
-        for i in range(0, len(suppliers_to_insert), 50):
-            batch = suppliers_to_insert[i:i+50]
-            sb.table("suppliers").insert(batch).execute()
-        results["suppliers"] = f"{len(suppliers_to_insert)} inserted"
-    except Exception as e:
-        results["suppliers_error"] = str(e)
+_SCHEMA_HINT = ("Run schema.sql in Supabase SQL Editor first "
+                "(or migrate_org_keys.sql if the tables predate per-org keys)")
 
-    # Insert dependencies
-    try:
-        deps_to_insert = []
-        for d in data["dependencies"]:
-            deps_to_insert.append({
-                "id": d["id"],
-                "from_supplier_id": d["from_supplier_id"],
-                "to_supplier_id": d["to_supplier_id"],
-                "component": d["component"],
-                "volume_percent": d["volume_percent"],
-                "criticality": d["criticality"],
-            })
-        for i in range(0, len(deps_to_insert), 50):
-            batch = deps_to_insert[i:i+50]
-            sb.table("dependencies").insert(batch).execute()
-        results["dependencies"] = f"{len(deps_to_insert)} inserted"
-    except Exception as e:
-        results["dependencies_error"] = str(e)
+def _summary(results, started):
+    failed = [t for t, r in results.items() if "error" in r]
+    rows = sum(r.get("rows", 0) for r in results.values())
+    seconds = time.perf_counter() - started
+    summary = {
+        "status": f"Seed incomplete: {failed[0]} failed, re-run to finish" if failed else "Seed complete",
+        "tables": results,
+        "rows": rows,
+        "seconds": round(seconds, 3),
+        "rows_per_s": round(rows / seconds) if seconds > 0 else None,
+    }
+    if failed:
+        summary["hint"] = _SCHEMA_HINT
+    return summary
 
-    # Insert alerts
-    try:
-        alerts_to_insert = []
-        for a in data["alerts"]:
-            alerts_to_insert.append({
-                "id": a["id"],
-                "supplier_id": a["supplier_id"],
-                "supplier_name": a["supplier_name"],
-                "country_code": a["country_code"],
-                "alert_type": a["alert_type"],
-                "probability": a["probability"],
-                "severity": a["severity"],
-                "expected_days": a["expected_days"],
-                "affected_component": a["affected_component"],
-                "impact_description": a["impact_description"],
-            })
-        sb.table("disruption_alerts").insert(alerts_to_insert).execute()
-        results["alerts"] = f"{len(alerts_to_insert)} inserted"
-    except Exception as e:
-        results["alerts_error"] = str(e)
-
-    # Insert country risk
-    try:
-        country_risk_to_insert = []
-        for cr in data["country_risk"]:
-            country_risk_to_insert.append({
-                "country_code": cr["country_code"],
-                "country_name": cr["country_name"],
-                "political_risk": cr["political_risk"],
-                "weather_risk": cr["weather_risk"],
-                "economic_risk": cr["economic_risk"],
-                "trade_restriction_risk": cr["trade_restriction_risk"],
-                "port_congestion_risk": cr["port_congestion_risk"],
-            })
-        sb.table("country_risk").insert(country_risk_to_insert).execute()
-        results["country_risk"] = f"{len(country_risk_to_insert)} inserted"
-    except Exception as e:
-        results["country_risk_error"] = str(e)
+@router.post("")
+async def seed_database(
+    batch_size: int = Query(bulk_loader.BATCH_SIZE, ge=1, le=10_000),
+    concurrency: int = Query(bulk_loader.CONCURRENCY, ge=1, le=64),
+):
+    """Upsert every org's synthetic dataset into Supabase. Idempotent: re-running resumes a failed seed."""
+    started = time.perf_counter()
+    datasets = {org: synthetic_org_data(org) for org in company_data.ORGS}
+    def rows(key):
+        for org, data in datasets.items():
+            for row in data[key]:
+                yield {**row, "org": org}
+    tables = {"suppliers": rows("suppliers"), "dependencies": rows("dependencies"),
+              "disruption_alerts": rows("alerts")}
+    tables["country_risk"] = datasets[company_data.ORGS[0]]["country_risk"]
+    results = await bulk_loader.load_dataset(get_postgrest(), tables, batch_size=batch_size, concurrency=concurrency)
+    return _summary(results, started)
 
-    results["status"] = "Seed complete"
-    return results
+@router.post("/upload/{table}")
+async def upload_table(
+    table: str,
+    request: Request,
+    format: str = Query("csv", pattern="^(csv|parquet)$"),
+    batch_size: int = Query(bulk_loader.BATCH_SIZE, ge=1, le=10_000),
+    concurrency: int = Query(bulk_loader.CONCURRENCY, ge=1, le=64),
+    org: str = Depends(get_org),
+):
+    """Stream a CSV (or Parquet) request body into one table for the caller's org, upserting by id."""
+    if table not in bulk_loader.TABLES:
+        return {"error": f"Unknown table '{table}'. Expected one of: {', '.join(bulk_loader.TABLES)}"}
+    started = time.perf_counter()
+    if format == "csv":
+        rows = bulk_loader.iter_csv(request.stream())
+    else:
+        try:
+            rows = bulk_loader.iter_parquet(await request.body(), batch_size)
+        except ImportError:
+            return {"error": "Parquet uploads need pyarrow installed; upload CSV instead"}
+    results = await bulk_loader.load_dataset(get_postgrest(), {table: rows}, org=org,
+                                             batch_size=batch_size, concurrency=concurrency)
+    if get_repository() is not None:
+        company_data.unload_company_data(org)   # next request reloads from the database
+    return _summary(results, started)
 
 @router.get("/status")
 def seed_status():
@@ -132,4 +88,4 @@ def seed_status():
             "alerts": alerts.count,
         }
     except Exception as e:
-        return {"connected": True, "error": str(e), "hint": "Run schema.sql in Supabase SQL Editor first"}
+        return {"connected": True, "error": str(e), "hint": _SCHEMA_HINT}
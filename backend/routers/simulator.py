@@ -1,16 +1,35 @@
 from fastapi import APIRouter, Depends
-from pydantic import BaseModel
-from db.org_dep import get_org
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional, Tuple, Union
+from db.org_dep import get_loaded_org
 from data.company_data import get_company_data
-from engines.scenario_engine import run_scenario
+from engines.scenario_engine import run_scenario, run_monte_carlo, run_sweep
+from routers.metrics import TimedRoute
 
-router = APIRouter(prefix="/api/simulator", tags=["simulator"])
+router = APIRouter(prefix="/api/simulator", tags=["simulator"], route_class=TimedRoute)
 
 class ScenarioRequest(BaseModel):
     scenario_type: str   # port_closure | supplier_bankruptcy | country_sanctions | weather_event | pandemic
     target_country: str = "China"
     target_supplier_id: int = None
-    severity: float = 1.0
+    severity: float = Field(1.0, gt=0)
+    # Geographic target, used instead of target_country when given: center + radius, or a polygon
+    center_lat: Optional[float] = Field(None, ge=-90, le=90)
+    center_lng: Optional[float] = Field(None, ge=-180, le=180)
+    radius_km: Optional[float] = Field(None, gt=0)
+    polygon: Optional[List[Tuple[float, float]]] = Field(None, min_length=3)   # [[lat, lng], ...]
+
+class MonteCarloRequest(ScenarioRequest):
+    trials: int = Field(1000, ge=1, le=100_000)
+    seed: int = 42
+
+class SweepRequest(BaseModel):
+    scenario_type: str
+    target_kind: Literal["country", "supplier"] = "country"
+    targets: Optional[List[Union[int, str]]] = None   # None = every country / supplier
+    tier: Optional[int] = None                        # supplier sweeps: restrict to one tier
+    severity: float = Field(1.0, gt=0)
+    limit: Optional[int] = None
 
 @router.get("/scenarios")
 def get_scenarios():
@@ -49,7 +68,7 @@ def get_scenarios():
     ]
 
 @router.post("/run")
-def run_simulation(req: ScenarioRequest, org: str = Depends(get_org)):
+def run_simulation(req: ScenarioRequest, org: str = Depends(get_loaded_org)):
     data = get_company_data(org)
     return run_scenario(
         req.scenario_type,
@@ -58,4 +77,40 @@ def run_simulation(req: ScenarioRequest, org: str = Depends(get_org)):
         severity=req.severity,
         suppliers=data["suppliers"],
         dependencies=data["dependencies"],
+        center_lat=req.center_lat,
+        center_lng=req.center_lng,
+        radius_km=req.radius_km,
+        polygon=req.polygon,
+    )
+
+@router.post("/monte-carlo")
+def run_monte_carlo_simulation(req: MonteCarloRequest, org: str = Depends(get_loaded_org)):
+    data = get_company_data(org)
+    return run_monte_carlo(
+        req.scenario_type,
+        target_country=req.target_country,
+        target_supplier_id=req.target_supplier_id,
+        severity=req.severity,
+        trials=req.trials,
+        seed=req.seed,
+        suppliers=data["suppliers"],
+        dependencies=data["dependencies"],
+        center_lat=req.center_lat,
+        center_lng=req.center_lng,
+        radius_km=req.radius_km,
+        polygon=req.polygon,
+    )
+
+@router.post("/sweep")
+def run_scenario_sweep(req: SweepRequest, org: str = Depends(get_loaded_org)):
+    data = get_company_data(org)
+    return run_sweep(
+        req.scenario_type,
+        target_kind=req.target_kind,
+        targets=req.targets,
+        tier=req.tier,
+        severity=req.severity,
+        limit=req.limit,
+        suppliers=data["suppliers"],
+        dependencies=data["dependencies"],
     )
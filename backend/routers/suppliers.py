@@ -1,32 +1,79 @@
-from fastapi import APIRouter, Depends
-from typing import Optional
-from db.org_dep import get_org
-from data.company_data import get_company_data
+from fastapi import APIRouter, Depends, Query, Response
+from pydantic import BaseModel, Field
+from typing import Literal, Optional
+from db.org_dep import get_loaded_org
+from data.company_data import get_company_data, add_supplier, update_supplier, remove_supplier
+from engines.supplier_query import query_suppliers
+from engines.geo_index import get_suppliers_near
+from routers.metrics import TimedRoute
 
-router = APIRouter(prefix="/api/suppliers", tags=["suppliers"])
+router = APIRouter(prefix="/api/suppliers", tags=["suppliers"], route_class=TimedRoute)
+
+class SupplierUpdate(BaseModel):
+    name: Optional[str] = None
+    tier: Optional[int] = Field(None, ge=1)
+    country_code: Optional[str] = Field(None, min_length=2, max_length=2)
+    industry: Optional[str] = None
+    component: Optional[str] = None
+    lat: Optional[float] = None
+    lng: Optional[float] = None
+    geographic_risk: Optional[float] = Field(None, ge=0, le=100)
+    financial_risk: Optional[float] = Field(None, ge=0, le=100)
+    is_active: Optional[bool] = None
+
+class SupplierCreate(SupplierUpdate):
+    name: str
+    tier: int = Field(..., ge=1)
+    country_code: str = Field(..., min_length=2, max_length=2)
 
 @router.get("")
 def list_suppliers(
+    response: Response,
     tier: Optional[int] = None,
     country: Optional[str] = None,
     industry: Optional[str] = None,
-    limit: int = 200,
-    org: str = Depends(get_org),
+    sort: Literal["id", "risk"] = "id",
+    cursor: Optional[str] = None,
+    limit: int = Query(200, ge=1, le=5000),
+    org: str = Depends(get_loaded_org),
 ):
+    """One page of suppliers; pass the X-Next-Cursor response header back as `cursor` for the next."""
     data = get_company_data(org)
-    suppliers = data["suppliers"]
-    if tier:
-        suppliers = [s for s in suppliers if s["tier"] == tier]
-    if country:
-        suppliers = [s for s in suppliers if s["country_code"].upper() == country.upper()]
-    if industry:
-        suppliers = [s for s in suppliers if s["industry"].lower() == industry.lower()]
-    return suppliers[:limit]
+    page = query_suppliers(data["suppliers"], data["dependencies"], tier=tier, country=country,
+                           industry=industry, sort=sort, cursor=cursor, limit=limit)
+    if "error" in page:
+        return page
+    if page["next_cursor"]:
+        response.headers["X-Next-Cursor"] = page["next_cursor"]
+    return page["items"]
 
-@router.get("/{supplier_id}")
-def get_supplier(supplier_id: int, org: str = Depends(get_org)):
+@router.get("/near")
+def suppliers_near(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius_km: Optional[float] = Query(None, gt=0),
+    limit: int = Query(100, ge=1, le=5000),
+    org: str = Depends(get_loaded_org),
+):
+    """Suppliers nearest a point, nearest first, with distance_km; only those within radius_km if given."""
     data = get_company_data(org)
-    for s in data["suppliers"]:
-        if s["id"] == supplier_id:
-            return s
-    return {"error": "Supplier not found"}
+    return get_suppliers_near(data["suppliers"], data["dependencies"], lat, lng, radius_km, limit)
+
+@router.get("/{supplier_id}")
+def get_supplier(supplier_id: int, org: str = Depends(get_loaded_org)):
+    s = get_company_data(org)["suppliers"].get_row(supplier_id)
+    return dict(s) if s is not None else {"error": "Supplier not found"}
+
+@router.post("")
+def create_supplier(req: SupplierCreate, org: str = Depends(get_loaded_org)):
+    return dict(add_supplier(org, req.model_dump(exclude_none=True)))
+
+@router.patch("/{supplier_id}")
+def patch_supplier(supplier_id: int, req: SupplierUpdate, org: str = Depends(get_loaded_org)):
+    s = update_supplier(org, supplier_id, req.model_dump(exclude_none=True))
+    return dict(s) if s is not None else {"error": "Supplier not found"}
+
+@router.delete("/{supplier_id}")
+def delete_supplier(supplier_id: int, org: str = Depends(get_loaded_org)):
+    s = remove_supplier(org, supplier_id)
+    return {"deleted": supplier_id} if s is not None else {"error": "Supplier not found"}
@@ -1,44 +1,373 @@
 """Backend integration test — verifies all 3 company org datasets work independently."""
-import sys, os
+import random, sys, os
 sys.path.insert(0, '.')
 
 from data.company_data import get_company_data
-from engines.graph_engine import get_graph_json, get_single_points_of_failure
+import networkx as nx
+from engines import inherited_risk, scoring_kernel
+from engines.betweenness import array_betweenness
+from engines.graph_engine import get_downstream, get_graph_json, get_redundancy, get_single_points_of_failure
+from engines.geo_index import get_suppliers_near
+from engines.graph_lod import get_clustered_graph, get_viewport_graph
 from engines.risk_engine import get_overview, get_top_risky
 from engines.prediction_engine import get_alerts, get_disruption_probability_summary
+from engines.reachability import ReachabilityIndex
 from engines.recommendation_engine import get_recommendations
-from engines.scenario_engine import run_scenario
+from engines.scenario_engine import run_scenario, run_sweep
+from engines.snapshot import get_snapshot
+from engines.supplier_query import query_suppliers
 
-for org in ["techcorp", "pharma", "auto"]:
-    print(f"\n{'='*50}")
-    print(f"  ORG: {org.upper()}")
-    print(f"{'='*50}")
-    d = get_company_data(org)
-    suppliers = d["suppliers"]
-    dependencies = d["dependencies"]
-    alerts_raw = d["alerts"]
+def scan_alternatives(risky, scored, k):
+    """Reference for the alternative index: the original scan over every scored supplier."""
+    for margin, same_industry in ((10, True), (15, False)):
+        alts = [s for s in scored if s["id"] != risky["id"] and s["tier"] == risky["tier"]
+                and s["country_code"] != risky["country_code"] and s["risk_score"] < risky["risk_score"] - margin
+                and (not same_industry or s["industry"] == risky["industry"])]
+        if alts:
+            return sorted(alts, key=lambda s: s["risk_score"])[:k]
+    return []
 
-    print(f"  Suppliers: {len(suppliers)}, Deps: {len(dependencies)}, Alerts: {len(alerts_raw)}")
+def analysis_state(snap):
+    cent = snap.centrality
+    scored = [{k: v for k, v in row.items() if k not in ("centrality_score", "centrality_risk")} for row in snap.scored]
+    reach = snap.reachability
+    return (scored, cent, {i: reach.count_downstream([i]) for i in snap.supplier_map},
+            dict(snap.dependency_index.max_in_volume), sorted(snap.graph.edges()))
 
-    graph = get_graph_json(suppliers, dependencies)
-    print(f"  Graph: {len(graph['nodes'])} nodes, {len(graph['edges'])} edges")
+def main():
+    recommended = 0
+    for org in ["techcorp", "pharma", "auto"]:
+        print(f"\n{'='*50}")
+        print(f"  ORG: {org.upper()}")
+        print(f"{'='*50}")
+        d = get_company_data(org)
+        suppliers = d["suppliers"]
+        dependencies = d["dependencies"]
+        alerts_raw = d["alerts"]
 
-    spof = get_single_points_of_failure(suppliers, dependencies)
-    print(f"  SPOFs: {len(spof)}")
+        print(f"  Suppliers: {len(suppliers)}, Deps: {len(dependencies)}, Alerts: {len(alerts_raw)}")
 
-    ov = get_overview(suppliers, dependencies)
-    print(f"  Resilience: {ov['resilience_score']}/100  |  HighRisk: {ov['high_risk_count']}  |  Critical: {ov['critical_count']}")
+        snap = get_snapshot(suppliers, dependencies)
+        assert get_snapshot(suppliers, dependencies) is snap, "snapshot should be shared across engines"
+        print(f"  Snapshot: v{snap.version}")
 
-    alerts = get_alerts(alerts_raw, suppliers, dependencies)
-    summary = get_disruption_probability_summary(alerts_raw, suppliers, dependencies)
-    print(f"  Disruption Probability: {summary['overall_disruption_probability']}% ({summary['severity']})")
+        graph = get_graph_json(suppliers, dependencies)
+        print(f"  Graph: {len(graph['nodes'])} nodes, {len(graph['edges'])} edges")
 
-    recs = get_recommendations(suppliers)
-    print(f"  Recommendations: {len(recs)}")
+        clusters = get_clustered_graph(suppliers, dependencies, "country_code,tier")
+        assert sum(c["size"] for c in clusters["nodes"]) == len(graph["nodes"])
+        assert sum(e["count"] for e in clusters["edges"]) + sum(c["internal_edges"] for c in clusters["nodes"]) == len(graph["edges"])
+        box = get_viewport_graph(suppliers, dependencies, 0, 60, 60, 150, limit=len(suppliers))
+        assert sorted(n["id"] for n in box["nodes"]) == sorted(n["id"] for n in graph["nodes"] if 0 <= n["lat"] <= 60 and 60 <= n["lng"] <= 150)
+        print(f"  LOD: {len(clusters['nodes'])} country/tier clusters, {len(box['nodes'])} suppliers in the Asia box")
 
-    # Simulator - pick first country in this org's dataset
-    first_country = suppliers[0]["country_name"]
-    result = run_scenario("port_closure", target_country=first_country, suppliers=suppliers, dependencies=dependencies)
-    print(f"  Simulator ({first_country} Port): {result.get('directly_affected_count',0)} direct → {result.get('cascade_affected_count',0)} cascade  [{result.get('before_resilience_score')} → {result.get('after_resilience_score')}]")
+        spof = get_single_points_of_failure(suppliers, dependencies)
+        exact = nx.betweenness_centrality(snap.graph)
+        assert all(abs(exact[v] - b) < 1e-12 for v, b in array_betweenness(snap.graph, workers=2).items())
+        print(f"  SPOFs: {len(spof)}")
 
-print("\n\n✅ ALL 3 ORG DATASETS PASSED")
+        ov = get_overview(suppliers, dependencies)
+        print(f"  Resilience: {ov['resilience_score']}/100  |  HighRisk: {ov['high_risk_count']}  |  Critical: {ov['critical_count']}")
+
+        fed = {dep["to_supplier_id"] for dep in dependencies}
+        table = snap.score_table
+        if not scoring_kernel.INHERITED_RISK_WEIGHT:
+            assert not table.inherited.any(), "inherited risk should not be propagated at weight 0"
+        matrix = inherited_risk.propagation_matrix(table.row_of, snap.dependency_index.incoming)
+        inherited = dict(zip(table.ids, inherited_risk.propagate(matrix, table.local_score).tolist()))
+        assert all(0 <= r <= 100 for r in inherited.values()) and not any(inherited[i] for i in inherited if i not in fed)
+        print(f"  Inherited risk: max {max(inherited.values()):.1f} across {sum(r > 0 for r in inherited.values())} fed suppliers")
+
+        alerts = get_alerts(alerts_raw, suppliers, dependencies)
+        summary = get_disruption_probability_summary(alerts_raw, suppliers, dependencies)
+        assert get_alerts(alerts_raw, suppliers, dependencies, "high", 3) == [a for a in alerts if a["severity"] == "high"][:3]
+        assert summary["total_alerts"] == len(alerts) and summary["critical_alerts"] == sum(a["severity"] == "critical" for a in alerts)
+        print(f"  Disruption Probability: {summary['overall_disruption_probability']}% ({summary['severity']})")
+
+        paged, cursor = [], None
+        while True:
+            page = query_suppliers(suppliers, dependencies, sort="risk", cursor=cursor, limit=7)
+            paged += [s["id"] for s in page["items"]]
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+        assert paged[:10] == [s["id"] for s in get_top_risky(10, suppliers, dependencies)]
+        assert sorted(paged) == sorted(s["id"] for s in suppliers)
+
+        recs = get_recommendations(suppliers, dependencies, top_k=3)
+        expected = [(risky["id"], [a["id"] for a in alts], risky["risk_score"] - alts[0]["risk_score"])
+                    for risky in sorted(snap.scored, key=lambda s: s["risk_score"], reverse=True) if risky["risk_score"] >= 55
+                    for alts in [scan_alternatives(risky, snap.scored, 3)] if alts]
+        got = [(r["risky_supplier_id"], [a["alt_supplier_id"] for a in r["alternatives"]], r["risk_reduction_pct"]) for r in recs]
+        assert [g[:2] for g in got] == [e[:2] for e in expected[:25]]
+        assert all(abs(g[2] - e[2]) < 0.051 for g, e in zip(got, expected))
+        recommended += len(recs)
+        print(f"  Recommendations: {len(recs)}")
+
+        # Simulator - pick first country in this org's dataset
+        first_country = suppliers[0]["country_name"]
+        result = run_scenario("port_closure", target_country=first_country, suppliers=suppliers, dependencies=dependencies)
+        print(f"  Simulator ({first_country} Port): {result.get('directly_affected_count',0)} direct → {result.get('cascade_affected_count',0)} cascade  [{result.get('before_resilience_score')} → {result.get('after_resilience_score')}]")
+
+        # Cascade depth and volume-weighted impact against a topological-order reference
+        hit = [s["id"] for s in suppliers if s["country_name"] == first_country]
+        cascade = {snap.cascade_graph.node_ids[v]: r for v, r in snap.cascade_graph.cascade(hit).items()}
+        G = nx.DiGraph((d["from_supplier_id"], d["to_supplier_id"]) for d in dependencies)
+        G.add_nodes_from(hit)
+        hops = {v: h for v, h in nx.multi_source_dijkstra_path_length(G, set(hit)).items() if h}
+        impact = dict.fromkeys(hit, 100.0)
+        for v in nx.topological_sort(G):
+            if v in hops:
+                impact[v] = min(100.0, sum(impact.get(u, 0) * d["volume_percent"] / 100 for u, d in
+                                           ((d["from_supplier_id"], d) for d in dependencies if d["to_supplier_id"] == v)))
+        assert {v: r[0] for v, r in cascade.items()} == hops
+        assert all(abs(r[1] - impact[v]) < 1e-9 for v, r in cascade.items())
+
+        # Downstream reachability against networkx descendants, before and after in-place edits
+        reach = ReachabilityIndex(snap.cascade_graph)
+        G = nx.DiGraph((d["from_supplier_id"], d["to_supplier_id"]) for d in dependencies)
+        G.add_nodes_from(s["id"] for s in suppliers)
+        rng = random.Random(org)
+        ids = list(G)
+        for step in range(60):
+            op = step % 3
+            if op == 0:   # a random edge may close a cycle, and does so now and then
+                u, v = rng.sample(ids, 2)
+                reach.add_edge(u, v); G.add_edge(u, v)
+            elif op == 1 and G.number_of_edges():
+                u, v = rng.choice(list(G.edges))
+                reach.remove_edge(u, v); G.remove_edge(u, v)
+            elif step % 15 == 2:
+                v = rng.choice(ids)
+                reach.remove_node(v); G.remove_node(v); G.add_node(v)
+            if step % 10 == 0 or step == 59:
+                assert all(set(reach.downstream([v])) == nx.descendants(G, v) for v in ids), step
+                group = rng.sample(ids, 5)
+                expected = set().union(*(nx.descendants(G, v) for v in group)) - set(group)
+                assert set(reach.downstream(group)) == expected and reach.count_downstream(group) == len(expected)
+        assert get_downstream([suppliers[0]["id"]], suppliers, dependencies) == snap.reachability.downstream([suppliers[0]["id"]])
+
+        # Sweep: each target's headline numbers match a single scenario run against it
+        keys = ("directly_affected_count", "cascade_affected_count", "total_affected_pct",
+                "estimated_production_impact_pct", "after_resilience_score")
+        for kind, scenario, tier in (("country", "port_closure", None), ("supplier", "supplier_bankruptcy", 2)):
+            sweep = run_sweep(scenario, kind, tier=tier, severity=0.7, suppliers=suppliers, dependencies=dependencies)
+            assert sweep["target_count"] == len(sweep["results"]) > 0
+            for r in sweep["results"]:
+                target = {"target_country": r["target_label"]} if kind == "country" else {"target_supplier_id": r["target"]}
+                single = run_scenario(scenario, **target, severity=0.7, suppliers=suppliers, dependencies=dependencies)
+                assert all(single[k] == r[k] for k in keys), (r, single)
+            impacts = [r["estimated_production_impact_pct"] for r in sweep["results"]]
+            assert impacts == sorted(impacts, reverse=True)
+
+        red = get_redundancy(suppliers, dependencies, limit=100)
+        assert red["analysed_count"] == len(red["suppliers"]) > 0
+        assert all(len(r["min_cut_suppliers"]) == r["disjoint_paths"] for r in red["suppliers"])
+        print(f"  Redundancy: {red['single_path_count']} single-path tier-1 suppliers, port closure loses {result['lost_capacity_pct']}% capacity")
+
+        center = suppliers[0]
+        near = get_suppliers_near(suppliers, dependencies, center["lat"], center["lng"], radius_km=1500, limit=len(suppliers))
+        assert near[0]["id"] == center["id"] and all(a["distance_km"] <= b["distance_km"] <= 1500 for a, b in zip(near, near[1:]))
+        assert get_suppliers_near([dict(s) for s in suppliers], dependencies, center["lat"], center["lng"],
+                                  radius_km=1500, limit=len(suppliers)) == near
+        storm = run_scenario("weather_event", center_lat=center["lat"], center_lng=center["lng"], radius_km=1500,
+                             suppliers=suppliers, dependencies=dependencies)
+        assert storm["directly_affected_count"] == len(near)
+        print(f"  Weather event ({storm['target']}): {len(near)} direct → {storm['cascade_affected_count']} cascade")
+
+    assert recommended, "no org produced a recommendation to check"
+
+    # Cascade through a dependency cycle: A feeds B, B and C feed each other, C feeds D
+    from engines.cascade_engine import CascadeGraph
+    ring = CascadeGraph([{"id": x} for x in "ABCD"], [
+        {"from_supplier_id": u, "to_supplier_id": v, "volume_percent": p, "criticality": "high"}
+        for u, v, p in (("A", "B", 60), ("B", "C", 50), ("C", "B", 40), ("C", "D", 80))])
+    hits = {ring.node_ids[v]: r[:2] for v, r in ring.cascade(["A"]).items()}
+    # B is settled first with A's 60%, then C = 50% of B, D = 80% of C
+    assert hits == {"B": (1, 60.0), "C": (2, 30.0), "D": (3, 24.0)}, hits
+
+    # Monte Carlo: A feeds B (high, 50%) which feeds C (medium, 100%); A feeds D (low, 100%).
+    # At a severity no sampled spread brings below 1, each edge propagates with
+    # probability criticality weight x volume share: B 0.5, C 0.5 x 0.7, D 0.4.
+    from engines.monte_carlo import simulate_monte_carlo
+    chain = CascadeGraph([{"id": x} for x in "ABCD"], [
+        {"from_supplier_id": u, "to_supplier_id": v, "volume_percent": p, "criticality": c}
+        for u, v, p, c in (("A", "B", 50, "high"), ("B", "C", 100, "medium"), ("A", "D", 100, "low"))])
+    mc = simulate_monte_carlo(chain, ["A"], 10.0, (10, 20), 1.0, 4, trials=20000, seed=7, workers=1)
+    freq = {h["supplier_id"]: h["probability"] for h in mc["supplier_hit_probability"]}
+    assert all(abs(freq[v] - p) < 0.02 for v, p in {"B": 0.5, "C": 0.35, "D": 0.4}.items()), freq
+    assert abs(mc["cascade_affected_count"]["mean"] - 1.25) <= 0.1 and 10 <= mc["recovery_days"]["p50"] <= 20
+    assert simulate_monte_carlo(chain, ["A"], 10.0, (10, 20), 1.0, 4, trials=20000, seed=7, workers=1) == mc
+    print(f"\n  Monte Carlo: hit frequencies {freq} over {mc['trials']} trials")
+
+    # Bulk loader + repository: seed an org into the SQLite-backed PostgREST stand-in and load it back
+    import asyncio
+    from db.local_postgrest import LocalPostgrest
+    from db.bulk_loader import TABLES, load_dataset, iter_csv
+    from db.repository import PostgrestRepository, load_org_data, synthetic_org_data
+
+    stub = LocalPostgrest({t: keys for t, (keys, _) in TABLES.items()})
+    repo = PostgrestRepository("http://stub", "key", transport=stub.transport, page_size=25)
+    expected = synthetic_org_data("auto")
+    tables = {"suppliers": expected["suppliers"], "dependencies": expected["dependencies"],
+              "disruption_alerts": expected["alerts"], "country_risk": expected["country_risk"]}
+    for _ in range(2):   # a re-run upserts the same rows: idempotent
+        seeded = asyncio.run(load_dataset(repo, tables, org="auto", batch_size=10, concurrency=3))
+    assert all("error" not in r for r in seeded.values()), seeded
+    expected["country_risk"] = sorted(expected["country_risk"], key=lambda c: c["country_code"])
+    expected["alerts"] = [{k: v for k, v in a.items() if k != "triggering_factors"} for a in expected["alerts"]]
+
+    stub.requests.clear()
+    loaded = asyncio.run(load_org_data("auto", repo))
+    loaded["alerts"] = [{k: v for k, v in a.items() if k != "triggering_factors"} for a in loaded["alerts"]]
+    for key in ("suppliers", "dependencies", "alerts", "country_risk"):
+        assert loaded[key] == expected[key], key
+    pages = sum(-(-len(expected[k]) // 25) for k in ("suppliers", "dependencies", "alerts", "country_risk"))
+    assert len(stub.requests) == pages, stub.requests
+    missing = asyncio.run(load_org_data("pharma", repo))
+    assert missing["suppliers"] == get_company_data("pharma")["suppliers"], "empty org should fall back to synthetic data"
+
+    csv_body = [b'country_code,country_name,political_risk,weather_risk,economic_risk,trade_restriction_risk,port_c',
+                b'ongestion_risk\nZZ,"Test, ""Land""",1,2,3,4,5\n']
+    asyncio.run(load_dataset(repo, {"country_risk": iter_csv(csv_body)}))
+    zz = [c for c in asyncio.run(load_org_data("auto", repo))["country_risk"] if c["country_code"] == "ZZ"]
+    assert zz == [{"country_code": "ZZ", "country_name": 'Test, "Land"', "political_risk": 1, "weather_risk": 2,
+                   "economic_risk": 3, "trade_restriction_risk": 4, "port_congestion_risk": 5}], zz
+    print(f"\n  Bulk load: {sum(r['rows'] for r in seeded.values())} rows; reloaded in {pages} requests over 2 waves")
+
+    # Scaled generator: deterministic, more than 3 tiers, and every engine runs on it
+    from data.scale_data import generate_scaled_columns, generate_scaled_data
+    big = generate_scaled_data(5000, org="pharma", tiers=5, fan_in_dist="powerlaw", fan_out_skew=1.0, seed=3)
+    again = generate_scaled_data(5000, org="pharma", tiers=5, fan_in_dist="powerlaw", fan_out_skew=1.0, seed=3)
+    assert big["suppliers"] == again["suppliers"] and big["dependencies"] == again["dependencies"]
+    assert sorted(set(big["suppliers"].column("tier").tolist())) == [1, 2, 3, 4, 5]
+    ids = set(big["suppliers"].ids())
+    assert all(d["from_supplier_id"] in ids and d["to_supplier_id"] in ids for d in big["dependencies"])
+    ov = get_overview(big["suppliers"], big["dependencies"])
+    result = run_scenario("port_closure", target_country="India", suppliers=big["suppliers"], dependencies=big["dependencies"])
+    spofs = get_single_points_of_failure(big["suppliers"], big["dependencies"])
+    big_snap = get_snapshot(big["suppliers"], big["dependencies"])
+    tree = big_snap.dominator_tree
+    big_recs = get_recommendations(big["suppliers"], big["dependencies"], top_k=3, limit=None)
+    big_expected = [(risky["id"], [a["id"] for a in alts])
+                    for risky in sorted(big_snap.scored, key=lambda s: s["risk_score"], reverse=True) if risky["risk_score"] >= 55
+                    for alts in [scan_alternatives(risky, big_snap.scored, 3)] if alts]
+    assert [(r["risky_supplier_id"], [a["alt_supplier_id"] for a in r["alternatives"]]) for r in big_recs] == big_expected
+    sampled = nx.betweenness_centrality(big_snap.graph, k=256, seed=42)
+    assert all(abs(sampled[v] - b) < 1e-12 for v, b in big_snap.get_centrality("sampled").items())
+    cut = [sid for sid in tree.node_ids if spofs[0]["supplier_id"] in tree.dominators(sid)]
+    assert len(cut) == spofs[0]["dominated_downstream_count"] > 0
+    print(f"\n  Scaled: {len(big['suppliers'])} suppliers / {len(big['dependencies'])} deps, "
+          f"resilience {ov['resilience_score']}, India port closure hits {result.get('cascade_affected_count', 0)}, "
+          f"top SPOF cuts off {len(cut)}")
+
+    # Mutation API: edits patch the snapshot in place, and every cache matches a fresh rebuild.
+    # 3000 suppliers use sampled centrality (patched per pivot for dependency edits);
+    # 300 use exact centrality, recomputed per touched component, and also take supplier edits.
+    # Inherited risk gets a weight, so the patched propagation matrix feeds every score.
+    import copy
+    import numpy as np
+    from data import company_data
+    from engines.snapshot import AnalysisSnapshot
+
+    weight, scoring_kernel.INHERITED_RISK_WEIGHT = scoring_kernel.INHERITED_RISK_WEIGHT, 0.1
+    for org, n, ops in (("edit-sampled", 3000, ("updS", "addD", "addD", "delD")),
+                        ("edit-exact", 300, ("addS", "updS", "delS", "addD", "addD", "delD"))):
+        company_data.set_company_data(org, {**generate_scaled_data(n, fan_in_dist="powerlaw", seed=11),
+                                            "alerts": [], "profile": {"industry": "Testing"}})
+        data = company_data.get_company_data(org)
+        snap = get_snapshot(data["suppliers"], data["dependencies"])
+        analysis_state(snap)
+        rng = random.Random(n)
+        for step in range(30):
+            op, ids = rng.choice(ops), data["suppliers"].ids()
+            if op == "addS":
+                company_data.add_supplier(org, {"name": f"New {step}", "country_code": rng.choice(["CN", "US", "BR"])})
+            elif op == "updS":
+                company_data.update_supplier(org, rng.choice(ids), {"geographic_risk": rng.randint(0, 100), "country_code": "VN"})
+            elif op == "delS":
+                company_data.remove_supplier(org, rng.choice(ids))
+            elif op == "addD":
+                try:
+                    company_data.add_dependency(org, rng.choice(ids), rng.choice(ids), volume_percent=rng.randint(10, 99))
+                except ValueError:
+                    pass
+            else:
+                company_data.remove_dependency(org, rng.choice(data["dependencies"])["id"])
+            if step % 10 == 9:
+                a = analysis_state(snap)
+                table = snap.score_table
+                fresh = inherited_risk.propagation_matrix(table.row_of, snap.dependency_index.incoming)
+                assert np.array_equal(table.inherited, inherited_risk.propagate(fresh, table.local_score)), (org, step)
+                b = analysis_state(AnalysisSnapshot(copy.deepcopy(data["suppliers"]), copy.deepcopy(data["dependencies"])))
+                assert a[0] == b[0] and a[2:] == b[2:], (org, step)
+                assert a[1].keys() == b[1].keys() and all(abs(a[1][v] - b[1][v]) < 1e-12 for v in a[1]), (org, step)
+        assert get_snapshot(data["suppliers"], data["dependencies"]) is snap
+        assert company_data.remove_dependency(org, -1) is None and company_data.remove_supplier(org, -1) is None
+        dep = data["dependencies"][0]
+        try:
+            company_data.add_dependency(org, dep["from_supplier_id"], dep["to_supplier_id"])
+            raise AssertionError("duplicate dependency accepted")
+        except ValueError:
+            pass
+        print(f"  Edits ({org}): {len(data['suppliers'])} suppliers / {len(data['dependencies'])} deps match a fresh rebuild")
+        company_data.unload_company_data(org)
+    scoring_kernel.INHERITED_RISK_WEIGHT = weight
+
+    # ── HTTP: timing headers and /api/metrics ──────────────────────────────────
+    from fastapi.testclient import TestClient
+    from engines import metrics
+    from main import app
+
+    print(f"\n{'='*60}\n  HTTP\n{'='*60}")
+    client = TestClient(app)
+    if metrics.ENABLED:
+        r = client.get("/api/risk/overview", headers={"X-Org-ID": "pharma"})
+        assert r.status_code == 200
+        stages = {part.split(";")[0].strip(): part for part in r.headers["server-timing"].split(",")}
+        assert "total" in stages and "dur=" in stages["total"], r.headers["server-timing"]
+        assert "handler" in stages, stages
+        timing = r.headers["server-timing"]
+        r = client.get("/api/metrics")
+        assert r.status_code == 200 and r.headers["content-type"] == metrics.CONTENT_TYPE
+        assert "server-timing" in r.headers
+        text = r.text
+        for line in ("# TYPE resilio_http_request_duration_seconds histogram",
+                     "# TYPE resilio_stage_duration_seconds histogram",
+                     'resilio_http_request_duration_seconds_count{method="GET",route="/api/risk/overview",status="200"}',
+                     'resilio_stage_duration_seconds_bucket{stage="handler",le="+Inf"}'):
+            assert line in text, line
+        buckets = [int(l.rsplit(" ", 1)[1]) for l in text.splitlines()
+                   if l.startswith('resilio_http_request_duration_seconds_bucket{method="GET",route="/api/risk/overview"')]
+        assert buckets == sorted(buckets) and buckets[-1] >= 1, buckets
+        print(f"  Server-Timing: {timing}\n  /api/metrics: {len(text.splitlines())} lines")
+
+    # Graph payload: ETag per encoding, gzip when accepted, 304 for a current copy, new ETag after an edit
+    headers = {"X-Org-ID": "auto"}
+    plain = client.get("/api/network/graph", headers={**headers, "Accept-Encoding": "identity"})
+    data = get_company_data("auto")
+    assert plain.status_code == 200 and "content-encoding" not in plain.headers
+    assert plain.json() == get_graph_json(data["suppliers"], data["dependencies"])
+    zipped = client.get("/api/network/graph", headers={**headers, "Accept-Encoding": "gzip"})
+    assert zipped.headers["content-encoding"] == "gzip" and zipped.json() == plain.json()
+    assert int(zipped.headers["content-length"]) < len(plain.content)
+    tag = zipped.headers["etag"]
+    assert tag.startswith('"') and tag != plain.headers["etag"]
+    for match in (tag, f"W/{tag}", f'"stale", {tag}', "*"):
+        r = client.get("/api/network/graph", headers={**headers, "Accept-Encoding": "gzip", "If-None-Match": match})
+        assert r.status_code == 304 and r.headers["etag"] == tag and not r.content, match
+    pairs = {(d["from_supplier_id"], d["to_supplier_id"]) for d in data["dependencies"]}
+    ids = data["suppliers"].ids()
+    src, dst = next((u, v) for u in ids for v in ids if u != v and (u, v) not in pairs)
+    dep = client.post("/api/network/dependencies", headers=headers, json={"from_supplier_id": src, "to_supplier_id": dst}).json()
+    r = client.get("/api/network/graph", headers={**headers, "Accept-Encoding": "gzip", "If-None-Match": tag})
+    assert r.status_code == 200 and r.headers["etag"] != tag and len(r.json()["edges"]) == len(plain.json()["edges"]) + 1
+    assert client.delete(f"/api/network/dependencies/{dep['id']}", headers=headers).json() == {"deleted": dep["id"]}
+    r = client.get("/api/network/graph", headers={**headers, "Accept-Encoding": "gzip", "If-None-Match": tag})
+    assert r.status_code == 304, "removing the edge again should restore the original payload"
+    print(f"  Graph payload: {len(plain.content)} B, gzip {zipped.headers['content-length']} B, ETag {tag}")
+
+    print("\n\n✅ ALL 3 ORG DATASETS PASSED")
+
+if __name__ == "__main__":
+    main()
@@ -206,7 +206,9 @@ export default function NetworkGraph() {
                   <p className="text-xs font-semibold text-slate-200 truncate">{s.supplier_name}</p>
                   <p className="text-xs text-slate-500 mt-0.5">{s.country_code} · Tier {s.tier}</p>
                   <div className="mt-2 flex items-center justify-between text-xs">
-                    <span className="text-slate-400">Centrality: <span className="text-amber-400 font-mono">{s.centrality_score}</span></span>
+                    {s.dominated_downstream_count != null
+                      ? <span className="text-slate-400">Sole path for: <span className="text-amber-400 font-mono">{s.dominated_downstream_count}</span></span>
+                      : <span className="text-slate-400">Centrality: <span className="text-amber-400 font-mono">{s.centrality_score}</span></span>}
                     <span className="text-red-400">{s.dependents_count} downstream</span>
                   </div>
                 </div>
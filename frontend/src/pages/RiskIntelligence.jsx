@@ -132,7 +132,9 @@ export default function RiskIntelligence() {
                     <p className="text-xs font-medium text-slate-200 truncate">{s.supplier_name}</p>
                     <p className="text-xs text-slate-500">{s.country_code} · {s.dependents_count} downstream</p>
                   </div>
-                  <div className="text-xs font-mono text-red-400">{Number(s.centrality_score).toFixed(3)}</div>
+                  <div className="text-xs font-mono text-red-400">
+                    {s.dominated_downstream_count != null ? `${s.dominated_downstream_count} cut off` : Number(s.centrality_score).toFixed(3)}
+                  </div>
                 </div>
               ))}
             </div>